@@ -0,0 +1,188 @@
+"""
+Negotiated response compression.
+
+Responses are compressed with the best encoding both sides support, in the
+server's COMPRESSION_ENCODINGS order: zstd and brotli when the zstandard and
+brotli packages are installed, gzip always. Only text-like content types over
+COMPRESSION_MIN_SIZE bytes are compressed. Streaming responses (exports,
+files) are compressed chunk by chunk as they are sent, never buffered whole.
+
+Compressing the same popular payload (a memorial page, the by_religion
+listing) on every request wastes CPU, so the compressed bytes of large bodies
+are cached under a digest of the uncompressed body: a payload served from the
+cache is compressed once per encoding, later requests only hash it.
+
+HTML is left alone: admin pages carry CSRF tokens next to reflected input,
+which compression would expose to BREACH.
+"""
+import hashlib
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = {
+    'application/cbor',
+    'application/json',
+    'application/msgpack',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/css',
+    'text/csv',
+    'text/javascript',
+    'text/plain',
+}
+
+COMPRESSED_CACHE_KEY = 'compression:{encoding}:{digest}'
+
+
+def _gzip(level=None):
+    compressor = zlib.compressobj(level or settings.COMPRESSION_LEVELS['gzip'], zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def _brotli(level=None):
+    compressor = brotli.Compressor(quality=level or settings.COMPRESSION_LEVELS['br'])
+    return compressor.process, compressor.finish
+
+
+def _zstd(level=None):
+    compressor = zstandard.ZstdCompressor(level=level or settings.COMPRESSION_LEVELS['zstd']).compressobj()
+    return compressor.compress, compressor.flush
+
+
+# Encodings this process can produce, each a factory of (compress, finish) functions taking an optional level
+ENCODERS = {'gzip': _gzip}
+if brotli is not None:
+    ENCODERS['br'] = _brotli
+if zstandard is not None:
+    ENCODERS['zstd'] = _zstd
+
+
+def parse_accept_encoding(header):
+    """Return {encoding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in header.split(','):
+        encoding, _, params = part.strip().partition(';')
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[encoding] = q
+    return accepted
+
+
+def negotiate_encoding(header, available=ENCODERS):
+    """Return the encoding out of available to use for an Accept-Encoding header, or None to send the body as is"""
+    accepted = parse_accept_encoding(header)
+    best = None
+    for encoding in settings.COMPRESSION_ENCODINGS:
+        if encoding not in available:
+            continue
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        # Ties go to the server's preference, which is the iteration order
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    return best[0] if best else None
+
+
+def compress(content, encoding, level=None):
+    """Compress a whole body"""
+    compress_chunk, finish = ENCODERS[encoding](level)
+    return compress_chunk(content) + finish()
+
+
+def compress_cached(content, encoding):
+    """Compress a body, reusing the compressed bytes of an identical body compressed earlier"""
+    if len(content) < settings.COMPRESSION_CACHE_MIN_SIZE:
+        return compress(content, encoding)
+    key = COMPRESSED_CACHE_KEY.format(encoding=encoding, digest=hashlib.sha256(content).hexdigest())
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress(content, encoding)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of chunks, yielding output as the compressor produces it"""
+    compress_chunk, finish = ENCODERS[encoding]()
+    for chunk in chunks:
+        data = compress_chunk(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def compress_async_stream(chunks, encoding):
+    """Compress an async iterable of chunks"""
+    compress_chunk, finish = ENCODERS[encoding]()
+    async for chunk in chunks:
+        data = compress_chunk(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress text-like responses with the best encoding the client accepts"""
+
+    def process_response(self, request, response):
+        if response.status_code != 200 or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+        if response.streaming:
+            # File responses know their size up front, other streams are assumed large
+            size = int(response.get('Content-Length', settings.COMPRESSION_MIN_SIZE))
+        else:
+            size = len(response.content)
+        if size < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            compressed = compress_cached(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The compressed bytes differ from the identity body, so a strong validator no longer matches them
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,147 @@
+"""
+Sparse fieldsets.
+
+Read endpoints accept ?fields=id,name,image_url to return only the named
+fields, or ?omit=life_story,achievements to drop some. The selection is also
+pushed down into the query: the remaining serializer fields are mapped back
+to the model columns they read and the queryset loads only those with
+.only(), so large text and JSON columns nobody asked for are neither read
+from the database nor sent. Without either parameter the projection still
+applies, so list actions never load the heavy columns that only their detail
+serializer shows.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import ListSerializer
+
+from .includes import plan_queryset
+
+SPARSE_FIELDS_PARAMS = ('fields', 'omit')
+
+
+def parse_field_list(value):
+    """Split a comma separated list of field names"""
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin accepting fields= and omit= lists to limit the fields rendered.
+
+    Fields that do not read a model column of the same name (method fields,
+    model methods) list the columns they read in field_dependencies; a field
+    whose columns are unknown turns the query projection off.
+    """
+    field_dependencies = {}
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Omitting a field the serializer does not have is harmless, asking for one is not
+        unknown = sorted(set(fields or ()) - set(self.fields))
+        if unknown:
+            raise ValidationError({'fields': [f"Unknown field: {name}" for name in unknown]})
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+    def get_projection(self):
+        """Return the model columns the remaining fields read, or None when one cannot be resolved"""
+        model = self.Meta.model
+        opts = model._meta
+        # Foreign keys are small and select_related() needs them, so they are always loaded
+        columns = {opts.pk.name} | {
+            field.name for field in opts.concrete_fields if field.is_relation
+        }
+        for name, field in self.fields.items():
+            if name in self.field_dependencies:
+                columns.update(self.field_dependencies[name])
+                continue
+            if field.source == '*':
+                return None
+            attr = field.source_attrs[0]
+            try:
+                model_field = opts.get_field(attr)
+            except FieldDoesNotExist:
+                if hasattr(model, attr):
+                    return None
+                # Not an attribute of the model at all, so the field is never rendered
+                continue
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(model_field.name)
+        return columns
+
+
+class SparseFieldsViewMixin:
+    """
+    Applies ?fields= / ?omit= and ?include= to the serializer and queryset of a viewset's read actions.
+
+    The queryset of those actions is also planned from the serializer (see
+    includes.py), so the related rows a response shows are joined or prefetched.
+    """
+    sparse_fields_actions = ('list', 'retrieve', 'batch')
+    # Relations clients may embed with ?include=, as {name: Include}
+    includes = {}
+
+    def uses_sparse_fields(self):
+        """Whether the current action renders with a sparse fieldset serializer"""
+        return (
+            self.request is not None
+            and self.action in self.sparse_fields_actions
+            and issubclass(self.get_serializer_class(), SparseFieldsMixin)
+        )
+
+    def get_sparse_fields(self):
+        """Return the fields/omit serializer arguments requested for the current action"""
+        if not self.uses_sparse_fields():
+            return {}
+        return {
+            param: parse_field_list(self.request.query_params[param])
+            for param in SPARSE_FIELDS_PARAMS
+            if param in self.request.query_params
+        }
+
+    def get_includes(self):
+        """Return the {name: Include} requested with ?include= for the current action"""
+        if not self.uses_sparse_fields() or 'include' not in self.request.query_params:
+            return {}
+        names = parse_field_list(self.request.query_params['include'])
+        unknown = [name for name in names if name not in self.includes]
+        if unknown:
+            raise ValidationError({
+                'include': [f"Unknown include: {name}" for name in unknown],
+                'available': list(self.includes),
+            })
+        return {name: self.includes[name] for name in names}
+
+    def get_serializer(self, *args, **kwargs):
+        """Pass the requested fields on to the serializer and add the requested includes"""
+        for param, names in self.get_sparse_fields().items():
+            kwargs.setdefault(param, names)
+        serializer = super().get_serializer(*args, **kwargs)
+        includes = self.get_includes()
+        if includes:
+            target = serializer.child if isinstance(serializer, ListSerializer) else serializer
+            for name, include in includes.items():
+                target.fields[name] = include.build_field(name, target.Meta.model)
+        return serializer
+
+    def get_queryset(self):
+        """Load only the columns the requested fields read, along with the related rows they show"""
+        queryset = super().get_queryset()
+        if not self.uses_sparse_fields():
+            return queryset
+        columns = self.get_serializer_class()(**self.get_sparse_fields()).get_projection()
+        if columns is not None:
+            queryset = queryset.only(*columns)
+        queryset = plan_queryset(queryset, self.get_serializer())
+        prefetches = [
+            include.get_prefetch(name, queryset.model)
+            for name, include in self.get_includes().items()
+            if include.is_many(queryset.model)
+        ]
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
@@ -0,0 +1,171 @@
+"""
+Serving the built frontend and static files.
+
+`npm run build` writes the single page app to frontend/dist, with its scripts
+and stylesheets under assets/ named after a hash of their content.
+collectstatic copies it into STATIC_ROOT/frontend next to the admin and
+browsable API static files, and PrecompressedStaticFilesStorage writes .gz
+(and .br/.zst when brotli/zstandard are installed) variants of every
+text-like file at maximum compression while it does.
+
+At request time serve_static() only picks the variant matching the client's
+Accept-Encoding and hands the open file to FileResponse, so an asset request
+costs a stat() and a sendfile, never a compression. Hashed assets are cached
+by browsers for a year as immutable; other files are revalidated with their
+ETag. Paths no other URL pattern claims get the app's index.html, so
+client-side routes work on reload and deep links.
+"""
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .compression import COMPRESSIBLE_TYPES, ENCODERS, compress, negotiate_encoding
+
+# File name suffix of the precompressed variant written for each encoding
+VARIANT_SUFFIXES = {'gzip': '.gz', 'br': '.br', 'zstd': '.zst'}
+
+# Static files are never user-controlled, so HTML and icons are precompressed as well
+PRECOMPRESSIBLE_TYPES = COMPRESSIBLE_TYPES | {'text/html', 'image/vnd.microsoft.icon', 'image/x-icon'}
+
+INDEX_NAME = 'index.html'
+
+
+def _content_type(path):
+    return (mimetypes.guess_type(path)[0] or '').lower()
+
+
+def frontend_route_pattern():
+    """Regex matching every path except those of the API, admin and file URLs"""
+    reserved = ['admin', 'api', 'api-auth', 'q', settings.MEDIA_URL.strip('/'), settings.STATIC_URL.strip('/')]
+    # Unmatched API paths stay 404s (and keep APPEND_SLASH redirects) instead of becoming the app
+    return r'^(?!(?:%s)(?:/|$))(?P<path>.*)$' % '|'.join(re.escape(prefix) for prefix in reserved)
+
+
+class PrecompressedStaticFilesStorage(StaticFilesStorage):
+    """StaticFilesStorage that writes compressed variants of collected files"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        for name in paths:
+            if name.endswith(tuple(VARIANT_SUFFIXES.values())):
+                continue
+            if _content_type(name) not in PRECOMPRESSIBLE_TYPES:
+                continue
+            yield name, name, self._write_variants(name)
+
+    def _write_variants(self, name):
+        """Write the variants of a collected file that are worth sending; return whether any was"""
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            content = file.read()
+        written = False
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            variant_path = path + suffix
+            if encoding in ENCODERS and len(content) >= settings.STATIC_COMPRESSION_MIN_SIZE:
+                compressed = compress(content, encoding, settings.STATIC_COMPRESSION_LEVELS[encoding])
+                if len(compressed) < len(content):
+                    with open(variant_path, 'wb') as file:
+                        file.write(compressed)
+                    written = True
+                    continue
+            # Drop a variant left by an earlier collectstatic of different content
+            if os.path.exists(variant_path):
+                os.remove(variant_path)
+        return written
+
+
+def _stat_file(document_root, path):
+    """Return (full path, stat) of a regular file below document_root, or None"""
+    try:
+        full_path = safe_join(document_root, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        return None
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    return full_path, file_stat
+
+
+def _variants(full_path):
+    """Return {encoding: path} of the precompressed variants present next to a file"""
+    return {
+        encoding: full_path + suffix
+        for encoding, suffix in VARIANT_SUFFIXES.items()
+        if os.path.isfile(full_path + suffix)
+    }
+
+
+def _file_response(request, full_path, file_stat, max_age=None, immutable=False):
+    """Send a file, or its precompressed variant the client accepts, with validators and cache headers"""
+    content_type, file_encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    etag = f'{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}'
+
+    encoding = None
+    if not file_encoding and content_type.lower() in PRECOMPRESSIBLE_TYPES:
+        variants = _variants(full_path)
+        if variants:
+            encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), variants)
+            if encoding:
+                full_path = variants[encoding]
+                etag = f'{etag}-{encoding}'
+    etag = f'"{etag}"'
+
+    # 304 Not Modified / 412 Precondition Failed
+    response = get_conditional_response(request, etag=etag, last_modified=int(file_stat.st_mtime))
+    if response is None:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(os.path.getsize(full_path))
+        if encoding or file_encoding:
+            response['Content-Encoding'] = encoding or file_encoding
+
+    if content_type.lower() in PRECOMPRESSIBLE_TYPES:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(file_stat.st_mtime)
+    if immutable:
+        patch_cache_control(response, public=True, max_age=settings.STATIC_IMMUTABLE_MAX_AGE, immutable=True)
+    elif max_age:
+        patch_cache_control(response, public=True, max_age=max_age)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+@require_safe
+def serve_static(request, path):
+    """Serve a collected static file, precompressed when possible"""
+    found = _stat_file(settings.STATIC_ROOT, path)
+    if found is None:
+        raise Http404("Static file not found")
+    immutable = path.startswith(tuple(settings.STATIC_IMMUTABLE_PREFIXES))
+    return _file_response(request, *found, max_age=settings.STATIC_CACHE_MAX_AGE, immutable=immutable)
+
+
+@require_safe
+def serve_frontend(request, path):
+    """Serve a file of the built frontend, or its index.html for client-side routes"""
+    found = _stat_file(settings.FRONTEND_ROOT, path) if path else None
+    if found is not None:
+        immutable = path.startswith(tuple(settings.FRONTEND_IMMUTABLE_PREFIXES))
+        return _file_response(request, *found, max_age=settings.STATIC_CACHE_MAX_AGE, immutable=immutable)
+
+    # A missing asset is a 404, anything else is a route of the app
+    if path.startswith(tuple(settings.FRONTEND_IMMUTABLE_PREFIXES)) or os.path.splitext(path.rsplit('/', 1)[-1])[1]:
+        raise Http404("Frontend file not found")
+    found = _stat_file(settings.FRONTEND_ROOT, INDEX_NAME)
+    if found is None:
+        raise Http404("Frontend has not been built")
+    # index.html names the current asset hashes, so it is always revalidated
+    return _file_response(request, *found)
@@ -0,0 +1,111 @@
+"""
+Embedded relations and query planning for read serializers.
+
+plan_queryset() walks the fields a serializer will render and adds the
+select_related() and Prefetch lookups they need: dotted sources such as
+memorial.name and nested serializers over foreign keys become joins, nested
+serializers and pk lists over to-many relations become prefetches (planned
+recursively for their own serializer). Whatever the serializer reads from
+related rows is therefore loaded up front, never one row at a time.
+
+Viewsets also declare Includes, relations a client can embed with
+?include=timeline_stories,wakeroom_experiences. To-many includes are
+prefetched with a sliced queryset, so every parent embeds at most a bounded
+number of rows whatever the size of the relation.
+"""
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+
+class Include:
+    """A relation embedded on request with its own serializer"""
+
+    def __init__(self, relation, serializer_class, ordering=None, limit=None):
+        self.relation = relation
+        self.serializer_class = serializer_class
+        self.ordering = ordering
+        self.limit = limit
+
+    def to_attr(self, name):
+        return f'_included_{name}'
+
+    def build_field(self, name, model):
+        """Return the read-only serializer field rendering the relation of model under name"""
+        if self.is_many(model):
+            return self.serializer_class(source=self.to_attr(name), many=True, read_only=True)
+        return self.serializer_class(source=self.relation, read_only=True)
+
+    def is_many(self, model):
+        field = model._meta.get_field(self.relation)
+        return field.one_to_many or field.many_to_many
+
+    def get_prefetch(self, name, model):
+        """Return the Prefetch loading at most the include's limit of related rows per parent"""
+        related_model = model._meta.get_field(self.relation).related_model
+        queryset = related_model._default_manager.all()
+        if self.ordering:
+            queryset = queryset.order_by(*self.ordering)
+        queryset = plan_queryset(queryset, self.serializer_class())
+        limit = self.limit or settings.INCLUDE_MAX_ITEMS
+        return Prefetch(self.relation, queryset=queryset[:limit], to_attr=self.to_attr(name))
+
+
+def _plan(serializer, model, prefix=''):
+    """Return (select_related paths, prefetch lookups) for the fields of a serializer over model"""
+    select_related = set()
+    prefetches = []
+    for field in serializer.fields.values():
+        if field.source == '*':
+            continue
+        is_serializer = isinstance(field, BaseSerializer)
+        current = model
+        path = []
+        for index, attr in enumerate(field.source_attrs):
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation:
+                break
+            last = index == len(field.source_attrs) - 1
+            if model_field.many_to_one or model_field.one_to_one:
+                # A plain related field only reads the foreign key column
+                if last and not is_serializer:
+                    break
+                path.append(attr)
+                current = model_field.related_model
+                continue
+            lookup = prefix + '__'.join(path + [attr])
+            if isinstance(field, ListSerializer) and hasattr(field.child, 'Meta'):
+                child = field.child
+                prefetches.append(Prefetch(
+                    lookup, queryset=plan_queryset(child.Meta.model._default_manager.all(), child)
+                ))
+            elif last and isinstance(field, ManyRelatedField):
+                prefetches.append(lookup)
+            path = []
+            break
+        else:
+            if path and is_serializer and not isinstance(field, ListSerializer):
+                # A nested serializer over a foreign key: plan its own fields through the join
+                nested_select, nested_prefetches = _plan(field, current, prefix + '__'.join(path) + '__')
+                select_related |= nested_select
+                prefetches.extend(nested_prefetches)
+        if path:
+            select_related.add(prefix + '__'.join(path))
+    return select_related, prefetches
+
+
+def plan_queryset(queryset, serializer):
+    """Add the joins and prefetches the serializer's fields need to queryset"""
+    if isinstance(serializer, ListSerializer):
+        serializer = serializer.child
+    select_related, prefetches = _plan(serializer, queryset.model)
+    if select_related:
+        queryset = queryset.select_related(*sorted(select_related))
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset
@@ -0,0 +1,169 @@
+"""
+Production media serving.
+
+Serves files below MEDIA_ROOT with single byte-range support, ETag and
+Last-Modified validation and long-lived cache headers. When
+MEDIA_SENDFILE_BACKEND is configured the transfer itself is handed to the
+front server (X-Accel-Redirect for nginx, X-Sendfile for Apache/lighttpd);
+otherwise the file is streamed through FileResponse, which WSGI servers such
+as gunicorn send with zero-copy sendfile(2).
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """
+    Read-only view of a byte range of an open file.
+
+    fileno() exposes the underlying descriptor (already positioned at the
+    range start) so wsgi.file_wrapper implementations can use sendfile(2) for
+    Content-Length bytes; plain iteration stops at the end of the range.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range_header(header, size):
+    """
+    Parse a single-range Range header into an inclusive (start, end) pair.
+
+    Returns None when the header should be ignored (absent, malformed or a
+    multi-range request, which is answered with the full file) and raises
+    ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag, mtime):
+    """Check the If-Range precondition; a missing header always matches"""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    if_range_date = parse_http_date_safe(if_range)
+    return if_range_date is not None and int(mtime) <= if_range_date
+
+
+def _offload_response(path, content_type):
+    """Build an empty response that tells the front server to send the file"""
+    response = HttpResponse(content_type=content_type)
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    if backend == 'nginx':
+        relative_path = os.path.relpath(path, settings.MEDIA_ROOT)
+        response['X-Accel-Redirect'] = quote(settings.MEDIA_ACCEL_REDIRECT_PREFIX + relative_path.replace(os.sep, '/'))
+    elif backend == 'xsendfile':
+        response['X-Sendfile'] = path
+    else:
+        raise ValueError(f"Unknown MEDIA_SENDFILE_BACKEND: {backend}")
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve an uploaded media file with Range, conditional and caching support"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Media file not found")
+    try:
+        file_stat = os.stat(full_path)
+    except OSError:
+        raise Http404("Media file not found")
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404("Media file not found")
+
+    size = file_stat.st_size
+    mtime = file_stat.st_mtime
+    etag = f'"{file_stat.st_mtime_ns:x}-{size:x}"'
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    # 304 Not Modified / 412 Precondition Failed
+    response = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+    if response is None:
+        if settings.MEDIA_SENDFILE_BACKEND:
+            # The front server handles Range and the byte transfer itself
+            response = _offload_response(full_path, content_type)
+        else:
+            response = _file_response(request, full_path, size, content_type, etag, mtime)
+            if encoding:
+                response['Content-Encoding'] = encoding
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    response['Accept-Ranges'] = 'bytes'
+    patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def _file_response(request, full_path, size, content_type, etag, mtime):
+    """Stream the whole file or the requested byte range"""
+    try:
+        byte_range = parse_range_header(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None or not _if_range_matches(request, etag, mtime):
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(size)
+        return response
+
+    start, end = byte_range
+    length = end - start + 1
+    response = FileResponse(FileRange(open(full_path, 'rb'), start, length), content_type=content_type, status=206)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,174 @@
+"""
+Multiplexed batch requests.
+
+A page of the frontend loads several endpoints at once (featured memorials,
+statistics, categories, remaining license count...). POST /api/v1/batch/
+takes the list of those GET requests and answers them all in one response:
+
+    {"requests": [{"id": "featured", "path": "/api/v1/memorials/featured/"},
+                  "/api/v1/legacy/licenses/remaining_count/"]}
+
+Each sub-request is resolved against the URLconf and handed straight to its
+view, skipping the middleware stack and reusing the batch request's session
+and authenticated user, so authentication runs once per batch rather than
+once per call. GET requests are independent of one another, so they are
+dispatched concurrently on a shared thread pool, each with its own database
+connection.
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH_PREFIX = '/api/v1/'
+
+# Response headers of a sub-request that are passed back to the client
+FORWARDED_HEADERS = ('Cache-Control', 'ETag', 'Last-Modified', 'Location')
+
+# Request headers that are not meaningful for a GET dispatched in-process
+DROPPED_META = ('CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_AUTHORIZATION', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide pool sub-requests are dispatched on, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.BATCH_REQUEST_WORKERS, thread_name_prefix='kardiverse-batch')
+        return _executor
+
+
+class SubRequest(HttpRequest):
+    """A GET request dispatched in-process on behalf of a batch request"""
+
+    def __init__(self, parent, path, query_string):
+        super().__init__()
+        self.method = 'GET'
+        self.path = self.path_info = path
+        self.META = {key: value for key, value in parent.META.items() if key not in DROPPED_META}
+        self.META.update(REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query_string)
+        self.GET = QueryDict(query_string)
+        self.COOKIES = parent.COOKIES
+        self._parent_scheme = parent.scheme
+        if hasattr(parent, 'session'):
+            self.session = parent.session
+        self.user = parent.user
+
+    def _get_scheme(self):
+        return self._parent_scheme
+
+
+def parse_batch(data):
+    """Return [(id, path, query string)] from a batch request body; raises ValueError"""
+    items = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError('requests must be a non-empty list')
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise ValueError(f'At most {settings.BATCH_MAX_REQUESTS} requests can be batched at once')
+
+    parsed = []
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            item = {'path': item}
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            raise ValueError(f'Request {index} must be a path or an object with a path')
+        if item.get('method', 'GET').upper() != 'GET':
+            raise ValueError(f'Request {index}: only GET requests can be batched')
+        path, _, query_string = item['path'].partition('?')
+        if not path.startswith(BATCH_PATH_PREFIX) or path.rstrip('/') == BATCH_PATH_PREFIX + 'batch':
+            raise ValueError(f'Request {index}: path must be an API endpoint below {BATCH_PATH_PREFIX}')
+        parsed.append((item.get('id', index), path, query_string))
+    return parsed
+
+
+def _body(response):
+    """The payload of a sub-response: DRF data as is, JSON content decoded"""
+    if hasattr(response, 'data'):
+        return response.data
+    if response.streaming:
+        return {'error': 'Streaming responses cannot be batched'}
+    if response.get('Content-Type', '').startswith('application/json') and response.content:
+        return json.loads(response.content)
+    return None
+
+
+def dispatch(request, request_id, path, query_string):
+    """Run one GET sub-request through its view and describe the response"""
+    label = path + (f'?{query_string}' if query_string else '')
+    sub_request = SubRequest(request._request, path, query_string)
+    # Authenticated once for the whole batch: the view's authenticators are skipped
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    try:
+        try:
+            match = resolve(path)
+        except Resolver404:
+            raise Http404(path)
+        sub_request.resolver_match = match
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Http404:
+        return {'id': request_id, 'path': label, 'status': status.HTTP_404_NOT_FOUND, 'headers': {}, 'body': None}
+    except Exception:
+        logger.exception("Batched request %s failed", label)
+        return {
+            'id': request_id, 'path': label, 'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'headers': {},
+            'body': {'error': 'Internal server error'}
+        }
+
+    body = _body(response)
+    if response.streaming:
+        response.close()
+    return {
+        'id': request_id,
+        'path': label,
+        'status': response.status_code,
+        'headers': {name: response[name] for name in FORWARDED_HEADERS if response.has_header(name)},
+        'body': body
+    }
+
+
+def _dispatch_in_worker(request, request_id, path, query_string):
+    """dispatch() on a pool thread, which opens and closes its own database connection"""
+    close_old_connections()
+    try:
+        return dispatch(request, request_id, path, query_string)
+    finally:
+        close_old_connections()
+
+
+class BatchView(APIView):
+    """
+    Answer several GET API requests in one response.
+
+    Every sub-request still applies its own endpoint's permissions to the
+    batch's user; the batch itself is open to anonymous clients.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        try:
+            batch = parse_batch(request.data)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(batch) == 1:
+            responses = [dispatch(request, *batch[0])]
+        else:
+            executor = get_executor()
+            futures = [executor.submit(_dispatch_in_worker, request, *item) for item in batch]
+            responses = [future.result() for future in futures]
+        return Response({'responses': responses, 'count': len(responses)})
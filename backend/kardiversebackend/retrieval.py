@@ -0,0 +1,57 @@
+"""
+Batch retrieval of objects by id.
+
+Clients rendering collections from stored ids (favorites, recently viewed,
+QR scan history) fetch them all with one request and one IN query instead of
+a detail request per id. Results come back in the requested order, and ids
+that do not exist (or are filtered out) are listed separately.
+"""
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+def parse_ids(value):
+    """Parse a comma separated id list, dropping duplicates but keeping order; raises ValueError"""
+    ids = []
+    for part in value.split(','):
+        part = part.strip()
+        if part:
+            pk = int(part)
+            if pk not in ids:
+                ids.append(pk)
+    return ids
+
+
+class BatchRetrieveMixin:
+    """Adds a `batch` action returning the objects of ?ids=3,1,2 in that order"""
+    # Relations the detail serializer reads, loaded with the batch instead of per object
+    batch_select_related = ()
+    batch_prefetch_related = ()
+
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """Retrieve several objects by id with one query, reporting the ids not found"""
+        try:
+            ids = parse_ids(request.query_params.get('ids', ''))
+        except ValueError:
+            return Response({'error': 'ids must be a comma separated list of integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({'error': 'No ids provided'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > settings.BATCH_RETRIEVE_MAX_IDS:
+            return Response(
+                {'error': f'At most {settings.BATCH_RETRIEVE_MAX_IDS} ids can be retrieved at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.get_queryset().select_related(*self.batch_select_related).prefetch_related(
+            *self.batch_prefetch_related
+        )
+        found = queryset.in_bulk(ids)
+        serializer = self.get_serializer([found[pk] for pk in ids if pk in found], many=True)
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in found],
+            'count': len(serializer.data)
+        })
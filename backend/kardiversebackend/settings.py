@@ -49,10 +49,12 @@ INSTALLED_APPS = [
     'timeline',
     'legacy',
     'wakeroom',
+    'mediastore',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
+    'kardiversebackend.compression.CompressionMiddleware',  # Compresses the fully rendered body, so keep it near the top
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -130,10 +132,38 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Built frontend (`npm run build`), collected into STATIC_ROOT/frontend and served by kardiversebackend/frontend.py
+FRONTEND_DIST_DIR = os.path.join(BASE_DIR.parent, 'frontend', 'dist')
+FRONTEND_ROOT = os.path.join(STATIC_ROOT, 'frontend')
+STATICFILES_DIRS = [('frontend', FRONTEND_DIST_DIR)] if os.path.isdir(FRONTEND_DIST_DIR) else []
+
 # Media files (Uploaded files)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploaded media is stored content-addressed and deduplicated (see mediastore/storage.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'mediastore.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'kardiversebackend.frontend.PrecompressedStaticFilesStorage',
+    },
+}
+
+# Media serving (see kardiversebackend/media.py)
+MEDIA_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # 30 days; revalidated with ETag/Last-Modified
+MEDIA_SENDFILE_BACKEND = os.environ.get('MEDIA_SENDFILE_BACKEND', '')  # '', 'nginx' or 'xsendfile'
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'  # nginx internal location aliased to MEDIA_ROOT
+
+# Static and frontend file serving (kardiversebackend/frontend.py)
+STATIC_CACHE_MAX_AGE = 60 * 60  # Files without a content hash in their name; revalidated with ETag/Last-Modified
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60  # Content-hashed files never change under the same name
+STATIC_IMMUTABLE_PREFIXES = ['frontend/assets/']  # Below STATIC_ROOT
+FRONTEND_IMMUTABLE_PREFIXES = ['assets/']  # Below FRONTEND_ROOT, where Vite writes hashed bundles
+STATIC_COMPRESSION_MIN_SIZE = 256  # Smaller files get no precompressed variants
+STATIC_COMPRESSION_LEVELS = {'gzip': 9, 'br': 11, 'zstd': 19}  # Compressed once at collectstatic, so the maximum
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -157,10 +187,14 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
+        'kardiversebackend.renderers.MessagePackRenderer',
+        'kardiversebackend.renderers.CBORRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
+        'kardiversebackend.renderers.MessagePackParser',
+        'kardiversebackend.renderers.CBORParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
@@ -194,16 +228,105 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'x-chunk-sha256',
 ]
 
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Chunked upload settings (large AR/VR assets, see wakeroom/uploads.py)
+CHUNKED_UPLOAD_DIR = os.path.join(BASE_DIR, 'chunked_uploads')  # Keep on the same filesystem as MEDIA_ROOT
+CHUNKED_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB default part size
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 64 * 1024 * 1024  # 64MB
+CHUNKED_UPLOAD_MAX_SIZE = 4 * 1024 * 1024 * 1024  # 4GB
+CHUNKED_UPLOAD_EXPIRY_HOURS = 48  # Pending uploads older than this are cleaned up
+
+# Background worker pool (kardiversebackend/tasks.py)
+BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', 2))
+BACKGROUND_TASKS_EAGER = False  # Run background jobs synchronously on commit
+
+# 3D asset optimization (wakeroom/meshopt.py)
+MESH_OPTIMIZE_ON_UPLOAD = True  # Generate variants in the background when a glTF asset changes
+MESH_LOD_RATIOS = (0.5, 0.2)  # Triangle fractions of lod1, lod2, ...
+MESH_QUANTIZE = True  # Quantize vertex attributes (KHR_mesh_quantization)
+MESH_MOBILE_VARIANT = 'lod1'  # Variant served to mobile clients by default
+
 # Image processing settings
 PIL_IMAGE_MAX_SIZE = (800, 600)
 PIL_IMAGE_QUALITY = 85
 
+# QR code settings
+QR_CODE_BASE_URL = os.environ.get('QR_CODE_BASE_URL', '')  # Falls back to the request host
+QR_CODE_CACHE_DIR = os.path.join(MEDIA_ROOT, 'qr_cache')
+QR_CODE_CACHE_MAX_AGE = 365 * 24 * 60 * 60  # Rendered images are content-addressed
+
+# Short code resolver (/q/<code>) settings
+MEMORIAL_PAGE_URL = os.environ.get('MEMORIAL_PAGE_URL', '/memorial/{id}')  # Redirect target for scans
+SHORT_CODE_CACHE_SIZE = 4096  # Entries kept in each worker process
+SHORT_CODE_CACHE_TTL = 300  # Seconds before a cached entry is re-read from the database
+SHORT_CODE_MISS_CACHE_SIZE = 1024  # Unknown codes remembered per process, apart from resolved ones
+SHORT_CODE_MISS_CACHE_TTL = 60  # Seconds an unknown code is answered without a query
+
+# Aggregated memorial page (memorials/page.py)
+MEMORIAL_PAGE_CACHE_TIMEOUT = 60 * 60  # Assembled payloads are keyed by their version, so they never go stale
+MEMORIAL_PAGE_MAX_AGE = 60  # Browser/CDN freshness before revalidating with the ETag
+
+# Engagement-ranked featured memorials (memorials/ranking.py)
+ENGAGEMENT_WEIGHTS = {'view': 1.0, 'scan': 3.0, 'session': 5.0, 'story': 2.0}  # story: per log(1 + story count)
+ENGAGEMENT_HALF_LIFE_DAYS = 7  # A view, scan or session weighs half as much a week later
+ENGAGEMENT_WINDOW_DAYS = 60  # Older counts weigh under 0.3% and are pruned by the ranking job
+ENGAGEMENT_FLUSH_INTERVAL = 30  # Longest a buffered view or scan count waits before its bulk write
+ENGAGEMENT_FLUSH_MAX_KEYS = 1000  # Buffered (memorial, kind, day) counters that force an earlier write
+FEATURED_COUNT = 6  # Memorials served by /memorials/featured/
+FEATURED_RANKED_COUNT = 30  # Memorials stored by each ranking run
+FEATURED_CACHE_TIMEOUT = 5 * 60  # A new ranking is served by every process within this many seconds
+
+# Fuzzy name search (memorials/names.py)
+NAME_MATCH_CANDIDATES = 200  # Memorials scored per query, picked by shared trigrams/phonetic keys
+NAME_MATCH_MIN_SCORE = 0.3  # Matches scoring below this are dropped
+NAME_MATCH_COMMON_GRAM_SHARE = 0.2  # Postings held by more than this share of memorials do not pick candidates
+
+# Family graph traversal limits
+FAMILY_GRAPH_MAX_DEPTH = 30  # Generations walked by ancestor/descendant queries
+FAMILY_PATH_MAX_DEPTH = 8  # Longest relation path searched between two people
+
+# Anniversary calendar (memorials/anniversaries.py)
+ANNIVERSARY_DIGEST_DAYS = 7  # Days covered by the cached daily digest, today included
+ANNIVERSARY_EMAIL_BATCH_SIZE = 100  # Messages sent per email connection
+ANNIVERSARY_EMAIL_MAX_ATTEMPTS = 3  # Failed messages are retried by later runs up to this many times
+ANNIVERSARY_CONFIRMATION_MAX_AGE = 7 * 24 * 3600  # Seconds a subscription confirmation link stays valid
+
+# Bulk memorial import (memorials/importer.py)
+IMPORT_CHUNK_SIZE = 500  # Records validated and written per transaction
+IMPORT_MEDIA_DIR = os.path.join(BASE_DIR, 'imports')  # Images named in import files are read from here
+IMPORT_MAX_REPORTED_ERRORS = 1000  # Row errors included in an import report
+
+# Streaming exports (kardiversebackend/exports.py)
+EXPORT_CHUNK_SIZE = 2000  # Rows fetched per round trip of the export cursor
+
+# Batch retrieval (kardiversebackend/retrieval.py)
+BATCH_RETRIEVE_MAX_IDS = 100  # Ids accepted by one ?ids= request
+
+# Multiplexed batch requests (kardiversebackend/multiplex.py)
+BATCH_MAX_REQUESTS = 20  # GET sub-requests accepted by one POST /api/v1/batch/
+BATCH_REQUEST_WORKERS = int(os.environ.get('BATCH_REQUEST_WORKERS', 4))  # Sub-requests dispatched concurrently
+
+# Embedded relations (kardiversebackend/includes.py)
+INCLUDE_MAX_ITEMS = 20  # Related rows embedded per parent by a to-many ?include=
+
+# Response compression (kardiversebackend/compression.py); zstd and br need the zstandard and brotli packages
+COMPRESSION_ENCODINGS = ['zstd', 'br', 'gzip']  # Server preference when the client accepts several equally
+COMPRESSION_LEVELS = {'gzip': 6, 'br': 5, 'zstd': 3}
+COMPRESSION_MIN_SIZE = 1024  # Smaller bodies are sent as they are
+COMPRESSION_CACHE_MIN_SIZE = 16 * 1024  # Larger bodies keep their compressed bytes in the cache
+COMPRESSION_CACHE_TIMEOUT = 60 * 60
+
+# Email (the file backend stands in for SMTP locally)
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend')
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'Kardiverse <noreply@kardiverse.com>')
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -0,0 +1,53 @@
+"""
+In-process background worker pool.
+
+Slow post-request work (asset processing, imports) is handed to a shared
+thread pool so requests return immediately. Jobs are queued only once the
+current transaction commits, so a worker never sees rows that were rolled
+back, and each job closes its own database connections when it finishes.
+Set BACKGROUND_TASKS_EAGER to run jobs synchronously instead (management
+commands, debugging).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide worker pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BACKGROUND_WORKERS,
+                thread_name_prefix='kardiverse-worker'
+            )
+        return _executor
+
+
+def _run(func, args, kwargs):
+    """Execute one job, logging failures instead of losing them in the pool"""
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background job %s failed", getattr(func, '__qualname__', func))
+        raise
+    finally:
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """Queue func(*args, **kwargs) on the worker pool once the transaction commits"""
+    if settings.BACKGROUND_TASKS_EAGER:
+        transaction.on_commit(lambda: func(*args, **kwargs))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(_run, func, args, kwargs))
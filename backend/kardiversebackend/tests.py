@@ -0,0 +1,65 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+import brotli
+import zstandard
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+
+class PrecompressedStaticFilesTests(SimpleTestCase):
+    """collectstatic writes a compressed variant of each text-like file for every encoding"""
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+        self.stylesheet = b'.memorial-card { margin: 0 auto; padding: 1rem; }\n' * 40
+        self.write('assets/index-3f2a1b.css', self.stylesheet)
+        self.write('index.html', b'<!doctype html><html><body><div id="root"></div></body></html>\n' * 10)
+        self.write('assets/tiny.js', b'export default 1;\n')
+        self.write('assets/logo.png', os.urandom(2048))
+
+        settings_override = override_settings(
+            STATIC_ROOT=self.root,
+            STATICFILES_DIRS=[('frontend', self.source)],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def write(self, name, content):
+        path = os.path.join(self.source, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(content)
+
+    def collected(self, name):
+        with open(os.path.join(self.root, 'frontend', name), 'rb') as file:
+            return file.read()
+
+    def test_every_variant_is_written(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        decompress = {
+            '.gz': gzip.decompress,
+            '.br': brotli.decompress,
+            '.zst': lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+        }
+        for name in ('assets/index-3f2a1b.css', 'index.html'):
+            original = self.collected(name)
+            for suffix, decompressor in decompress.items():
+                with self.subTest(name=name, suffix=suffix):
+                    self.assertEqual(decompressor(self.collected(name + suffix)), original)
+
+    def test_small_and_binary_files_get_no_variants(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        for name in ('assets/tiny.js', 'assets/logo.png'):
+            for suffix in ('.gz', '.br', '.zst'):
+                with self.subTest(name=name, suffix=suffix):
+                    self.assertFalse(os.path.exists(os.path.join(self.root, 'frontend', name + suffix)))
@@ -14,24 +14,36 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from kardiversebackend.frontend import frontend_route_pattern, serve_frontend, serve_static
+from kardiversebackend.media import serve_media
+from kardiversebackend.multiplex import BatchView
 from rest_framework import routers
 # from rest_framework.documentation import include_docs_urls
 
 # Import ViewSets
-from memorials.views import MemorialViewSet
+from memorials.views import (
+    MemorialViewSet, FamilyTreeViewSet, FamilyPersonViewSet, FamilyRelationshipViewSet,
+    AnniversarySubscriberViewSet,
+    qr_image, resolve_short_code
+)
 from timeline.views import LifePhaseViewSet, TimelineStoryViewSet
 from legacy.views import LegacyLicenseViewSet, LicenseFeatureViewSet, LicensePurchaseViewSet
-from wakeroom.views import WakeRoomExperienceViewSet, WakeRoomSessionViewSet, WakeRoomFeatureViewSet
+from wakeroom.views import WakeRoomExperienceViewSet, WakeRoomSessionViewSet, WakeRoomFeatureViewSet, ChunkedUploadViewSet
 
 # Create router and register ViewSets
 router = routers.DefaultRouter()
 
 # Memorials
 router.register(r'memorials', MemorialViewSet, basename='memorial')
+router.register(r'family/trees', FamilyTreeViewSet, basename='familytree')
+router.register(r'family/people', FamilyPersonViewSet, basename='familyperson')
+router.register(r'family/relationships', FamilyRelationshipViewSet, basename='familyrelationship')
+router.register(r'anniversaries/subscribers', AnniversarySubscriberViewSet, basename='anniversarysubscriber')
 
 # Timeline
 router.register(r'timeline/phases', LifePhaseViewSet, basename='lifephase')
@@ -46,11 +58,17 @@ router.register(r'legacy/purchases', LicensePurchaseViewSet, basename='licensepu
 router.register(r'wakeroom/experiences', WakeRoomExperienceViewSet, basename='wakeroomexperience')
 router.register(r'wakeroom/sessions', WakeRoomSessionViewSet, basename='wakeroomsession')
 router.register(r'wakeroom/features', WakeRoomFeatureViewSet, basename='wakeroomfeature')
+router.register(r'wakeroom/uploads', ChunkedUploadViewSet, basename='chunkedupload')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     
+    # QR scan short codes (kept outside the API for the fast path)
+    path('q/<str:code>', resolve_short_code, name='short-code'),
+    
     # API endpoints
+    path('api/v1/qr/<str:digest>.<str:fmt>', qr_image, name='qr-image'),
+    path('api/v1/batch/', BatchView.as_view(), name='batch'),
     path('api/v1/', include(router.urls)),
     
     # API documentation (temporarily disabled)
@@ -60,7 +78,14 @@ urlpatterns = [
     path('api-auth/', include('rest_framework.urls')),
 ]
 
-# Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+# Serve media files with Range, conditional request and sendfile offload support
+urlpatterns += [
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]
+
+# Serve collected static files and the built frontend, precompressed, with immutable caching of hashed assets
+urlpatterns += [
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), serve_static, name='static'),
+    # Last: every remaining path is a file or a client-side route of the frontend
+    re_path(frontend_route_pattern(), serve_frontend, name='frontend'),
+]
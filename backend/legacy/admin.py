@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import LegacyLicense, LicenseFeature, LicensePurchase
+from .models import LegacyLicense, LicenseFeature, LicensePurchase, LicensePriceChange
+from .services import reprice_licenses
 
 @admin.register(LegacyLicense)
 class LegacyLicenseAdmin(admin.ModelAdmin):
@@ -83,17 +84,19 @@ class LegacyLicenseAdmin(admin.ModelAdmin):
         discount_percentage = request.POST.get('discount_percentage', 33)
         try:
             discount_percentage = int(discount_percentage)
-            updated = 0
-            for license_obj in queryset:
-                if license_obj.original_price:
-                    new_price = license_obj.original_price * (1 - discount_percentage / 100)
-                    license_obj.current_price = round(new_price, 2)
-                    license_obj.save()
-                    updated += 1
+            if not 0 <= discount_percentage <= 100:
+                raise ValueError(discount_percentage)
+            price_change = reprice_licenses(
+                queryset.filter(original_price__gt=0),
+                'discount',
+                discount_percentage,
+                user=request.user,
+                note='Admin discount action'
+            )
             
             self.message_user(
                 request, 
-                f'Discount applied to {updated} license(s).'
+                f'Discount applied to {price_change.license_count} license(s).'
             )
         except ValueError:
             self.message_user(
@@ -217,3 +220,40 @@ class LicensePurchaseAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         """Disable deletion of purchases"""
         return False
+
+@admin.register(LicensePriceChange)
+class LicensePriceChangeAdmin(admin.ModelAdmin):
+    """Admin configuration for LicensePriceChange model"""
+    
+    list_display = [
+        'id', 'change_type', 'value', 'license_count', 'changed_by', 'created_at'
+    ]
+    
+    list_filter = [
+        'change_type', 'created_at'
+    ]
+    
+    search_fields = [
+        'note', 'changed_by__username'
+    ]
+    
+    readonly_fields = [
+        'change_type', 'value', 'license_ids', 'license_count', 'note',
+        'changed_by', 'created_at'
+    ]
+    
+    ordering = ['-created_at']
+    
+    list_per_page = 25
+    
+    def get_queryset(self, request):
+        """Custom queryset with optimized queries"""
+        return super().get_queryset(request).select_related('changed_by')
+    
+    def has_add_permission(self, request):
+        """Price changes are recorded by the repricing service only"""
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        """Disable deletion of price history"""
+        return False
@@ -141,3 +141,29 @@ class LicensePurchase(models.Model):
     
     def __str__(self):
         return f"{self.purchaser.username} - {self.license} - {self.purchase_date}"
+
+class LicensePriceChange(models.Model):
+    """Audit record for a batch repricing of legacy licenses"""
+    CHANGE_TYPES = [
+        ('discount', 'Percentage Off Original Price'),
+        ('percentage', 'Percentage Change'),
+        ('absolute', 'Absolute Change'),
+    ]
+    
+    change_type = models.CharField(max_length=20, choices=CHANGE_TYPES)
+    value = models.DecimalField(max_digits=10, decimal_places=2)
+    license_ids = models.JSONField(default=list)  # Primary keys of repriced licenses
+    license_count = models.PositiveIntegerField(default=0)
+    note = models.CharField(max_length=200, blank=True)
+    
+    # Metadata
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='license_price_changes')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'License Price Change'
+        verbose_name_plural = 'License Price Changes'
+    
+    def __str__(self):
+        return f"{self.get_change_type_display()} {self.value} on {self.license_count} license(s)"
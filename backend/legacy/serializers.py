@@ -1,9 +1,12 @@
 from rest_framework import serializers
-from .models import LegacyLicense, LicenseFeature, LicensePurchase
+from kardiversebackend.fieldsets import SparseFieldsMixin
+from .models import LegacyLicense, LicenseFeature, LicensePurchase, LicensePriceChange
 
-class LicenseFeatureSerializer(serializers.ModelSerializer):
+class LicenseFeatureSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for LicenseFeature model"""
-    icon_component = serializers.CharField(read_only=True)
+    icon_component = serializers.CharField(source='get_icon_component', read_only=True)
+    
+    field_dependencies = {'icon_component': ['icon_name']}
     
     class Meta:
         model = LicenseFeature
@@ -12,14 +15,8 @@ class LicenseFeatureSerializer(serializers.ModelSerializer):
             'is_active', 'category'
         ]
         read_only_fields = ['id']
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['icon_component'] = instance.get_icon_component()
-        return data
 
-class LegacyLicenseSerializer(serializers.ModelSerializer):
+class LegacyLicenseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for LegacyLicense model"""
     features_display = serializers.CharField(read_only=True)
     price_display = serializers.CharField(read_only=True)
@@ -27,6 +24,8 @@ class LegacyLicenseSerializer(serializers.ModelSerializer):
     is_available = serializers.BooleanField(read_only=True)
     remaining_licenses = serializers.SerializerMethodField()
     
+    field_dependencies = {'is_available': ['status'], 'remaining_licenses': []}
+    
     class Meta:
         model = LegacyLicense
         fields = [
@@ -43,20 +42,18 @@ class LegacyLicenseSerializer(serializers.ModelSerializer):
         ]
     
     def get_remaining_licenses(self, obj):
-        """Return count of remaining available licenses"""
-        return LegacyLicense.objects.filter(status='available').count()
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['is_available'] = instance.is_available()
-        return data
+        """Return count of remaining available licenses, counted once per response"""
+        if 'remaining_licenses' not in self.context:
+            self.context['remaining_licenses'] = LegacyLicense.objects.filter(status='available').count()
+        return self.context['remaining_licenses']
 
-class LegacyLicenseListSerializer(serializers.ModelSerializer):
+class LegacyLicenseListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Simplified serializer for legacy license lists"""
     price_display = serializers.CharField(read_only=True)
     is_available = serializers.BooleanField(read_only=True)
     
+    field_dependencies = {'is_available': ['status']}
+    
     class Meta:
         model = LegacyLicense
         fields = [
@@ -64,12 +61,6 @@ class LegacyLicenseListSerializer(serializers.ModelSerializer):
             'price_display', 'is_discounted', 'discount_percentage', 'features',
             'lifetime_guarantee', 'is_available', 'created_at'
         ]
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['is_available'] = instance.is_available()
-        return data
 
 class LegacyLicenseCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new legacy licenses"""
@@ -99,7 +90,7 @@ class LegacyLicenseUpdateSerializer(serializers.ModelSerializer):
             'family_members_limit', 'lifetime_guarantee'
         ]
 
-class LicensePurchaseSerializer(serializers.ModelSerializer):
+class LicensePurchaseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for LicensePurchase model"""
     license_details = LegacyLicenseSerializer(source='license', read_only=True)
     purchaser_name = serializers.CharField(source='purchaser.username', read_only=True)
@@ -145,4 +136,38 @@ class LicenseStatisticsSerializer(serializers.Serializer):
     total_revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
     average_price = serializers.DecimalField(max_digits=10, decimal_places=2)
     licenses_by_type = serializers.DictField()
-    recent_purchases = serializers.ListField() 
\ No newline at end of file
+    recent_purchases = serializers.ListField()
+
+class LicensePriceChangeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer for LicensePriceChange model"""
+    changed_by_name = serializers.CharField(source='changed_by.username', read_only=True)
+    
+    class Meta:
+        model = LicensePriceChange
+        fields = [
+            'id', 'change_type', 'value', 'license_ids', 'license_count', 'note',
+            'changed_by', 'changed_by_name', 'created_at'
+        ]
+        read_only_fields = fields
+
+class LicenseRepriceSerializer(serializers.Serializer):
+    """Serializer for validating bulk repricing requests"""
+    change_type = serializers.ChoiceField(choices=LicensePriceChange.CHANGE_TYPES)
+    value = serializers.DecimalField(max_digits=10, decimal_places=2)
+    license_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    license_type = serializers.ChoiceField(choices=LegacyLicense.LICENSE_TYPES, required=False)
+    status = serializers.ChoiceField(choices=LegacyLicense.STATUS_CHOICES, required=False)
+    all = serializers.BooleanField(required=False, default=False)  # Explicitly reprice every license
+    note = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    
+    def validate(self, data):
+        """Validate the license selection and the change value against the change type"""
+        if not data['all'] and not any(key in data for key in ('license_ids', 'license_type', 'status')):
+            raise serializers.ValidationError(
+                "Select licenses with license_ids, license_type or status, or set all to reprice every license"
+            )
+        if data['change_type'] == 'discount' and not 0 <= data['value'] <= 100:
+            raise serializers.ValidationError("Discount must be between 0 and 100 percent")
+        if data['change_type'] == 'percentage' and data['value'] < -100:
+            raise serializers.ValidationError("Percentage change cannot be below -100")
+        return data
@@ -0,0 +1,86 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import BooleanField, Case, DecimalField, ExpressionWrapper, F, IntegerField, Value, When
+from django.db.models.functions import Cast, Greatest, Round
+from django.utils import timezone
+
+from .models import LegacyLicense, LicensePriceChange
+
+PRICE_FIELD = DecimalField(max_digits=10, decimal_places=2)
+
+
+def _new_price_expression(change_type, value):
+    """Build the SQL expression for the repriced current_price"""
+    if change_type == 'discount':
+        # Percentage off the original price, as the admin action always did
+        price = F('original_price') * Value((Decimal('100') - value) / Decimal('100'))
+    elif change_type == 'percentage':
+        price = F('current_price') * Value((Decimal('100') + value) / Decimal('100'))
+    elif change_type == 'absolute':
+        price = F('current_price') + Value(value)
+    else:
+        raise ValueError(f"Invalid change type: {change_type}")
+
+    price = ExpressionWrapper(price, output_field=PRICE_FIELD)
+    return Greatest(Round(price, 2), Value(Decimal('0.00')), output_field=PRICE_FIELD)
+
+
+def reprice_licenses(queryset, change_type, value, user=None, note=''):
+    """
+    Reprice every license in the queryset with a single UPDATE.
+
+    The derived discount_percentage and is_discounted columns are recomputed in
+    the same statement (mirroring LegacyLicense.save), and a LicensePriceChange
+    row is recorded for the batch. Everything runs in one transaction.
+    """
+    value = Decimal(str(value))
+    new_price = _new_price_expression(change_type, value)
+
+    # Every right-hand side of an UPDATE sees the old row, so the derived
+    # columns are computed from the new price expression, not current_price.
+    discount_percentage = Case(
+        When(
+            original_price__gt=0,
+            then=Greatest(
+                Cast(
+                    Round((F('original_price') - new_price) * Value(100) / F('original_price')),
+                    IntegerField()
+                ),
+                Value(0)
+            )
+        ),
+        default=F('discount_percentage'),
+        output_field=IntegerField()
+    )
+    is_discounted = Case(
+        When(original_price__lte=0, then=F('is_discounted')),
+        When(original_price__gt=new_price, then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField()
+    )
+
+    with transaction.atomic():
+        license_ids = list(
+            queryset.select_for_update().order_by('pk').values_list('pk', flat=True)
+        )
+        updated = 0
+        if license_ids:
+            updated = LegacyLicense.objects.filter(pk__in=license_ids).update(
+                current_price=new_price,
+                discount_percentage=discount_percentage,
+                is_discounted=is_discounted,
+                # update() bypasses auto_now
+                updated_at=timezone.now(),
+            )
+
+        price_change = LicensePriceChange.objects.create(
+            change_type=change_type,
+            value=value,
+            license_ids=license_ids,
+            license_count=updated,
+            note=note,
+            changed_by=user if user is not None and user.is_authenticated else None,
+        )
+
+    return price_change
@@ -2,19 +2,24 @@ from django.shortcuts import render
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Count, Avg, Sum
 from django.contrib.auth.models import User
 
-from .models import LegacyLicense, LicenseFeature, LicensePurchase
+from kardiversebackend.exports import StreamingExportMixin
+from kardiversebackend.fieldsets import SparseFieldsViewMixin
+from kardiversebackend.renderers import NativeTypesViewMixin
+from .models import LegacyLicense, LicenseFeature, LicensePurchase, LicensePriceChange
 from .serializers import (
     LegacyLicenseSerializer, LegacyLicenseListSerializer, LegacyLicenseCreateSerializer,
     LegacyLicenseUpdateSerializer, LicenseFeatureSerializer, LicensePurchaseSerializer,
-    LicensePurchaseCreateSerializer, LicenseStatisticsSerializer
+    LicensePurchaseCreateSerializer, LicenseStatisticsSerializer,
+    LicensePriceChangeSerializer, LicenseRepriceSerializer
 )
+from .services import reprice_licenses
 
-class LegacyLicenseViewSet(viewsets.ModelViewSet):
+class LegacyLicenseViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for LegacyLicense model providing CRUD operations and additional actions.
     """
@@ -217,13 +222,53 @@ class LegacyLicenseViewSet(viewsets.ModelViewSet):
         serializer = LicenseStatisticsSerializer(data)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def reprice(self, request):
+        """Apply a percentage or absolute price change to a batch of licenses"""
+        serializer = LicenseRepriceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        
+        licenses = LegacyLicense.objects.all()
+        if 'license_ids' in params:
+            licenses = licenses.filter(pk__in=params['license_ids'])
+        if 'license_type' in params:
+            licenses = licenses.filter(license_type=params['license_type'])
+        if 'status' in params:
+            licenses = licenses.filter(status=params['status'])
+        
+        price_change = reprice_licenses(
+            licenses,
+            params['change_type'],
+            params['value'],
+            user=request.user,
+            note=params.get('note', '')
+        )
+        return Response({
+            'message': f'Repriced {price_change.license_count} license(s)',
+            'price_change': LicensePriceChangeSerializer(price_change, context={'request': request}).data
+        })
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def price_changes(self, request):
+        """Get the history of batch price changes"""
+        price_changes = LicensePriceChange.objects.select_related('changed_by')
+        
+        page = self.paginate_queryset(price_changes)
+        if page is not None:
+            serializer = LicensePriceChangeSerializer(page, many=True, context={'request': request})
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = LicensePriceChangeSerializer(price_changes, many=True, context={'request': request})
+        return Response(serializer.data)
+    
     @action(detail=False, methods=['get'])
     def remaining_count(self, request):
         """Get count of remaining available licenses"""
         remaining = LegacyLicense.objects.filter(status='available').count()
         return Response({'remaining_licenses': remaining})
 
-class LicenseFeatureViewSet(viewsets.ModelViewSet):
+class LicenseFeatureViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for LicenseFeature model.
     """
@@ -248,10 +293,11 @@ class LicenseFeatureViewSet(viewsets.ModelViewSet):
         
         return Response(data)
 
-class LicensePurchaseViewSet(viewsets.ModelViewSet):
+class LicensePurchaseViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, StreamingExportMixin, viewsets.ModelViewSet):
     """
     ViewSet for LicensePurchase model.
     """
+    export_name = 'license_purchases'
     queryset = LicensePurchase.objects.all()
     serializer_class = LicensePurchaseSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -260,6 +306,7 @@ class LicensePurchaseViewSet(viewsets.ModelViewSet):
     search_fields = ['transaction_id', 'purchaser__username']
     ordering_fields = ['purchase_date', 'amount_paid']
     ordering = ['-purchase_date']
+    sparse_fields_actions = ('list', 'retrieve', 'by_user')
     
     def get_serializer_class(self):
         """Return appropriate serializer class based on action"""
@@ -278,7 +325,7 @@ class LicensePurchaseViewSet(viewsets.ModelViewSet):
             )
         
         purchases = self.get_queryset().filter(purchaser_id=user_id)
-        serializer = LicensePurchaseSerializer(purchases, many=True, context={'request': request})
+        serializer = self.get_serializer(purchases, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
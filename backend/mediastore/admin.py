@@ -0,0 +1,34 @@
+from django.contrib import admin
+from .models import MediaBlob
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    """Admin configuration for MediaBlob model"""
+    
+    list_display = [
+        'name', 'size', 'ref_count', 'created_at'
+    ]
+    
+    list_filter = [
+        'created_at'
+    ]
+    
+    search_fields = [
+        'sha256', 'name'
+    ]
+    
+    readonly_fields = [
+        'sha256', 'name', 'size', 'ref_count', 'derivatives', 'created_at', 'updated_at'
+    ]
+    
+    ordering = ['-created_at']
+    
+    list_per_page = 50
+    
+    def has_add_permission(self, request):
+        """Blobs are created by the storage backend only"""
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        """Blobs are removed by reference counting and gc_media only"""
+        return False
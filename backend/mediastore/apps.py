@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class MediastoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'mediastore'
+    verbose_name = 'Media Store'
+    
+    def ready(self):
+        """Import signals when app is ready"""
+        try:
+            import mediastore.signals
+        except ImportError:
+            pass
@@ -0,0 +1,50 @@
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+
+from mediastore.models import MediaBlob
+from mediastore.references import file_fields
+from mediastore.storage import BLOB_PREFIX
+
+
+class Command(BaseCommand):
+    help = 'Move existing media files into the content-addressed blob store, deduplicating identical files'
+
+    def handle(self, *args, **options):
+        blob_bytes_before = sum(MediaBlob.objects.values_list('size', flat=True))
+        migrated = {}  # legacy name -> blob name, for legacy files shared by several rows
+        moved = missing = 0
+        legacy_bytes = 0
+
+        for model, field in file_fields():
+            storage = field.storage
+            rows = model._base_manager.exclude(**{field.name: ''}).exclude(
+                **{f"{field.name}__isnull": True}
+            ).exclude(**{f"{field.name}__startswith": BLOB_PREFIX}).values_list('pk', field.name)
+
+            for pk, name in rows.iterator(chunk_size=500):
+                if name in migrated:
+                    new_name = migrated[name]
+                    storage.add_reference(new_name)
+                else:
+                    path = storage.path(name)
+                    if not os.path.exists(path):
+                        missing += 1
+                        self.stderr.write(f'Missing file for {model.__name__} #{pk}: {name}')
+                        continue
+                    legacy_bytes += os.path.getsize(path)
+                    with storage.open(name) as legacy_file:
+                        new_name = storage.save(name, legacy_file)
+                    # Remove the legacy copy directly; it is not a blob and has no reference count
+                    FileSystemStorage.delete(storage, name)
+                    migrated[name] = new_name
+
+                model._base_manager.filter(pk=pk).update(**{field.name: new_name})
+                moved += 1
+
+        blob_bytes_added = sum(MediaBlob.objects.values_list('size', flat=True)) - blob_bytes_before
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} file reference(s) from {len(migrated)} file(s) into the blob store; '
+            f'{legacy_bytes - blob_bytes_added} byte(s) reclaimed, {missing} missing file(s).'
+        ))
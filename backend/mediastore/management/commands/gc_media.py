@@ -0,0 +1,42 @@
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+
+from mediastore.models import MediaBlob
+from mediastore.references import count_references, file_fields
+
+
+class Command(BaseCommand):
+    help = 'Recount media blob references from all file fields and delete unreferenced blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report changes without applying them')
+
+    def handle(self, *args, **options):
+        fields = file_fields()
+        if not fields:
+            self.stdout.write('No file fields use content-addressed storage.')
+            return
+        storage = fields[0][1].storage
+        counts = count_references()
+
+        corrected = deleted = reclaimed = 0
+        for blob in MediaBlob.objects.iterator(chunk_size=2000):
+            ref_count = counts.get(blob.name, 0)
+            if ref_count == blob.ref_count and ref_count:
+                continue
+            if ref_count == 0:
+                deleted += 1
+                reclaimed += blob.size
+                if not options['dry_run']:
+                    blob.delete()
+                    FileSystemStorage.delete(storage, blob.name)
+            else:
+                corrected += 1
+                if not options['dry_run']:
+                    MediaBlob.objects.filter(pk=blob.pk).update(ref_count=ref_count)
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Corrected {corrected} reference count(s); deleted {deleted} unreferenced blob(s) '
+            f'({reclaimed} bytes).'
+        ))
@@ -0,0 +1,33 @@
+from django.db import models
+
+# Create your models here.
+
+class MediaBlob(models.Model):
+    """A unique piece of uploaded content stored once under its SHA-256"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)  # Storage name, e.g. "blobs/ab/cd/<sha256>.jpg"
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)  # Number of file fields pointing at this blob
+    
+    # Derived variants (e.g. resized images) keyed by variant name -> blob storage name; holds no references
+    derivatives = models.JSONField(default=dict, blank=True)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Media Blob'
+        verbose_name_plural = 'Media Blobs'
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} reference{'s' if self.ref_count != 1 else ''})"
+    
+    def get_size_display(self):
+        """Return a human readable size"""
+        size = float(self.size)
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if size < 1024 or unit == 'GB':
+                return f"{size:.1f} {unit}" if unit != 'B' else f"{int(size)} B"
+            size /= 1024
@@ -0,0 +1,69 @@
+"""
+Helpers for finding every file field reference to stored media, used to keep
+blob reference counts honest.
+"""
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db.models import FileField
+
+from .models import MediaBlob
+from .storage import ContentAddressedStorage, is_blob_name
+
+
+def file_fields():
+    """Return (model, field) for every concrete FileField/ImageField using content-addressed storage"""
+    fields = []
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage):
+                fields.append((model, field))
+    return fields
+
+
+def count_references():
+    """Count how many field values point at each blob name"""
+    counts = Counter()
+    for model, field in file_fields():
+        names = model._base_manager.exclude(**{field.name: ''}).exclude(
+            **{f"{field.name}__isnull": True}
+        ).values_list(field.name, flat=True)
+        counts.update(name for name in names.iterator(chunk_size=2000) if is_blob_name(name))
+    return counts
+
+
+def get_or_create_derivative(storage, name, variant, render):
+    """
+    Return the storage name of a derived variant (e.g. a resized image) of name.
+
+    The variant is rendered at most once per stored blob: the result is
+    remembered on the source MediaBlob and reused for every other field that
+    holds the same content. render(path) returns (bytes, extension), or None
+    when the source can be used unchanged. A derived name returned here
+    carries a new reference owned by the caller. The memo itself holds no
+    references: it is dropped with the source blob, and an entry whose
+    derived blob has since been released is rendered again.
+    """
+    blob = MediaBlob.objects.filter(name=name).first() if is_blob_name(name) else None
+    if blob is not None and variant in blob.derivatives:
+        derived_name = blob.derivatives[variant]
+        if derived_name == name:
+            return name
+        if MediaBlob.objects.filter(name=derived_name).exists():
+            storage.add_reference(derived_name)
+            return derived_name
+        # The derived blob has been released since; render it again
+        blob.derivatives.pop(variant)
+
+    output = render(storage.path(name))
+    if output is None:
+        derived_name = name
+    else:
+        data, extension = output
+        derived_name = storage.save(f"derived{extension}", ContentFile(data))
+
+    if blob is not None:
+        derivatives = dict(blob.derivatives, **{variant: derived_name})
+        MediaBlob.objects.filter(pk=blob.pk).update(derivatives=derivatives)
+    return derived_name
@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .storage import ContentAddressedStorage, is_blob_name
+
+_blob_fields = {}
+
+
+def blob_fields(model):
+    """Return the concrete fields of a model that store content-addressed blobs"""
+    fields = _blob_fields.get(model)
+    if fields is None:
+        fields = _blob_fields[model] = [
+            field for field in model._meta.concrete_fields
+            if isinstance(getattr(field, 'storage', None), ContentAddressedStorage)
+        ]
+    return fields
+
+
+def _saved_fields(sender, update_fields):
+    return [field for field in blob_fields(sender) if update_fields is None or field.name in update_fields]
+
+
+def _field_name(instance, field):
+    name = getattr(instance, field.attname)
+    return getattr(name, 'name', name) or ''
+
+
+@receiver(pre_save)
+def note_stored_blob_names(sender, instance, update_fields=None, **kwargs):
+    """Read the names a row's file fields hold before the save replaces them"""
+    fields = _saved_fields(sender, update_fields)
+    if not fields:
+        return
+    # The field commits these to storage, which takes a new reference even for identical content
+    instance._uploading_blob_fields = {
+        field.attname for field in fields
+        if not getattr(getattr(instance, field.attname), '_committed', True)
+    }
+    instance._stored_blob_names = {}
+    if not instance._state.adding and instance.pk is not None:
+        # Read from the row rather than the instance, which may have been loaded long ago or deferred
+        instance._stored_blob_names = sender._base_manager.filter(pk=instance.pk).values(
+            *[field.attname for field in fields]
+        ).first() or {}
+
+
+@receiver(post_save)
+def release_replaced_blobs(sender, instance, update_fields=None, **kwargs):
+    """Release the blob references of files a saved row no longer points at"""
+    fields = _saved_fields(sender, update_fields)
+    if not fields:
+        return
+    stored = instance.__dict__.pop('_stored_blob_names', {})
+    uploaded = instance.__dict__.pop('_uploading_blob_fields', set())
+    for field in fields:
+        old_name = stored.get(field.attname)
+        if is_blob_name(old_name) and (old_name != _field_name(instance, field) or field.attname in uploaded):
+            # Released once the new name is committed, so a rolled back save keeps its file
+            transaction.on_commit(lambda old_name=old_name, storage=field.storage: storage.delete(old_name))
+
+
+@receiver(post_delete)
+def release_blob_references(sender, instance, **kwargs):
+    """Release the blob references held by a deleted row's file fields"""
+    for field in blob_fields(sender):
+        name = _field_name(instance, field)
+        if is_blob_name(name):
+            field.storage.delete(name)
@@ -0,0 +1,124 @@
+"""
+Content-addressed storage backend.
+
+Uploads are hashed while they are streamed to a temporary file and stored
+once under blobs/<aa>/<bb>/<sha256><ext>. Saving content that already exists
+only bumps the blob's reference count, so every FileField/ImageField holding
+the same bytes points at the same file. Deleting a blob name releases one
+reference and removes the file when the last one goes.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+BLOB_PREFIX = 'blobs/'
+HASH_BLOCK_SIZE = 256 * 1024
+
+
+def blob_name(sha256, original_name):
+    """Return the storage name for content with the given digest"""
+    extension = os.path.splitext(original_name)[1].lower()[:10]
+    return f"{BLOB_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def is_blob_name(name):
+    """Check whether a storage name refers to a content-addressed blob"""
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that deduplicates identical uploads"""
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save, never suffixed
+        return name
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as source:
+            for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _stage(self, content):
+        """Stream content to a temporary file in the blob directory, hashing as it goes"""
+        directory = self.path(BLOB_PREFIX)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                if hasattr(content, 'seek') and content.seekable():
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp_file.write(chunk)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest()
+
+    def _save(self, name, content):
+        from .models import MediaBlob
+
+        if hasattr(content, 'temporary_file_path'):
+            # Already on disk (large uploads): hash in place, unless the producer already did, and move
+            source_path = content.temporary_file_path()
+            sha256 = getattr(content, 'content_sha256', None) or self._hash_file(source_path)
+            staged_path = None
+        else:
+            staged_path, sha256 = self._stage(content)
+            source_path = staged_path
+
+        name = blob_name(sha256, name)
+        full_path = self.path(name)
+        try:
+            with transaction.atomic():
+                blob, created = MediaBlob.objects.select_for_update().get_or_create(
+                    sha256=sha256,
+                    defaults={'name': name, 'size': os.path.getsize(source_path), 'ref_count': 1}
+                )
+                if not created:
+                    MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+                    name = blob.name
+                    full_path = self.path(name)
+                if not os.path.exists(full_path):
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    file_move_safe(source_path, full_path, allow_overwrite=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(full_path, self.file_permissions_mode)
+                    staged_path = None
+        finally:
+            if staged_path and os.path.exists(staged_path):
+                os.unlink(staged_path)
+        return name
+
+    def add_reference(self, name):
+        """Record one more field pointing at an existing blob"""
+        from .models import MediaBlob
+
+        if is_blob_name(name):
+            MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    def delete(self, name):
+        """Release one reference to a blob, removing the file with the last one"""
+        from .models import MediaBlob
+
+        if not is_blob_name(name):
+            return super().delete(name)
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                return super().delete(name)
+            if blob.ref_count > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return
+            # Its derivative memo goes with it; derived blobs live on only while fields reference them
+            blob.delete()
+        super().delete(name)
@@ -0,0 +1,155 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from memorials import models as memorial_models
+from memorials.models import Memorial
+from timeline.models import LifePhase, TimelineStory
+
+from .models import MediaBlob
+from .references import count_references
+
+
+def jpeg(size=(2400, 1800), color=(120, 80, 40)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class BlobReferenceTests(TestCase):
+    """Reference counts of content-addressed blobs across uploads, replacements and deletes"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.memorial = Memorial.objects.create(
+            name='Ada Example', dates='1900 - 1980', religion='Christian', description='A life.'
+        )
+        self.phase = LifePhase.objects.create(
+            phase='Birth & Childhood', age_range='0-12 years', icon_name='Baby', color_class='bg-blue-50',
+            icon_color_class='text-blue-600', description='Early years', spiritual_aspect='Innocence'
+        )
+
+    def story(self, content, name='photo.jpg'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return TimelineStory.objects.create(
+                memorial=self.memorial, life_phase=self.phase, title='Story', content='Text',
+                image=SimpleUploadedFile(name, content, content_type='image/jpeg')
+            )
+
+    def ref_count(self, name):
+        return MediaBlob.objects.get(name=name).ref_count
+
+    def assertCountsMatchReferences(self):
+        counts = count_references()
+        for blob in MediaBlob.objects.all():
+            self.assertEqual(blob.ref_count, counts[blob.name], blob.name)
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.story(jpeg((40, 30)), 'a.jpg')
+        second = self.story(jpeg((40, 30)), 'b.jpg')
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(MediaBlob.objects.count(), 1)
+        self.assertEqual(self.ref_count(first.image.name), 2)
+        self.assertCountsMatchReferences()
+
+    def test_replacing_a_file_releases_the_old_blob(self):
+        story = self.story(jpeg((40, 30)))
+        old_name = story.image.name
+
+        story.image = SimpleUploadedFile('new.jpg', jpeg((40, 30), color=(0, 0, 0)), content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            story.save()
+
+        self.assertNotEqual(story.image.name, old_name)
+        self.assertFalse(MediaBlob.objects.filter(name=old_name).exists())
+        self.assertFalse(story.image.storage.exists(old_name))
+        self.assertEqual(self.ref_count(story.image.name), 1)
+
+    def test_replacing_through_a_stale_instance_releases_the_stored_blob(self):
+        story = self.story(jpeg((40, 30)))
+        stale = TimelineStory.objects.get(pk=story.pk)
+        story.image = SimpleUploadedFile('new.jpg', jpeg((40, 30), color=(0, 0, 0)), content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            story.save()
+        replaced_name = story.image.name
+
+        stale.image = SimpleUploadedFile('other.jpg', jpeg((40, 30), color=(9, 9, 9)), content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            stale.save()
+
+        self.assertFalse(MediaBlob.objects.filter(name=replaced_name).exists())
+        self.assertEqual(list(MediaBlob.objects.values_list('name', flat=True)), [stale.image.name])
+
+    def test_reuploading_identical_content_keeps_one_reference(self):
+        story = self.story(jpeg((40, 30)))
+
+        story.image = SimpleUploadedFile('again.jpg', jpeg((40, 30)), content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            story.save()
+
+        self.assertEqual(self.ref_count(story.image.name), 1)
+
+    def test_saving_without_changes_keeps_the_reference(self):
+        story = self.story(jpeg((40, 30)))
+        with self.captureOnCommitCallbacks(execute=True):
+            TimelineStory.objects.get(pk=story.pk).save()
+            TimelineStory.objects.defer('image').get(pk=story.pk).save()
+
+        self.assertEqual(self.ref_count(story.image.name), 1)
+
+    def test_deleting_rows_releases_references(self):
+        first = self.story(jpeg((40, 30)), 'a.jpg')
+        second = self.story(jpeg((40, 30)), 'b.jpg')
+        name = first.image.name
+
+        first.delete()
+        self.assertEqual(self.ref_count(name), 1)
+        second.delete()
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+        self.assertFalse(second.image.storage.exists(name))
+
+    def test_resized_variant_is_shared_while_the_upload_is_referenced(self):
+        content = jpeg()
+        story = self.story(content)
+        memorials = []
+        with mock.patch.object(memorial_models, 'render_web_image', wraps=memorial_models.render_web_image) as render:
+            for _ in range(2):
+                memorial = Memorial(name='Ben Example', dates='1900 - 1980', religion='Christian', description='A life.')
+                memorial.image.save('portrait.jpg', ContentFile(content), save=False)
+                with self.captureOnCommitCallbacks(execute=True):
+                    memorial.save()
+                memorials.append(memorial)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(memorials[0].image.name, memorials[1].image.name)
+        self.assertEqual(self.ref_count(story.image.name), 1)
+        self.assertEqual(self.ref_count(memorials[0].image.name), 2)
+        self.assertCountsMatchReferences()
+
+    def test_original_and_resized_variant_go_with_the_last_reference(self):
+        content = jpeg()
+        story = self.story(content)
+        memorial = Memorial(name='Ben Example', dates='1900 - 1980', religion='Christian', description='A life.')
+        memorial.image.save('portrait.jpg', ContentFile(content), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            memorial.save()
+        original_name, resized_name = story.image.name, memorial.image.name
+        self.assertEqual(list(MediaBlob.objects.get(name=original_name).derivatives.values()), [resized_name])
+
+        story.delete()
+        memorial.delete()
+
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(story.image.storage.exists(original_name))
+        self.assertFalse(story.image.storage.exists(resized_name))
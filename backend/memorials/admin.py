@@ -1,5 +1,13 @@
 from django.contrib import admin
-from .models import Memorial
+
+from kardiversebackend.tasks import run_in_background
+from .models import (
+    AnniversaryNotification, AnniversarySubscriber, FamilyPerson, FamilyRelationship, FamilyTree, FeaturedMemorial,
+    Memorial
+)
+from .anniversaries import invalidate_digest
+from .qr import qr_content, warm_qr_cache
+from .shortcodes import missing_short_code_cache, short_code_cache
 
 @admin.register(Memorial)
 class MemorialAdmin(admin.ModelAdmin):
@@ -22,7 +30,7 @@ class MemorialAdmin(admin.ModelAdmin):
     list_editable = ['is_active', 'qr_code']
     
     readonly_fields = [
-        'created_at', 'updated_at', 'qr_code_data'
+        'created_at', 'updated_at', 'qr_code_data', 'short_code'
     ]
     
     fieldsets = (
@@ -36,7 +44,7 @@ class MemorialAdmin(admin.ModelAdmin):
             'fields': ('categories', 'family_members', 'achievements')
         }),
         ('Media & Technology', {
-            'fields': ('image', 'qr_code', 'qr_code_data')
+            'fields': ('image', 'qr_code', 'qr_code_data', 'short_code')
         }),
         ('Status & Metadata', {
             'fields': ('is_active', 'created_at', 'updated_at')
@@ -54,6 +62,9 @@ class MemorialAdmin(admin.ModelAdmin):
     def activate_memorials(self, request, queryset):
         """Activate selected memorials"""
         updated = queryset.update(is_active=True)
+        short_code_cache.clear()
+        missing_short_code_cache.clear()
+        invalidate_digest()
         self.message_user(
             request, 
             f'{updated} memorial(s) were successfully activated.'
@@ -63,6 +74,9 @@ class MemorialAdmin(admin.ModelAdmin):
     def deactivate_memorials(self, request, queryset):
         """Deactivate selected memorials"""
         updated = queryset.update(is_active=False)
+        short_code_cache.clear()
+        missing_short_code_cache.clear()
+        invalidate_digest()
         self.message_user(
             request, 
             f'{updated} memorial(s) were successfully deactivated.'
@@ -70,16 +84,25 @@ class MemorialAdmin(admin.ModelAdmin):
     deactivate_memorials.short_description = "Deactivate selected memorials"
     
     def generate_qr_codes(self, request, queryset):
-        """Generate QR codes for selected memorials"""
+        """Generate QR code data and pre-render QR images for selected memorials"""
         updated = 0
         for memorial in queryset:
             if not memorial.qr_code_data:
                 memorial.save()  # This will trigger QR code generation
                 updated += 1
         
+        contents = [
+            qr_content(memorial.get_qr_code_path(), request)
+            for memorial in queryset.filter(qr_code=True).only('id', 'short_code')
+        ]
+        # Every format and size of every memorial is too slow to render in the request; a
+        # worker thread renders them one by one, as forking a process pool from it is unsafe
+        run_in_background(warm_qr_cache, contents, workers=1)
+        
         self.message_user(
             request, 
-            f'QR codes generated for {updated} memorial(s).'
+            f'QR codes generated for {updated} memorial(s); images of {len(contents)} QR code(s) '
+            f'are being rendered in the background.'
         )
     generate_qr_codes.short_description = "Generate QR codes for selected memorials"
     
@@ -93,3 +116,115 @@ class MemorialAdmin(admin.ModelAdmin):
         if not request.user.is_superuser:
             list_display.remove('created_at')
         return list_display
+
+class FamilyPersonInline(admin.TabularInline):
+    """Inline editing of the people in a family tree"""
+    model = FamilyPerson
+    fields = ['name', 'memorial', 'birth_year', 'death_year']
+    raw_id_fields = ['memorial']
+    extra = 0
+
+@admin.register(FamilyTree)
+class FamilyTreeAdmin(admin.ModelAdmin):
+    """Admin configuration for FamilyTree model"""
+    
+    list_display = ['name', 'memorial', 'graph_version', 'created_at']
+    
+    search_fields = ['name', 'memorial__name']
+    
+    raw_id_fields = ['memorial']
+    
+    readonly_fields = ['graph_version', 'created_at', 'updated_at']
+    
+    inlines = [FamilyPersonInline]
+    
+    def get_queryset(self, request):
+        """Custom queryset with optimized queries"""
+        return super().get_queryset(request).select_related('memorial').defer('graph')
+
+@admin.register(FamilyPerson)
+class FamilyPersonAdmin(admin.ModelAdmin):
+    """Admin configuration for FamilyPerson model"""
+    
+    list_display = ['name', 'tree', 'memorial', 'birth_year', 'death_year']
+    
+    list_filter = ['tree']
+    
+    search_fields = ['name', 'tree__name']
+    
+    raw_id_fields = ['tree', 'memorial']
+    
+    def get_queryset(self, request):
+        """Custom queryset with optimized queries"""
+        return super().get_queryset(request).select_related('tree', 'memorial')
+
+@admin.register(FamilyRelationship)
+class FamilyRelationshipAdmin(admin.ModelAdmin):
+    """Admin configuration for FamilyRelationship model"""
+    
+    list_display = ['from_person', 'relationship_type', 'to_person', 'tree']
+    
+    list_filter = ['relationship_type', 'tree']
+    
+    search_fields = ['from_person__name', 'to_person__name']
+    
+    raw_id_fields = ['from_person', 'to_person']
+    
+    readonly_fields = ['tree', 'created_at']
+    
+    def get_queryset(self, request):
+        """Custom queryset with optimized queries"""
+        return super().get_queryset(request).select_related('tree', 'from_person', 'to_person')
+
+@admin.register(AnniversarySubscriber)
+class AnniversarySubscriberAdmin(admin.ModelAdmin):
+    """Admin configuration for AnniversarySubscriber model"""
+    
+    list_display = ['name', 'email', 'memorial', 'language', 'notify_birth', 'notify_death', 'is_active']
+    
+    list_filter = ['language', 'notify_birth', 'notify_death', 'is_active']
+    
+    search_fields = ['name', 'email', 'memorial__name']
+    
+    raw_id_fields = ['memorial', 'family_person']
+    
+    def get_queryset(self, request):
+        """Custom queryset with optimized queries"""
+        return super().get_queryset(request).select_related('memorial')
+
+@admin.register(AnniversaryNotification)
+class AnniversaryNotificationAdmin(admin.ModelAdmin):
+    """Admin configuration for AnniversaryNotification model"""
+    
+    list_display = ['anniversary_date', 'kind', 'memorial', 'subscriber', 'status', 'attempts', 'sent_at']
+    
+    list_filter = ['status', 'kind', 'anniversary_date']
+    
+    search_fields = ['memorial__name', 'subscriber__name', 'subscriber__email']
+    
+    readonly_fields = [
+        'subscriber', 'memorial', 'kind', 'anniversary_date', 'attempts', 'error', 'sent_at', 'created_at'
+    ]
+    
+    actions = ['retry_notifications']
+    
+    def retry_notifications(self, request, queryset):
+        """Reset failed notifications so the next run sends them again"""
+        updated = queryset.filter(status='failed').update(status='pending', attempts=0, error='')
+        self.message_user(request, f'{updated} notification(s) will be retried on the next run.')
+    retry_notifications.short_description = "Retry failed notifications"
+    
+    def get_queryset(self, request):
+        """Custom queryset with optimized queries"""
+        return super().get_queryset(request).select_related('memorial', 'subscriber')
+
+@admin.register(FeaturedMemorial)
+class FeaturedMemorialAdmin(admin.ModelAdmin):
+    """Admin configuration for FeaturedMemorial model (rewritten by rank_featured_memorials)"""
+    
+    list_display = ['rank', 'memorial', 'score', 'computed_at']
+    
+    readonly_fields = ['rank', 'memorial', 'score', 'computed_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('memorial')
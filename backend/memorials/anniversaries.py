@@ -0,0 +1,162 @@
+"""
+Birth and death anniversaries.
+
+Every exact birth/death date is stored as a day of the year on a fixed leap
+year calendar (Feb 29 is always 60, Mar 1 always 61), so "whose anniversary
+falls in the next N days" becomes at most two range scans of an indexed
+column, even when the window wraps into the next year. In common years
+February 29 anniversaries are observed on February 28.
+
+The daily digest shown to families and partner congregations is built once
+per day and then served from the cache.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+# Reference leap year giving every month/day a stable ordinal
+_CALENDAR_YEAR = 2000
+
+LEAP_DAY = 60
+
+ANNIVERSARY_KINDS = {
+    'birth': ('birth_day', 'birth_date'),
+    'death': ('death_day', 'death_date'),
+}
+
+DIGEST_CACHE_KEY = 'memorials:anniversary-digest:{date}'
+
+
+def day_of_year(value):
+    """Return the anniversary day (1-366) of a date, or None"""
+    if value is None:
+        return None
+    return datetime.date(_CALENDAR_YEAR, value.month, value.day).timetuple().tm_yday
+
+
+def _is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def window_days(start, days):
+    """Map each anniversary day in the window starting at start to the date it is observed on"""
+    observed = {}
+    for offset in range(days):
+        current = start + datetime.timedelta(days=offset)
+        observed.setdefault(day_of_year(current), current)
+        if current.month == 2 and current.day == 28 and not _is_leap(current.year):
+            observed.setdefault(LEAP_DAY, current)
+    return observed
+
+
+def _ranges(ordinals):
+    """Collapse a set of day ordinals into inclusive (first, last) runs"""
+    runs = []
+    for ordinal in sorted(ordinals):
+        if runs and ordinal == runs[-1][1] + 1:
+            runs[-1][1] = ordinal
+        else:
+            runs.append([ordinal, ordinal])
+    return [tuple(run) for run in runs]
+
+
+def anniversary_filter(field, ordinals):
+    """Return a Q matching rows whose day column falls on any of the ordinals, as range lookups"""
+    condition = Q(pk__in=[])
+    for first, last in _ranges(ordinals):
+        condition |= Q(**{f"{field}__range": (first, last)})
+    return condition
+
+
+def upcoming_anniversaries(queryset, start=None, days=7, kinds=None):
+    """
+    Return the anniversaries in the days starting at start (today by default), soonest first.
+
+    Each entry is a dict with the memorial, the kind ('birth' or 'death'), the
+    date it is observed on and how many years it marks.
+    """
+    start = start or timezone.localdate()
+    kinds = kinds or list(ANNIVERSARY_KINDS)
+    observed = window_days(start, days)
+
+    condition = Q(pk__in=[])
+    for kind in kinds:
+        condition |= anniversary_filter(ANNIVERSARY_KINDS[kind][0], observed)
+
+    entries = []
+    for memorial in queryset.filter(condition):
+        for kind in kinds:
+            day_field, date_field = ANNIVERSARY_KINDS[kind]
+            original = getattr(memorial, date_field)
+            date = observed.get(getattr(memorial, day_field))
+            if original is None or date is None or date <= original:
+                continue
+            entries.append({
+                'memorial': memorial,
+                'kind': kind,
+                'date': date,
+                'years': date.year - original.year,
+            })
+    entries.sort(key=lambda entry: (entry['date'], entry['memorial'].name, entry['kind']))
+    return entries
+
+
+def _digest_entry(entry):
+    """Plain, cacheable summary of one anniversary"""
+    memorial = entry['memorial']
+    return {
+        'id': memorial.id,
+        'name': memorial.name,
+        'dates': memorial.dates,
+        'religion': memorial.religion,
+        'language': memorial.language,
+        'image_url': settings.MEDIA_URL + memorial.image.name if memorial.image else None,
+        'kind': entry['kind'],
+        'date': entry['date'].isoformat(),
+        'years': entry['years'],
+    }
+
+
+def build_digest(date):
+    """Build the anniversary digest of a day: that day's anniversaries and the days after it"""
+    from .models import Memorial
+
+    queryset = Memorial.objects.filter(is_active=True).only(
+        'id', 'name', 'dates', 'religion', 'language', 'image', 'birth_date', 'death_date',
+        'birth_day', 'death_day'
+    )
+    entries = [
+        _digest_entry(entry)
+        for entry in upcoming_anniversaries(queryset, date, settings.ANNIVERSARY_DIGEST_DAYS)
+    ]
+    today = date.isoformat()
+    return {
+        'date': today,
+        'generated_at': timezone.now().isoformat(),
+        'today': [entry for entry in entries if entry['date'] == today],
+        'upcoming': [entry for entry in entries if entry['date'] != today],
+    }
+
+
+def daily_digest(date=None):
+    """Return the day's digest, building it only on the first request of the day"""
+    date = date or timezone.localdate()
+    key = DIGEST_CACHE_KEY.format(date=date.isoformat())
+    digest = cache.get(key)
+    if digest is None:
+        digest = build_digest(date)
+        # Expire shortly after midnight, when the next day's digest takes over
+        midnight = timezone.make_aware(
+            datetime.datetime.combine(date + datetime.timedelta(days=1), datetime.time.min)
+        )
+        timeout = max(int((midnight - timezone.now()).total_seconds()), 0) + 60
+        cache.set(key, digest, timeout)
+    return digest
+
+
+def invalidate_digest():
+    """Drop today's digest so the next request rebuilds it"""
+    cache.delete(DIGEST_CACHE_KEY.format(date=timezone.localdate().isoformat()))
@@ -0,0 +1,30 @@
+"""
+Stored excerpts of memorial descriptions.
+
+Galleries, search results and QR scan summaries only show the first few lines
+of a description, so a whitespace-collapsed, length-bounded excerpt is kept in
+its own column on save. List queries read that short column instead of the
+full description text.
+"""
+import re
+
+EXCERPT_MAX_LENGTH = 300
+
+ELLIPSIS = '…'
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def make_excerpt(text, max_length=EXCERPT_MAX_LENGTH):
+    """Return text on one line, cut at a word boundary to at most max_length characters"""
+    text = WHITESPACE_RE.sub(' ', text or '').strip()
+    if len(text) <= max_length:
+        return text
+    cut = text[:max_length - len(ELLIPSIS) + 1]
+    # Drop the partial last word unless that would leave almost nothing
+    space = cut.rfind(' ')
+    if space > max_length // 2:
+        cut = cut[:space]
+    else:
+        cut = cut[:-1]
+    return cut.rstrip(' ,.;:-–—') + ELLIPSIS
@@ -0,0 +1,187 @@
+"""
+Family graph traversal.
+
+Ancestors and descendants are answered with recursive CTEs, so a traversal
+costs one query whatever its depth. Whole trees are rendered, and relation
+paths searched, from the adjacency representation cached on FamilyTree.graph,
+which is built with two queries and then served from the tree row itself.
+"""
+from django.conf import settings
+from django.db import connection
+
+from .models import FamilyPerson, FamilyRelationship
+
+# How each edge type reads from the other end, for labelling path steps
+INVERSE_RELATIONSHIPS = {
+    'parent': 'child',
+    'guardian': 'ward',
+    'spouse': 'spouse',
+    'sibling': 'sibling',
+}
+
+# Keys of each person's neighbour lists in the cached graph
+ADJACENCY_KEYS = {
+    ('parent', 'out'): 'children',
+    ('parent', 'in'): 'parents',
+    ('guardian', 'out'): 'wards',
+    ('guardian', 'in'): 'guardians',
+    ('spouse', 'out'): 'spouses',
+    ('spouse', 'in'): 'spouses',
+    ('sibling', 'out'): 'siblings',
+    ('sibling', 'in'): 'siblings',
+}
+
+
+def _edge_columns():
+    """Quoted table and column names of the relationship table"""
+    quote = connection.ops.quote_name
+    meta = FamilyRelationship._meta
+    return {
+        'edges': quote(meta.db_table),
+        'source': quote(meta.get_field('from_person').column),
+        'target': quote(meta.get_field('to_person').column),
+        'type': quote(meta.get_field('relationship_type').column),
+        'people': quote(FamilyPerson._meta.db_table),
+        'pk': quote(FamilyPerson._meta.pk.column),
+    }
+
+
+def _lineage(person_id, max_depth, upwards):
+    """Return a RawQuerySet of people related through descent edges, annotated with depth"""
+    names = _edge_columns()
+    # Walking up follows edges from child to parent, walking down the reverse
+    start, step = ('target', 'source') if upwards else ('source', 'target')
+    types = ', '.join(['%s'] * len(FamilyRelationship.DESCENT_TYPES))
+    sql = f"""
+        WITH RECURSIVE lineage(person_id, depth) AS (
+            SELECT e.{names[step]}, 1
+            FROM {names['edges']} e
+            WHERE e.{names[start]} = %s AND e.{names['type']} IN ({types})
+            UNION
+            SELECT e.{names[step]}, l.depth + 1
+            FROM {names['edges']} e
+            JOIN lineage l ON e.{names[start]} = l.person_id
+            WHERE e.{names['type']} IN ({types}) AND l.depth < %s
+        )
+        SELECT p.*, d.depth
+        FROM {names['people']} p
+        JOIN (
+            SELECT person_id, MIN(depth) AS depth FROM lineage
+            WHERE person_id <> %s GROUP BY person_id
+        ) d ON p.{names['pk']} = d.person_id
+        ORDER BY d.depth, p.name
+    """
+    descent = list(FamilyRelationship.DESCENT_TYPES)
+    params = [person_id, *descent, *descent, max_depth, person_id]
+    return FamilyPerson.objects.raw(sql, params)
+
+
+def ancestors(person_id, max_depth=None):
+    """Return the ancestors of a person, nearest generation first, each with a depth"""
+    return list(_lineage(person_id, max_depth or settings.FAMILY_GRAPH_MAX_DEPTH, upwards=True))
+
+
+def descendants(person_id, max_depth=None):
+    """Return the descendants of a person, nearest generation first, each with a depth"""
+    return list(_lineage(person_id, max_depth or settings.FAMILY_GRAPH_MAX_DEPTH, upwards=False))
+
+
+def _neighbours(graph):
+    """Return {person id: neighbour ids} of a cached graph, every edge walked in both directions"""
+    keys = sorted(set(ADJACENCY_KEYS.values()))
+    return {
+        person['id']: sorted({neighbour for key in keys for neighbour in person[key]})
+        for person in graph['people']
+    }
+
+
+def _join_path(forward, backward, meeting_id):
+    """Person ids from the start through meeting_id to the target, from both searches' predecessors"""
+    path = []
+    person_id = meeting_id
+    while person_id is not None:
+        path.append(person_id)
+        person_id = forward[person_id]
+    path.reverse()
+    person_id = backward[meeting_id]
+    while person_id is not None:
+        path.append(person_id)
+        person_id = backward[person_id]
+    return path
+
+
+def relation_path(graph, from_id, to_id, max_depth=None):
+    """
+    Return the person ids on a shortest path between two people of a tree, or None.
+
+    A breadth-first search runs from both ends over the tree's cached graph,
+    always growing the smaller frontier by one generation. Each person is
+    visited at most once per side, so the cost follows the size of the tree
+    rather than the number of paths through it.
+    """
+    if from_id == to_id:
+        return [from_id]
+    neighbours = _neighbours(graph)
+    if from_id not in neighbours or to_id not in neighbours:
+        return None
+
+    # Each side maps the people it reached to the person it reached them from
+    forward, backward = {from_id: None}, {to_id: None}
+    frontiers = {'forward': [from_id], 'backward': [to_id]}
+    for _ in range(max_depth or settings.FAMILY_PATH_MAX_DEPTH):
+        side = 'forward' if len(frontiers['forward']) <= len(frontiers['backward']) else 'backward'
+        reached, other = (forward, backward) if side == 'forward' else (backward, forward)
+        frontier = []
+        for person_id in frontiers[side]:
+            for neighbour in neighbours[person_id]:
+                if neighbour in reached:
+                    continue
+                reached[neighbour] = person_id
+                if neighbour in other:
+                    return _join_path(forward, backward, neighbour)
+                frontier.append(neighbour)
+        if not frontier:
+            return None
+        frontiers[side] = frontier
+    return None
+
+
+def describe_path(path):
+    """Label each step of a path with how the next person relates to the previous one"""
+    pairs = list(zip(path, path[1:]))
+    if not pairs:
+        return []
+
+    edges = {}
+    people = set(path)
+    for source, target, relationship_type in FamilyRelationship.objects.filter(
+        from_person__in=people, to_person__in=people
+    ).values_list('from_person_id', 'to_person_id', 'relationship_type'):
+        # Seen from the source, the target is its child/ward/spouse/sibling
+        edges.setdefault((source, target), INVERSE_RELATIONSHIPS[relationship_type])
+        edges.setdefault((target, source), relationship_type)
+    return [
+        {'from': source, 'to': target, 'relationship': edges.get((source, target))}
+        for source, target in pairs
+    ]
+
+
+def build_graph(tree_id):
+    """Build the adjacency representation of a tree: every person with their neighbour lists"""
+    people = {}
+    for person in FamilyPerson.objects.filter(tree_id=tree_id).values(
+        'id', 'name', 'memorial_id', 'birth_year', 'death_year'
+    ):
+        person.update({key: [] for key in sorted(set(ADJACENCY_KEYS.values()))})
+        people[person['id']] = person
+
+    for source, target, relationship_type in FamilyRelationship.objects.filter(tree_id=tree_id).values_list(
+        'from_person_id', 'to_person_id', 'relationship_type'
+    ):
+        if source in people and target in people:
+            people[source][ADJACENCY_KEYS[(relationship_type, 'out')]].append(target)
+            people[target][ADJACENCY_KEYS[(relationship_type, 'in')]].append(source)
+
+    # Roots are people without parents, where tree layouts start
+    roots = [pk for pk, person in people.items() if not person['parents'] and not person['guardians']]
+    return {'people': list(people.values()), 'roots': roots}
@@ -0,0 +1,319 @@
+"""
+Streaming bulk import of memorials and their timeline stories.
+
+Partner exports arrive as CSV (one memorial per row, list columns as JSON
+arrays or "|"-separated, stories as a JSON array in a "stories" column) or as
+JSON lines (one memorial object per line, stories as a nested list). Records
+are parsed one at a time and handled in chunks: each chunk is validated, then
+its memorials, name postings and stories are written with bulk_create inside
+one transaction. Images are named by path relative to the import media
+directory and are copied into storage and resized by background jobs once the
+chunk commits. Invalid rows, including rows holding bytes that are not valid
+UTF-8, are reported with their row number and skipped; they never abort the
+run.
+"""
+import csv
+import io
+import json
+import logging
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from rest_framework import serializers
+
+from kardiversebackend.tasks import run_in_background
+from timeline.models import LifePhase, TimelineStory
+
+from .anniversaries import invalidate_digest
+from .models import Memorial
+from .serializers import MemorialCreateSerializer
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = {
+    'csv': ('.csv',),
+    'jsonl': ('.jsonl', '.ndjson', '.json'),
+}
+
+# CSV columns holding lists
+LIST_FIELDS = ('categories', 'family_members', 'favorite_quotes', 'achievements')
+
+# Bytes that are not valid UTF-8 are decoded to this, and the record holding them is rejected
+REPLACEMENT_CHARACTER = '\ufffd'
+INVALID_ENCODING_ERROR = {'non_field_errors': ["Record contains bytes that are not valid UTF-8"]}
+
+
+class RowError(Exception):
+    """A record that could not be parsed"""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class StoryRecordSerializer(serializers.Serializer):
+    """Validates one nested timeline story of an imported memorial"""
+    title = serializers.CharField(max_length=200)
+    content = serializers.CharField()
+    life_phase = serializers.CharField()  # LifePhase id or phase name
+    is_featured = serializers.BooleanField(default=False)
+    image = serializers.CharField(required=False, allow_blank=True)
+
+
+class ImportResult:
+    """Running totals and per-row errors of an import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.stories_created = 0
+        self.images_queued = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'stories_created': self.stories_created,
+            'images_queued': self.images_queued,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def detect_format(filename, requested=None):
+    """Return the import format from an explicit choice or the file extension, or None"""
+    if requested:
+        return requested if requested in IMPORT_FORMATS else None
+    extension = os.path.splitext(filename or '')[1].lower()
+    for fmt, extensions in IMPORT_FORMATS.items():
+        if extension in extensions:
+            return fmt
+    return None
+
+
+def _split_list(value):
+    value = value.strip()
+    if value.startswith('['):
+        return json.loads(value)
+    return [item.strip() for item in value.split('|') if item.strip()]
+
+
+def _has_invalid_bytes(row):
+    for key, value in row.items():
+        # Cells beyond the header row are collected in a list under the None key
+        for text in [key] + (value if isinstance(value, list) else [value]):
+            if text and REPLACEMENT_CHARACTER in text:
+                return True
+    return False
+
+
+def parse_csv(stream):
+    """Yield (row number, record or RowError) from a binary CSV stream"""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline=''))
+    for row_number, row in enumerate(reader, start=1):
+        if _has_invalid_bytes(row):
+            yield row_number, RowError(INVALID_ENCODING_ERROR)
+            continue
+        # Empty cells are treated as missing so optional fields take their defaults
+        record = {key: value for key, value in row.items() if key and value not in (None, '')}
+        try:
+            for field in LIST_FIELDS:
+                if field in record:
+                    record[field] = _split_list(record[field])
+            if 'stories' in record:
+                record['stories'] = json.loads(record['stories'])
+        except ValueError as exc:
+            yield row_number, RowError({'non_field_errors': [f"Invalid JSON: {exc}"]})
+            continue
+        yield row_number, record
+
+
+def parse_jsonl(stream):
+    """Yield (line number, record or RowError) from a binary JSON lines stream"""
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace'), start=1):
+        if not line.strip():
+            continue
+        if REPLACEMENT_CHARACTER in line:
+            yield line_number, RowError(INVALID_ENCODING_ERROR)
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, RowError({'non_field_errors': [f"Invalid JSON: {exc}"]})
+            continue
+        if not isinstance(record, dict):
+            yield line_number, RowError({'non_field_errors': ["Each line must be a JSON object"]})
+            continue
+        yield line_number, record
+
+
+PARSERS = {'csv': parse_csv, 'jsonl': parse_jsonl}
+
+
+def resolve_media_path(media_dir, name):
+    """Return the absolute path of an image named in a record, or None if it is outside media_dir or missing"""
+    if not media_dir or not name:
+        return None
+    root = os.path.realpath(media_dir)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        return None
+    return path
+
+
+def _life_phases():
+    """Map LifePhase ids and lowercased phase names to ids"""
+    phases = {}
+    for pk, phase in LifePhase.objects.values_list('id', 'phase'):
+        phases[str(pk)] = pk
+        phases[phase.lower()] = pk
+    return phases
+
+
+def _validate(record, phases, media_dir):
+    """Return (memorial, [(story, image path)], image path) for a record, or raise RowError"""
+    record = dict(record)
+    image = record.pop('image', None)
+    stories = record.pop('stories', None) or []
+
+    errors = {}
+    serializer = MemorialCreateSerializer(data=record)
+    if not serializer.is_valid():
+        errors.update(serializer.errors)
+
+    image_path = None
+    if image is not None and not isinstance(image, str):
+        errors['image'] = ["Expected the file name of an image in the import media directory"]
+    elif image:
+        image_path = resolve_media_path(media_dir, image)
+        if image_path is None:
+            errors['image'] = [f"Image not found in the import media directory: {image}"]
+
+    if not isinstance(stories, list):
+        errors['stories'] = ["Expected a list of stories"]
+        stories = []
+    story_rows = []
+    story_errors = {}
+    for index, story in enumerate(stories):
+        story_serializer = StoryRecordSerializer(data=story)
+        if not story_serializer.is_valid():
+            story_errors[index] = story_serializer.errors
+            continue
+        data = story_serializer.validated_data
+        phase_id = phases.get(data['life_phase'].strip().lower())
+        if phase_id is None:
+            story_errors[index] = {'life_phase': [f"Unknown life phase: {data['life_phase']}"]}
+            continue
+        story_image = None
+        if data.get('image'):
+            story_image = resolve_media_path(media_dir, data['image'])
+            if story_image is None:
+                story_errors[index] = {'image': [f"Image not found in the import media directory: {data['image']}"]}
+                continue
+        story_rows.append((
+            TimelineStory(
+                title=data['title'], content=data['content'], life_phase_id=phase_id,
+                is_featured=data['is_featured']
+            ),
+            story_image
+        ))
+    if story_errors:
+        errors['stories'] = story_errors
+
+    if errors:
+        raise RowError(errors)
+    return Memorial(**serializer.validated_data), story_rows, image_path
+
+
+def _import_chunk(chunk, result, phases, media_dir):
+    """Validate one chunk of records and write its valid memorials and stories"""
+    valid = []
+    for row_number, record in chunk:
+        result.rows += 1
+        if isinstance(record, RowError):
+            result.add_error(row_number, record.errors)
+            continue
+        try:
+            valid.append(_validate(record, phases, media_dir))
+        except RowError as exc:
+            result.add_error(row_number, exc.errors)
+    if not valid:
+        return
+
+    with transaction.atomic():
+        memorials = [memorial for memorial, _, _ in valid]
+        Memorial.prepare_bulk_create(memorials)
+        Memorial.objects.bulk_create(memorials)
+        Memorial.index_names(memorials)
+
+        stories = []
+        for memorial, story_rows, _ in valid:
+            for story, image_path in story_rows:
+                story.memorial = memorial
+                stories.append((story, image_path))
+        TimelineStory.objects.bulk_create([story for story, _ in stories])
+        story_images = [(story.pk, path) for story, path in stories if path]
+
+        memorial_images = [(memorial.pk, path) for memorial, _, path in valid if path]
+        if memorial_images:
+            run_in_background(attach_images, Memorial, memorial_images, resize=True)
+        if story_images:
+            run_in_background(attach_images, TimelineStory, story_images)
+
+    result.created += len(memorials)
+    result.stories_created += len(stories)
+    result.images_queued += len(memorial_images) + len(story_images)
+
+
+def import_records(records, media_dir=None, chunk_size=None):
+    """Import an iterable of (row number, record or RowError) in chunks, returning an ImportResult"""
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    media_dir = media_dir or settings.IMPORT_MEDIA_DIR
+    phases = _life_phases()
+    result = ImportResult()
+
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        _import_chunk(chunk, result, phases, media_dir)
+
+    if result.created:
+        # bulk_create sends no post_save signals
+        invalidate_digest()
+    return result
+
+
+def import_stream(stream, fmt, media_dir=None, chunk_size=None):
+    """Import a binary CSV or JSON lines stream"""
+    return import_records(PARSERS[fmt](stream), media_dir=media_dir, chunk_size=chunk_size)
+
+
+def attach_images(model, pairs, resize=False):
+    """Copy imported image files into storage for [(pk, path)] of a model, resizing memorial images"""
+    instances = model.objects.in_bulk([pk for pk, _ in pairs])
+    for pk, path in pairs:
+        instance = instances.get(pk)
+        if instance is None:
+            continue
+        try:
+            with open(path, 'rb') as source:
+                instance.image.save(os.path.basename(path), File(source), save=False)
+        except OSError:
+            logger.exception("Could not import image %s for %s %s", path, model.__name__, pk)
+            continue
+        model.objects.filter(pk=pk).update(image=instance.image.name)
+        if resize:
+            instance.resize_image()
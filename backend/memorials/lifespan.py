@@ -0,0 +1,46 @@
+"""
+Birth and death years parsed from the free-text Memorial.dates string.
+
+Lifespans are stored as a (birth_year, death_year) interval. Because no
+stored interval is longer than MAX_LIFESPAN_YEARS, "alive during year X" only
+has to look at births in [X - MAX_LIFESPAN_YEARS, X], which is a bounded range
+scan of the (birth_year, death_year) index rather than a scan of every row.
+"""
+import re
+
+MAX_LIFESPAN_YEARS = 125
+
+YEAR_RE = re.compile(r'(?<!\d)(1[0-9]{3}|20[0-9]{2})(?!\d)')
+DEATH_MARKER_RE = re.compile(r'[-–—]|\bd\.|\bdied\b', re.IGNORECASE)
+
+
+def parse_lifespan(dates):
+    """
+    Return (birth_year, death_year) from strings like "1934 - 2024",
+    "3 March 1934 – 2 June 2024", "b. 1934" or "d. 2024"; unknown parts are None.
+    """
+    matches = list(YEAR_RE.finditer(dates or ''))
+    if not matches:
+        return None, None
+    if len(matches) == 1:
+        # A lone year after a dash or "d." is the year of death
+        if DEATH_MARKER_RE.search(dates[:matches[0].start()]):
+            return None, int(matches[0].group())
+        return int(matches[0].group()), None
+    return int(matches[0].group()), int(matches[-1].group())
+
+
+def lifespan_years(birth_date, death_date, dates):
+    """
+    Return the (birth_year, death_year) interval stored for a memorial.
+
+    Exact dates win over the free-text string; an implausible interval
+    (ending before it starts, or longer than MAX_LIFESPAN_YEARS) is dropped so
+    the bounded interval queries stay correct.
+    """
+    parsed_birth, parsed_death = parse_lifespan(dates)
+    birth_year = birth_date.year if birth_date else parsed_birth
+    death_year = death_date.year if death_date else parsed_death
+    if birth_year and death_year and not 0 <= death_year - birth_year <= MAX_LIFESPAN_YEARS:
+        return None, None
+    return birth_year, death_year
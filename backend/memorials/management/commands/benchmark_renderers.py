@@ -0,0 +1,82 @@
+import gzip
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from kardiversebackend.renderers import cbor_dumps, cbor_loads, msgpack_dumps, msgpack_loads
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import json
+
+DEFAULT_PATHS = [
+    '/api/v1/memorials/',
+    '/api/v1/timeline/stories/',
+    '/api/v1/wakeroom/experiences/?include=memorials',
+    '/api/v1/wakeroom/sessions/',
+    '/api/v1/legacy/licenses/',
+    '/api/v1/legacy/purchases/',
+]
+
+# (encode, decode) of each format; JSON goes through the API's own renderer
+FORMATS = {
+    'json': (lambda data: JSONRenderer().render(data), json.loads),
+    'msgpack': (msgpack_dumps, msgpack_loads),
+    'cbor': (cbor_dumps, cbor_loads),
+}
+
+
+def _best_time(function, argument, iterations):
+    """Best of three runs of iterations calls, in milliseconds per call"""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function(argument)
+        elapsed = (time.perf_counter() - start) * 1000 / iterations
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = 'Compare payload size and encode/decode time of the JSON, MessagePack and CBOR renderers on API responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help=f'API paths to fetch (defaults to {len(DEFAULT_PATHS)} list endpoints)')
+        parser.add_argument('--iterations', type=int, default=50, help='Encodes and decodes timed per payload')
+        parser.add_argument('--user', help='Username to fetch the paths as (for endpoints that filter by user)')
+        parser.add_argument('--host', default='localhost', help='Host header of the requests (must be in ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive')
+
+        client = Client(HTTP_HOST=options['host'])
+        if options['user']:
+            try:
+                client.force_login(get_user_model().objects.get(username=options['user']))
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Unknown user: {options['user']}")
+
+        self.stdout.write(
+            f"{'path / format':<40}{'bytes':>10}{'vs json':>10}{'gzip':>10}{'encode ms':>12}{'decode ms':>12}"
+        )
+        for path in options['paths'] or DEFAULT_PATHS:
+            # Fetched as MessagePack so dates, decimals and UUIDs are the native values every format encodes
+            response = client.get(path, HTTP_ACCEPT='application/msgpack')
+            if response.status_code != 200:
+                self.stderr.write(f'{path}: HTTP {response.status_code}, skipped')
+                continue
+            data = msgpack_loads(response.content)
+
+            self.stdout.write(path)
+            baseline = None
+            for name, (encode, decode) in FORMATS.items():
+                content = encode(data)
+                encode_ms = _best_time(encode, data, options['iterations'])
+                decode_ms = _best_time(decode, content, options['iterations'])
+                baseline = baseline or len(content)
+                self.stdout.write(
+                    f"  {name:<38}{len(content):>10}{len(content) * 100 / baseline:>9.0f}%"
+                    f"{len(gzip.compress(content)):>10}{encode_ms:>12.3f}{decode_ms:>12.3f}"
+                )
@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kardiversebackend.exports import EXPORT_FORMATS, EXPORTS, write_export
+
+
+class Command(BaseCommand):
+    help = 'Stream a dataset (memorials, timeline stories, WakeRoom sessions, license purchases) to NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(EXPORTS), help='Dataset to export')
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson', help='Output format')
+        parser.add_argument('--output', help='File to write (defaults to standard output)')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows fetched from the database at a time')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        if not options['output']:
+            write_export(options['dataset'], options['format'], sys.stdout.buffer, chunk_size=options['chunk_size'])
+            sys.stdout.buffer.flush()
+            return
+
+        try:
+            with open(options['output'], 'wb') as stream:
+                count = write_export(options['dataset'], options['format'], stream, chunk_size=options['chunk_size'])
+        except OSError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} {options['dataset']} row(s) to {options['output']}."))
@@ -0,0 +1,61 @@
+import os
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from memorials.models import Memorial
+from memorials.qr import export_qr_sheets, sheet_count
+
+
+class Command(BaseCommand):
+    help = 'Render printable QR code sheets for memorials using a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help='Directory the sheet files are written to')
+        parser.add_argument('--format', choices=['pdf', 'png'], default='pdf', help='Sheet file format')
+        parser.add_argument('--columns', type=int, default=4, help='QR codes per row')
+        parser.add_argument('--rows', type=int, default=5, help='Rows per sheet')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (defaults to CPU count)')
+        parser.add_argument('--base-url', default=settings.QR_CODE_BASE_URL, help='Base URL encoded into the QR codes')
+        parser.add_argument('--religion', choices=[choice[0] for choice in Memorial.RELIGION_CHOICES])
+        parser.add_argument('--ids', help='Comma-separated memorial ids to export')
+
+    def handle(self, *args, **options):
+        base_url = options['base_url']
+        if not base_url:
+            raise CommandError('A --base-url (or the QR_CODE_BASE_URL setting) is required')
+        if options['columns'] < 1 or options['rows'] < 1:
+            raise CommandError('--columns and --rows must be positive')
+
+        memorials = Memorial.objects.filter(is_active=True, qr_code=True).order_by('name', 'id')
+        if options['religion']:
+            memorials = memorials.filter(religion=options['religion'])
+        if options['ids']:
+            memorials = memorials.filter(pk__in=[pk.strip() for pk in options['ids'].split(',')])
+
+        total = memorials.count()
+        if not total:
+            self.stdout.write('No memorials to export.')
+            return
+
+        pages = sheet_count(total, options['columns'], options['rows'])
+        self.stdout.write(f'Rendering {total} QR code(s) onto {pages} sheet(s)...')
+
+        # Build entries lazily so only the pages in flight are held in memory
+        entries = (
+            (urljoin(base_url, Memorial(pk=pk, short_code=short_code).get_qr_code_path()), name, dates)
+            for pk, short_code, name, dates in memorials.values_list(
+                'id', 'short_code', 'name', 'dates'
+            ).iterator(chunk_size=500)
+        )
+        paths = export_qr_sheets(
+            entries,
+            os.path.abspath(options['output_dir']),
+            fmt=options['format'],
+            columns=options['columns'],
+            rows=options['rows'],
+            workers=options['workers']
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(paths)} sheet(s) to {options["output_dir"]}'))
@@ -0,0 +1,43 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from memorials.importer import IMPORT_FORMATS, detect_format, import_stream
+
+
+class Command(BaseCommand):
+    help = 'Import memorials and their timeline stories from a CSV or JSON lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON lines file to import')
+        parser.add_argument('--format', choices=list(IMPORT_FORMATS), help='Input format (defaults to the file extension)')
+        parser.add_argument('--media-dir', default=settings.IMPORT_MEDIA_DIR, help='Directory image paths are relative to')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Records written per transaction')
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options['path'], options['format'])
+        if fmt is None:
+            raise CommandError(f"Cannot tell the format of {options['path']}; pass --format")
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                result = import_stream(stream, fmt, media_dir=options['media_dir'], chunk_size=options['chunk_size'])
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(f"  row {error['row']}: {json.dumps(error['errors'])}")
+        if result.failed > len(result.errors):
+            self.stderr.write(f'  ... and {result.failed - len(result.errors)} more row error(s)')
+
+        message = (
+            f'{result.rows} row(s): {result.created} memorial(s) and {result.stories_created} story(ies) '
+            f'created, {result.failed} row(s) skipped, {result.images_queued} image(s) queued for processing.'
+        )
+        if result.failed:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from memorials.ranking import rank_featured
+
+
+class Command(BaseCommand):
+    help = 'Rank memorials by decayed engagement (views, QR scans, WakeRoom sessions, stories) and store the featured list'
+
+    def handle(self, *args, **options):
+        result = rank_featured()
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {result['scored']} memorial(s), stored {result['ranked']} featured "
+            f"and pruned {result['pruned']} expired engagement count(s)."
+        ))
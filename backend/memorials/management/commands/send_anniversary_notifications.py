@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from memorials.notifications import send_anniversary_notifications
+
+
+class Command(BaseCommand):
+    help = "Email subscribed family members about the day's birth and death anniversaries (safe to rerun)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to notify for, YYYY-MM-DD (defaults to today)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages sent per email connection')
+
+    def handle(self, *args, **options):
+        date = None
+        if options['date']:
+            try:
+                date = parse_date(options['date'])
+            except ValueError:
+                date = None
+            if date is None:
+                raise CommandError('--date must be a date, e.g. 2024-06-01')
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        result = send_anniversary_notifications(date, batch_size=options['batch_size'])
+        message = (
+            f"{result['date']}: {result['recipients']} recipient notification(s), "
+            f"{result['sent']} sent, {result['failed']} failed."
+        )
+        if result['failed']:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:52
+
+import secrets
+import string
+
+from django.db import migrations, models
+
+# Frozen copy of memorials.shortcodes.generate_short_code, so later changes there cannot alter this migration
+BASE62_ALPHABET = string.digits + string.ascii_letters
+SHORT_CODE_LENGTH = 7
+
+
+def generate_short_code():
+    return ''.join(secrets.choice(BASE62_ALPHABET) for _ in range(SHORT_CODE_LENGTH))
+
+
+def assign_short_codes(apps, schema_editor):
+    """Give every memorial a short code and repair QR data saved before the id existed"""
+    Memorial = apps.get_model('memorials', 'Memorial')
+    used = set(Memorial.objects.exclude(short_code=None).values_list('short_code', flat=True))
+    
+    for memorial in Memorial.objects.filter(short_code=None).only('id', 'qr_code', 'qr_code_data'):
+        code = generate_short_code()
+        while code in used:
+            code = generate_short_code()
+        used.add(code)
+        
+        memorial.short_code = code
+        if memorial.qr_code and memorial.qr_code_data in ('', '/memorial/None'):
+            memorial.qr_code_data = f"/q/{code}"
+        memorial.save(update_fields=['short_code', 'qr_code_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memorial',
+            name='short_code',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True, unique=True),
+        ),
+        migrations.RunPython(assign_short_codes, migrations.RunPython.noop),
+    ]
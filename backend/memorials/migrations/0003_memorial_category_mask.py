@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:03
+
+from django.db import migrations, models
+
+
+def compute_category_masks(apps, schema_editor):
+    """Derive category_mask from the JSON categories of existing memorials"""
+    Memorial = apps.get_model('memorials', 'Memorial')
+    bits = {code: 1 << index for index, code in enumerate(
+        ['Life Moments', 'Voice & Stories', 'Family Tree', 'Spiritual Room']
+    )}
+    
+    memorials = list(Memorial.objects.only('id', 'categories'))
+    for memorial in memorials:
+        memorial.category_mask = 0
+        for category in memorial.categories or []:
+            memorial.category_mask |= bits.get(category, 0)
+    Memorial.objects.bulk_update(memorials, ['category_mask'], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0002_memorial_short_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memorial',
+            name='category_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='memorial',
+            index=models.Index(fields=['category_mask', 'is_active'], name='memorial_category_mask_idx'),
+        ),
+        migrations.RunPython(compute_category_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0003_memorial_category_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FamilyTree',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('graph', models.JSONField(blank=True, editable=False, null=True)),
+                ('graph_version', models.PositiveIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('memorial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='family_trees', to='memorials.memorial')),
+            ],
+            options={
+                'verbose_name': 'Family Tree',
+                'verbose_name_plural': 'Family Trees',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FamilyPerson',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('birth_year', models.SmallIntegerField(blank=True, null=True)),
+                ('death_year', models.SmallIntegerField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('memorial', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='family_people', to='memorials.memorial')),
+                ('tree', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='people', to='memorials.familytree')),
+            ],
+            options={
+                'verbose_name': 'Family Person',
+                'verbose_name_plural': 'Family People',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FamilyRelationship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('relationship_type', models.CharField(choices=[('parent', 'Parent'), ('guardian', 'Guardian'), ('spouse', 'Spouse'), ('sibling', 'Sibling')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('from_person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relationships_from', to='memorials.familyperson')),
+                ('to_person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relationships_to', to='memorials.familyperson')),
+                ('tree', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relationships', to='memorials.familytree')),
+            ],
+            options={
+                'verbose_name': 'Family Relationship',
+                'verbose_name_plural': 'Family Relationships',
+                'ordering': ['tree', 'from_person', 'relationship_type'],
+                'indexes': [models.Index(fields=['to_person', 'relationship_type'], name='family_rel_to_type_idx')],
+                'unique_together': {('from_person', 'to_person', 'relationship_type')},
+            },
+        ),
+    ]
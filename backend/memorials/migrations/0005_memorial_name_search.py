@@ -0,0 +1,115 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:07
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of the memorials.names helpers, so later changes there cannot alter this migration
+ARTICLES = {'al', 'el', 'ul', 'il', 'ad', 'ar', 'as', 'at', 'az', 'an', 'ash', 'adh', 'ath'}
+VOWELS = set('aeiouy')
+VOWEL_CLASSES = {'a': 'a', 'e': 'i', 'i': 'i', 'y': 'i', 'o': 'u', 'u': 'u'}
+PHONETIC_RULES = [
+    ('x', 'ks'), ('dj', 'j'), ('kh', 'k'), ('gh', 'g'), ('ph', 'f'), ('th', 't'), ('dh', 'd'), ('sh', 'x'),
+    ('ch', 'x'), ('ck', 'k'), ('ny', 'n'), ('q', 'k'), ('c', 'k'), ('z', 's'), ('v', 'f'),
+]
+PHONETIC_KEY_LENGTH = 8
+PHONETIC_PREFIX = '#'
+SEPARATORS = re.compile(r"[\s\-_.,'`’‘ʿʾ]+")
+
+
+def normalize_name(name):
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    words = [''.join(char for char in word if char.isalnum()) for word in SEPARATORS.split(folded)]
+    words = [word for word in words if word]
+    meaningful = [word for word in words if word not in ARTICLES]
+    return ' '.join(meaningful or words)
+
+
+def phonetic_token(word):
+    if not word:
+        return ''
+    for source, target in PHONETIC_RULES:
+        word = word.replace(source, target)
+    if len(word) > 2 and word.endswith('h') and word[-2] in VOWELS:
+        word = word[:-1]
+    key = ['a' if word[0] in VOWELS and word[0] != 'y' else word[0]]
+    vowel_kept = key[0] == 'a'
+    for char in word[1:]:
+        if char in VOWELS:
+            if not vowel_kept:
+                key.append(VOWEL_CLASSES[char])
+                vowel_kept = True
+            continue
+        if char == 'w':
+            continue
+        if char != key[-1]:
+            key.append(char)
+    return ''.join(key)[:PHONETIC_KEY_LENGTH]
+
+
+def phonetic_key(normalized):
+    return ' '.join(phonetic_token(word) for word in normalized.split())
+
+
+def name_postings(normalized, phonetic):
+    postings = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        postings.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    postings.update(PHONETIC_PREFIX + key for key in phonetic.split() if key)
+    return postings
+
+
+def index_names(apps, schema_editor):
+    """Compute the fuzzy search columns and postings of existing memorials"""
+    Memorial = apps.get_model('memorials', 'Memorial')
+    MemorialNameGram = apps.get_model('memorials', 'MemorialNameGram')
+    
+    memorials = list(Memorial.objects.only('id', 'name'))
+    postings = []
+    for memorial in memorials:
+        memorial.name_normalized = normalize_name(memorial.name)
+        memorial.name_phonetic = phonetic_key(memorial.name_normalized)
+        postings.extend(
+            MemorialNameGram(memorial_id=memorial.id, gram=gram)
+            for gram in name_postings(memorial.name_normalized, memorial.name_phonetic)
+        )
+    Memorial.objects.bulk_update(memorials, ['name_normalized', 'name_phonetic'], batch_size=500)
+    MemorialNameGram.objects.bulk_create(postings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0004_family_graph'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memorial',
+            name='name_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='memorial',
+            name='name_phonetic',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.CreateModel(
+            name='MemorialNameGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=16)),
+                ('memorial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_grams', to='memorials.memorial')),
+            ],
+            options={
+                'verbose_name': 'Memorial Name Gram',
+                'verbose_name_plural': 'Memorial Name Grams',
+                'unique_together': {('gram', 'memorial')},
+            },
+        ),
+        migrations.RunPython(index_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:09
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of memorials.lifespan.lifespan_years, so later changes there cannot alter this migration
+MAX_LIFESPAN_YEARS = 125
+YEAR_RE = re.compile(r'(?<!\d)(1[0-9]{3}|20[0-9]{2})(?!\d)')
+DEATH_MARKER_RE = re.compile(r'[-–—]|\bd\.|\bdied\b', re.IGNORECASE)
+
+
+def parse_lifespan(dates):
+    matches = list(YEAR_RE.finditer(dates or ''))
+    if not matches:
+        return None, None
+    if len(matches) == 1:
+        if DEATH_MARKER_RE.search(dates[:matches[0].start()]):
+            return None, int(matches[0].group())
+        return int(matches[0].group()), None
+    return int(matches[0].group()), int(matches[-1].group())
+
+
+def lifespan_years(birth_date, death_date, dates):
+    parsed_birth, parsed_death = parse_lifespan(dates)
+    birth_year = birth_date.year if birth_date else parsed_birth
+    death_year = death_date.year if death_date else parsed_death
+    if birth_year and death_year and not 0 <= death_year - birth_year <= MAX_LIFESPAN_YEARS:
+        return None, None
+    return birth_year, death_year
+
+
+def backfill_lifespans(apps, schema_editor):
+    """Parse birth and death years of existing memorials from their dates"""
+    Memorial = apps.get_model('memorials', 'Memorial')
+    
+    memorials = list(Memorial.objects.only('id', 'dates', 'birth_date', 'death_date'))
+    for memorial in memorials:
+        memorial.birth_year, memorial.death_year = lifespan_years(
+            memorial.birth_date, memorial.death_date, memorial.dates
+        )
+    Memorial.objects.bulk_update(memorials, ['birth_year', 'death_year'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0005_memorial_name_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memorial',
+            name='birth_year',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='memorial',
+            name='death_year',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='memorial',
+            index=models.Index(fields=['birth_year', 'death_year'], name='memorial_lifespan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='memorial',
+            index=models.Index(fields=['death_year'], name='memorial_death_year_idx'),
+        ),
+        migrations.RunPython(backfill_lifespans, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:12
+
+import datetime
+
+from django.db import migrations, models
+
+# Frozen copy of memorials.anniversaries.day_of_year, so later changes there cannot alter this migration
+CALENDAR_YEAR = 2000  # Leap year: Feb 29 is always day 60
+
+
+def day_of_year(value):
+    if value is None:
+        return None
+    return datetime.date(CALENDAR_YEAR, value.month, value.day).timetuple().tm_yday
+
+
+def backfill_anniversary_days(apps, schema_editor):
+    """Store the anniversary days of existing memorials' exact dates"""
+    Memorial = apps.get_model('memorials', 'Memorial')
+    
+    memorials = list(Memorial.objects.exclude(birth_date=None, death_date=None).only('id', 'birth_date', 'death_date'))
+    for memorial in memorials:
+        memorial.birth_day = day_of_year(memorial.birth_date)
+        memorial.death_day = day_of_year(memorial.death_date)
+    Memorial.objects.bulk_update(memorials, ['birth_day', 'death_day'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0006_memorial_lifespan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memorial',
+            name='birth_day',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='memorial',
+            name='death_day',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='memorial',
+            index=models.Index(fields=['birth_day'], name='memorial_birth_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='memorial',
+            index=models.Index(fields=['death_day'], name='memorial_death_day_idx'),
+        ),
+        migrations.RunPython(backfill_anniversary_days, migrations.RunPython.noop),
+    ]
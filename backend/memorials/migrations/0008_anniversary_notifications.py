@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0007_memorial_anniversary_days'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnniversarySubscriber',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('email', models.EmailField(max_length=254)),
+                ('language', models.CharField(default='en', max_length=10)),
+                ('notify_birth', models.BooleanField(default=True)),
+                ('notify_death', models.BooleanField(default=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('family_person', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='anniversary_subscriptions', to='memorials.familyperson')),
+                ('memorial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anniversary_subscribers', to='memorials.memorial')),
+            ],
+            options={
+                'verbose_name': 'Anniversary Subscriber',
+                'verbose_name_plural': 'Anniversary Subscribers',
+                'ordering': ['memorial', 'name'],
+                'unique_together': {('memorial', 'email')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AnniversaryNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('birth', 'Birth'), ('death', 'Death')], max_length=10)),
+                ('anniversary_date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('memorial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anniversary_notifications', to='memorials.memorial')),
+                ('subscriber', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='memorials.anniversarysubscriber')),
+            ],
+            options={
+                'verbose_name': 'Anniversary Notification',
+                'verbose_name_plural': 'Anniversary Notifications',
+                'ordering': ['-anniversary_date', 'id'],
+                'indexes': [models.Index(fields=['anniversary_date', 'status'], name='anniv_notification_day_idx')],
+                'unique_together': {('subscriber', 'memorial', 'kind', 'anniversary_date')},
+            },
+        ),
+    ]
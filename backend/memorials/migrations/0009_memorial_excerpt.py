@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:26
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of memorials.excerpts.make_excerpt, so later changes there cannot alter this migration
+EXCERPT_MAX_LENGTH = 300
+ELLIPSIS = '…'
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def make_excerpt(text, max_length=EXCERPT_MAX_LENGTH):
+    text = WHITESPACE_RE.sub(' ', text or '').strip()
+    if len(text) <= max_length:
+        return text
+    cut = text[:max_length - len(ELLIPSIS) + 1]
+    space = cut.rfind(' ')
+    if space > max_length // 2:
+        cut = cut[:space]
+    else:
+        cut = cut[:-1]
+    return cut.rstrip(' ,.;:-–—') + ELLIPSIS
+
+
+def backfill_excerpts(apps, schema_editor):
+    """Store the excerpt of existing memorials' descriptions, a batch at a time"""
+    Memorial = apps.get_model('memorials', 'Memorial')
+    
+    batch = []
+    for memorial in Memorial.objects.only('id', 'description').iterator(chunk_size=500):
+        memorial.excerpt = make_excerpt(memorial.description)
+        batch.append(memorial)
+        if len(batch) == 500:
+            Memorial.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Memorial.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0008_anniversary_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memorial',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0009_memorial_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeaturedMemorial',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField(unique=True)),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('memorial', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='featured_rank', to='memorials.memorial')),
+            ],
+            options={
+                'ordering': ['rank'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MemorialEngagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('view', 'Page view'), ('scan', 'QR scan')], max_length=10)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('memorial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagement', to='memorials.memorial')),
+            ],
+            options={
+                'ordering': ['-day', 'memorial'],
+                'indexes': [models.Index(fields=['day'], name='memorial_engagement_day_idx')],
+                'unique_together': {('memorial', 'kind', 'day')},
+            },
+        ),
+    ]
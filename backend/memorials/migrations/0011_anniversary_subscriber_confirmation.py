@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def confirm_existing_subscribers(apps, schema_editor):
+    """Subscribers added before confirmation existed were all entered by signed-in users"""
+    AnniversarySubscriber = apps.get_model('memorials', 'AnniversarySubscriber')
+    AnniversarySubscriber.objects.update(confirmed_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memorials', '0010_engagement_ranking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anniversarysubscriber',
+            name='confirmed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='anniversarysubscriber',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='anniversary_subscriptions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(confirm_existing_subscribers, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,70 @@
+from django.conf import settings
+from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
 from PIL import Image
+import io
 import os
 
+from mediastore.references import get_or_create_derivative
+from .anniversaries import day_of_year
+from .excerpts import EXCERPT_MAX_LENGTH, make_excerpt
+from .lifespan import MAX_LIFESPAN_YEARS, lifespan_years
+from .names import name_postings, normalize_name, phonetic_key
+from .shortcodes import generate_short_code
+
+
+def render_web_image(path):
+    """Return (bytes, extension) of the image resized for web display, or None if it already fits"""
+    if not os.path.exists(path):
+        return None
+    with Image.open(path) as img:
+        max_width, max_height = settings.PIL_IMAGE_MAX_SIZE
+        if img.width <= max_width and img.height <= max_height:
+            return None
+        
+        image_format = img.format or 'JPEG'
+        # Convert to RGB if necessary
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail(settings.PIL_IMAGE_MAX_SIZE, Image.Resampling.LANCZOS)
+        
+        buffer = io.BytesIO()
+        img.save(buffer, format=image_format, quality=settings.PIL_IMAGE_QUALITY, optimize=True)
+        return buffer.getvalue(), os.path.splitext(path)[1]
+
+
+class MemorialQuerySet(models.QuerySet):
+    """Category filters answered from the indexed category_mask column"""
+    
+    def with_any_category(self, categories):
+        """Memorials in at least one of the categories (JSON overlap)"""
+        mask = Memorial.get_category_mask(categories)
+        return self.filter(category_mask__in=[value for value in Memorial.all_category_masks() if value & mask])
+    
+    def with_all_categories(self, categories):
+        """Memorials in every one of the categories (JSON contains)"""
+        mask = Memorial.get_category_mask(categories)
+        if not mask or len(set(categories)) != len(set(categories) & set(Memorial.CATEGORY_BITS)):
+            return self.none()
+        return self.filter(category_mask__in=[value for value in Memorial.all_category_masks() if value & mask == mask])
+    
+    def alive_in(self, year):
+        """Memorials of people alive at some point during the year"""
+        # Births are bounded by the longest stored lifespan, so this is an index range scan
+        return self.filter(
+            birth_year__gte=year - MAX_LIFESPAN_YEARS, birth_year__lte=year, death_year__gte=year
+        )
+    
+    def died_between(self, start_year=None, end_year=None):
+        """Memorials of people who died between the two years, inclusive"""
+        queryset = self.exclude(death_year=None)
+        if start_year is not None:
+            queryset = queryset.filter(death_year__gte=start_year)
+        if end_year is not None:
+            queryset = queryset.filter(death_year__lte=end_year)
+        return queryset
+
 class Memorial(models.Model):
     RELIGION_CHOICES = [
         ('Christian', 'Christian'),
@@ -16,16 +78,28 @@ class Memorial(models.Model):
         ('Spiritual Room', 'Spiritual Room'),
     ]
     
+    # Bit of each category in category_mask; only ever append new categories
+    CATEGORY_BITS = {code: 1 << index for index, (code, _) in enumerate(CATEGORY_CHOICES)}
+    
     name = models.CharField(max_length=200)
+    name_normalized = models.CharField(max_length=200, blank=True, editable=False)  # Folded for fuzzy search, see names.py
+    name_phonetic = models.CharField(max_length=200, blank=True, editable=False)  # Phonetic key per word
     dates = models.CharField(max_length=50)  # e.g., "1934 - 2024"
     birth_date = models.DateField(null=True, blank=True)
     death_date = models.DateField(null=True, blank=True)
+    birth_year = models.SmallIntegerField(null=True, blank=True, editable=False)  # From birth_date or parsed from dates
+    death_year = models.SmallIntegerField(null=True, blank=True, editable=False)  # From death_date or parsed from dates
+    birth_day = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)  # Anniversary day of year, see anniversaries.py
+    death_day = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
     image = models.ImageField(upload_to='memorials/', null=True, blank=True)
     religion = models.CharField(max_length=20, choices=RELIGION_CHOICES)
     categories = models.JSONField(default=list)  # Store as list of category strings
+    category_mask = models.PositiveSmallIntegerField(default=0, editable=False)  # Bitmask of categories, kept in sync on save
     description = models.TextField()
+    excerpt = models.CharField(max_length=EXCERPT_MAX_LENGTH, blank=True, editable=False)  # Bounded start of description for lists, see excerpts.py
     qr_code = models.BooleanField(default=True)
     qr_code_data = models.CharField(max_length=500, blank=True)  # URL or data for QR code
+    short_code = models.CharField(max_length=16, unique=True, null=True, blank=True, editable=False)  # base62, resolved at /q/<code>
     
     # Additional fields for enhanced functionality
     family_members = models.JSONField(default=list, blank=True)  # List of family member names
@@ -41,18 +115,65 @@ class Memorial(models.Model):
     # Language support
     language = models.CharField(max_length=10, default='en')  # en, sw (Swahili)
     
+    objects = MemorialQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Memorial'
         verbose_name_plural = 'Memorials'
+        indexes = [
+            models.Index(fields=['category_mask', 'is_active'], name='memorial_category_mask_idx'),
+            models.Index(fields=['birth_year', 'death_year'], name='memorial_lifespan_idx'),
+            models.Index(fields=['death_year'], name='memorial_death_year_idx'),
+            models.Index(fields=['birth_day'], name='memorial_birth_day_idx'),
+            models.Index(fields=['death_day'], name='memorial_death_day_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.dates})"
     
     def save(self, *args, **kwargs):
+        # Keep the category bitmask in sync with the JSON list
+        self.category_mask = self.get_category_mask(self.categories)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'categories' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'category_mask'}
+        
+        # Keep the lifespan interval in sync with the dates
+        self.birth_year, self.death_year = lifespan_years(self.birth_date, self.death_date, self.dates)
+        if update_fields is not None and {'dates', 'birth_date', 'death_date'} & set(update_fields):
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'birth_year', 'death_year'}
+        
+        # Keep the anniversary days in sync with the exact dates
+        self.birth_day = day_of_year(self.birth_date)
+        self.death_day = day_of_year(self.death_date)
+        if update_fields is not None and {'birth_date', 'death_date'} & set(update_fields):
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'birth_day', 'death_day'}
+        
+        # Keep the list excerpt in sync with the description
+        self.excerpt = make_excerpt(self.description)
+        if update_fields is not None and 'description' in update_fields:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'excerpt'}
+        
+        # Keep the fuzzy search columns in sync with the name
+        name_changed = (update_fields is None or 'name' in update_fields) and (
+            self._state.adding or self.name_normalized != normalize_name(self.name)
+        )
+        if name_changed:
+            self.name_normalized = normalize_name(self.name)
+            self.name_phonetic = phonetic_key(self.name_normalized)
+            if update_fields is not None and 'name' in update_fields:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'name_normalized', 'name_phonetic'}
+        
+        # Assign a short code before the first insert so QR data never depends on the id
+        if not self.short_code:
+            self.short_code = generate_short_code()
+            while Memorial.objects.filter(short_code=self.short_code).exists():
+                self.short_code = generate_short_code()
+        
         # Generate QR code data if not provided
         if self.qr_code and not self.qr_code_data:
-            self.qr_code_data = f"/memorial/{self.id}"
+            self.qr_code_data = self.get_qr_code_path()
         
         # Resize image if it's too large
         if self.image:
@@ -60,25 +181,101 @@ class Memorial(models.Model):
             self.resize_image()
         else:
             super().save(*args, **kwargs)
+        
+        if name_changed:
+            self.index_name()
+    
+    def index_name(self):
+        """Rebuild this memorial's fuzzy search postings"""
+        MemorialNameGram.objects.filter(memorial=self).delete()
+        MemorialNameGram.objects.bulk_create([
+            MemorialNameGram(memorial=self, gram=gram)
+            for gram in name_postings(self.name_normalized, self.name_phonetic)
+        ])
+    
+    @classmethod
+    def prepare_bulk_create(cls, memorials):
+        """Fill in what save() maintains for memorials about to be inserted with bulk_create"""
+        for memorial in memorials:
+            memorial.category_mask = cls.get_category_mask(memorial.categories)
+            memorial.birth_year, memorial.death_year = lifespan_years(
+                memorial.birth_date, memorial.death_date, memorial.dates
+            )
+            memorial.birth_day = day_of_year(memorial.birth_date)
+            memorial.death_day = day_of_year(memorial.death_date)
+            memorial.excerpt = make_excerpt(memorial.description)
+            memorial.name_normalized = normalize_name(memorial.name)
+            memorial.name_phonetic = phonetic_key(memorial.name_normalized)
+        
+        # Draw short codes for the whole batch and check them against the table in one query per round
+        used = set()
+        pending = [memorial for memorial in memorials if not memorial.short_code]
+        while pending:
+            for memorial in pending:
+                memorial.short_code = generate_short_code()
+            taken = set(cls.objects.filter(
+                short_code__in=[memorial.short_code for memorial in pending]
+            ).values_list('short_code', flat=True))
+            retry = []
+            for memorial in pending:
+                if memorial.short_code in taken or memorial.short_code in used:
+                    retry.append(memorial)
+                else:
+                    used.add(memorial.short_code)
+            pending = retry
+        
+        for memorial in memorials:
+            if memorial.qr_code and not memorial.qr_code_data:
+                memorial.qr_code_data = memorial.get_qr_code_path()
+    
+    @classmethod
+    def index_names(cls, memorials):
+        """Write the fuzzy search postings of freshly bulk-created memorials"""
+        MemorialNameGram.objects.bulk_create([
+            MemorialNameGram(memorial=memorial, gram=gram)
+            for memorial in memorials
+            for gram in name_postings(memorial.name_normalized, memorial.name_phonetic)
+        ], batch_size=1000)
     
     def resize_image(self):
         """Resize image to reasonable dimensions for web display"""
         if self.image:
-            img_path = self.image.path
-            if os.path.exists(img_path):
-                with Image.open(img_path) as img:
-                    # Convert to RGB if necessary
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    
-                    # Resize if too large (max 800x600)
-                    if img.width > 800 or img.height > 600:
-                        img.thumbnail((800, 600), Image.Resampling.LANCZOS)
-                        img.save(img_path, quality=85, optimize=True)
+            # Resized variants are shared by every memorial holding the same upload,
+            # so an image still referenced elsewhere is not processed again
+            width, height = settings.PIL_IMAGE_MAX_SIZE
+            variant = f"web-{width}x{height}-q{settings.PIL_IMAGE_QUALITY}"
+            original_name = self.image.name
+            resized_name = get_or_create_derivative(
+                self.image.storage, original_name, variant, render_web_image
+            )
+            if resized_name != original_name:
+                Memorial.objects.filter(pk=self.pk).update(image=resized_name)
+                self.image.name = resized_name
+                # Release the original; it is deleted unless another field still holds it
+                self.image.storage.delete(original_name)
     
     def get_absolute_url(self):
         return f"/memorial/{self.id}"
     
+    def get_qr_code_path(self):
+        """Return the compact path encoded into this memorial's QR code"""
+        if self.short_code:
+            return f"/q/{self.short_code}"
+        return self.get_absolute_url()
+    
+    @classmethod
+    def get_category_mask(cls, categories):
+        """Return the bitmask of a list of category codes, ignoring unknown ones"""
+        mask = 0
+        for category in categories or []:
+            mask |= cls.CATEGORY_BITS.get(category, 0)
+        return mask
+    
+    @classmethod
+    def all_category_masks(cls):
+        """Return every possible category_mask value"""
+        return range(1 << len(cls.CATEGORY_BITS))
+    
     def get_categories_display(self):
         """Return categories as a formatted string"""
         return ', '.join(self.categories) if self.categories else 'No categories'
@@ -93,3 +290,230 @@ class Memorial(models.Model):
             return 'bg-divine-gold/20 text-eternal-bronze border-divine-gold/30'
         else:
             return 'bg-heavenly-blue/20 text-primary border-heavenly-blue/30'
+
+class MemorialNameGram(models.Model):
+    """Fuzzy search posting: one trigram or phonetic key of a memorial's name"""
+    memorial = models.ForeignKey(Memorial, on_delete=models.CASCADE, related_name='name_grams')
+    gram = models.CharField(max_length=16)
+    
+    class Meta:
+        # (gram, memorial) doubles as the lookup index for candidate retrieval
+        unique_together = ['gram', 'memorial']
+        verbose_name = 'Memorial Name Gram'
+        verbose_name_plural = 'Memorial Name Grams'
+    
+    def __str__(self):
+        return f"{self.gram!r} -> {self.memorial_id}"
+
+class FamilyTree(models.Model):
+    """A family graph attached to a memorial"""
+    name = models.CharField(max_length=200)
+    memorial = models.ForeignKey(Memorial, on_delete=models.CASCADE, related_name='family_trees')
+    
+    # Cached adjacency representation, rebuilt on read after people or relationships change
+    graph = models.JSONField(null=True, blank=True, editable=False)
+    graph_version = models.PositiveIntegerField(default=0, editable=False)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Family Tree'
+        verbose_name_plural = 'Family Trees'
+    
+    def __str__(self):
+        return f"{self.name} ({self.memorial.name})"
+    
+    def get_graph(self):
+        """Return the cached adjacency representation, rebuilding it if it was invalidated"""
+        if self.graph is None:
+            from .family import build_graph
+            
+            version = self.graph_version
+            self.graph = build_graph(self.pk)
+            # Only store the result if nothing changed while it was being built
+            FamilyTree.objects.filter(pk=self.pk, graph_version=version).update(graph=self.graph)
+        return self.graph
+    
+    @classmethod
+    def invalidate_graph(cls, tree_id):
+        """Drop the cached graph of a tree after its people or relationships change"""
+        cls.objects.filter(pk=tree_id).update(graph=None, graph_version=models.F('graph_version') + 1)
+
+class FamilyPerson(models.Model):
+    """A person in a family tree, optionally linked to their own memorial"""
+    tree = models.ForeignKey(FamilyTree, on_delete=models.CASCADE, related_name='people')
+    name = models.CharField(max_length=200)
+    memorial = models.ForeignKey(
+        Memorial, on_delete=models.SET_NULL, null=True, blank=True, related_name='family_people'
+    )
+    birth_year = models.SmallIntegerField(null=True, blank=True)
+    death_year = models.SmallIntegerField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Family Person'
+        verbose_name_plural = 'Family People'
+    
+    def __str__(self):
+        return self.name
+    
+    def get_lifespan(self):
+        """Return the years the person lived, e.g. '1934 - 2024'"""
+        if self.birth_year and self.death_year:
+            return f"{self.birth_year} - {self.death_year}"
+        if self.birth_year:
+            return f"b. {self.birth_year}"
+        if self.death_year:
+            return f"d. {self.death_year}"
+        return ''
+
+class FamilyRelationship(models.Model):
+    """A typed edge between two people of the same family tree"""
+    RELATIONSHIP_TYPES = [
+        ('parent', 'Parent'),  # from_person is a parent of to_person
+        ('guardian', 'Guardian'),  # from_person raised to_person
+        ('spouse', 'Spouse'),
+        ('sibling', 'Sibling'),
+    ]
+    
+    # Edges that point from an older generation to a younger one
+    DESCENT_TYPES = ('parent',)
+    
+    tree = models.ForeignKey(FamilyTree, on_delete=models.CASCADE, related_name='relationships')
+    from_person = models.ForeignKey(FamilyPerson, on_delete=models.CASCADE, related_name='relationships_from')
+    to_person = models.ForeignKey(FamilyPerson, on_delete=models.CASCADE, related_name='relationships_to')
+    relationship_type = models.CharField(max_length=20, choices=RELATIONSHIP_TYPES)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['tree', 'from_person', 'relationship_type']
+        unique_together = ['from_person', 'to_person', 'relationship_type']
+        indexes = [
+            # Ancestor traversal walks edges backwards from the child
+            models.Index(fields=['to_person', 'relationship_type'], name='family_rel_to_type_idx'),
+        ]
+        verbose_name = 'Family Relationship'
+        verbose_name_plural = 'Family Relationships'
+    
+    def __str__(self):
+        return f"{self.from_person.name} -> {self.to_person.name} ({self.get_relationship_type_display()})"
+    
+    def save(self, *args, **kwargs):
+        # Edges always live in the tree of the people they connect
+        self.tree_id = self.from_person.tree_id
+        super().save(*args, **kwargs)
+
+class AnniversarySubscriber(models.Model):
+    """A family member notified of a memorial's birth and death anniversaries"""
+    memorial = models.ForeignKey(Memorial, on_delete=models.CASCADE, related_name='anniversary_subscribers')
+    family_person = models.ForeignKey(
+        FamilyPerson, on_delete=models.SET_NULL, null=True, blank=True, related_name='anniversary_subscriptions'
+    )
+    name = models.CharField(max_length=200)
+    email = models.EmailField()
+    language = models.CharField(max_length=10, default='en')  # en, sw (Swahili)
+    notify_birth = models.BooleanField(default=True)
+    notify_death = models.BooleanField(default=True)
+    is_active = models.BooleanField(default=True)
+    confirmed_at = models.DateTimeField(null=True, blank=True)  # Set once the address owner follows the emailed link
+    
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='anniversary_subscriptions'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['memorial', 'name']
+        unique_together = ['memorial', 'email']
+        verbose_name = 'Anniversary Subscriber'
+        verbose_name_plural = 'Anniversary Subscribers'
+    
+    def __str__(self):
+        return f"{self.name} <{self.email}> ({self.memorial.name})"
+    
+    def is_confirmed(self):
+        return self.confirmed_at is not None
+    
+    def wants(self, kind):
+        """Return whether the subscriber wants notifications of this anniversary kind"""
+        return self.notify_birth if kind == 'birth' else self.notify_death
+
+class AnniversaryNotification(models.Model):
+    """Delivery state of one anniversary message; unique per recipient and day so reruns never resend"""
+    KIND_CHOICES = [
+        ('birth', 'Birth'),
+        ('death', 'Death'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    subscriber = models.ForeignKey(AnniversarySubscriber, on_delete=models.CASCADE, related_name='notifications')
+    memorial = models.ForeignKey(Memorial, on_delete=models.CASCADE, related_name='anniversary_notifications')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    anniversary_date = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-anniversary_date', 'id']
+        unique_together = ['subscriber', 'memorial', 'kind', 'anniversary_date']
+        indexes = [
+            models.Index(fields=['anniversary_date', 'status'], name='anniv_notification_day_idx'),
+        ]
+        verbose_name = 'Anniversary Notification'
+        verbose_name_plural = 'Anniversary Notifications'
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} anniversary of {self.memorial_id} to {self.subscriber_id} on {self.anniversary_date}"
+
+class MemorialEngagement(models.Model):
+    """Daily count of one kind of visitor engagement with a memorial, buffered in memory and flushed in bulk"""
+    KIND_CHOICES = [
+        ('view', 'Page view'),
+        ('scan', 'QR scan'),
+    ]
+    
+    memorial = models.ForeignKey(Memorial, on_delete=models.CASCADE, related_name='engagement')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-day', 'memorial']
+        unique_together = ['memorial', 'kind', 'day']
+        indexes = [
+            models.Index(fields=['day'], name='memorial_engagement_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.count} {self.get_kind_display()}(s) of {self.memorial_id} on {self.day}"
+
+class FeaturedMemorial(models.Model):
+    """A place in the precomputed featured list, ranked by decayed engagement (see memorials/ranking.py)"""
+    memorial = models.OneToOneField(Memorial, on_delete=models.CASCADE, related_name='featured_rank')
+    rank = models.PositiveIntegerField(unique=True)
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['rank']
+    
+    def __str__(self):
+        return f"#{self.rank} {self.memorial_id} ({self.score:.2f})"
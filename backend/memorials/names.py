@@ -0,0 +1,209 @@
+"""
+Name normalization, phonetic keys and trigrams for fuzzy memorial search.
+
+Names are folded to lowercase ASCII words, Arabic articles ("al-", "el-",
+"ad-"...) are dropped, and each word gets a phonetic key that collapses the
+usual transliteration variants of English, Swahili and Arabic names
+(Mohammed/Muhammad/Mohamad, Fatima/Faatimah, Hussein/Husayn, Wanjiku/Wanjikũ).
+Trigrams of the normalized name catch typos the phonetic key does not. Both are
+stored as postings in MemorialNameGram so candidate lookup is an index scan.
+"""
+import math
+import re
+import unicodedata
+
+# Arabic definite articles and their sun-letter assimilations
+ARTICLES = {'al', 'el', 'ul', 'il', 'ad', 'ar', 'as', 'at', 'az', 'an', 'ash', 'adh', 'ath'}
+
+VOWELS = set('aeiouy')
+
+# Vowels that transliterations swap freely share a class
+VOWEL_CLASSES = {'a': 'a', 'e': 'i', 'i': 'i', 'y': 'i', 'o': 'u', 'u': 'u'}
+
+# Applied in order; digraphs first so their letters are not rewritten on their own
+PHONETIC_RULES = [
+    ('x', 'ks'),
+    ('dj', 'j'),
+    ('kh', 'k'),
+    ('gh', 'g'),
+    ('ph', 'f'),
+    ('th', 't'),
+    ('dh', 'd'),
+    ('sh', 'x'),
+    ('ch', 'x'),
+    ('ck', 'k'),
+    ('ny', 'n'),
+    ('q', 'k'),
+    ('c', 'k'),
+    ('z', 's'),
+    ('v', 'f'),
+]
+
+PHONETIC_KEY_LENGTH = 8
+
+# Prefix of phonetic keys in the postings table, so they never collide with trigrams
+PHONETIC_PREFIX = '#'
+
+NAME_COUNT_CACHE_KEY = 'memorials:name_count'
+NAME_COUNT_CACHE_TIMEOUT = 60 * 60  # The memorial count only scales gram weights, so it may lag
+
+_SEPARATORS = re.compile(r"[\s\-_.,'`’‘ʿʾ]+")
+
+
+def normalize_name(name):
+    """Fold a name to lowercase ASCII words without accents or punctuation"""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    words = [
+        ''.join(char for char in word if char.isalnum())
+        for word in _SEPARATORS.split(folded)
+    ]
+    words = [word for word in words if word]
+    # Drop Arabic articles unless that would leave nothing
+    meaningful = [word for word in words if word not in ARTICLES]
+    return ' '.join(meaningful or words)
+
+
+def phonetic_token(word):
+    """Return the phonetic key of one normalized word"""
+    if not word:
+        return ''
+    for source, target in PHONETIC_RULES:
+        word = word.replace(source, target)
+    # A final h after a vowel is silent (Fatimah, Aishah, Zahrah)
+    if len(word) > 2 and word.endswith('h') and word[-2] in VOWELS:
+        word = word[:-1]
+
+    # Leading vowels are interchangeable (Ibrahim/Ebrahim, Umar/Omar)
+    key = ['a' if word[0] in VOWELS and word[0] != 'y' else word[0]]
+    vowel_kept = key[0] == 'a'
+    for char in word[1:]:
+        if char in VOWELS:
+            # The first vowel's class separates Hassan from Hussein, while
+            # Mohammed/Muhammad and Youssef/Yusuf still agree
+            if not vowel_kept:
+                key.append(VOWEL_CLASSES[char])
+                vowel_kept = True
+            continue
+        if char == 'w':
+            continue
+        if char != key[-1]:
+            key.append(char)
+    return ''.join(key)[:PHONETIC_KEY_LENGTH]
+
+
+def phonetic_key(normalized):
+    """Return the space separated phonetic keys of a normalized name"""
+    return ' '.join(phonetic_token(word) for word in normalized.split())
+
+
+def trigrams(normalized):
+    """Return the set of word trigrams of a normalized name, padded like pg_trgm"""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+def name_postings(normalized, phonetic):
+    """Return every posting stored for a name: its trigrams and prefixed phonetic keys"""
+    postings = trigrams(normalized)
+    postings.update(PHONETIC_PREFIX + key for key in phonetic.split() if key)
+    return postings
+
+
+def similarity(query_grams, name_grams):
+    """Jaccard similarity of two trigram sets"""
+    if not query_grams or not name_grams:
+        return 0.0
+    return len(query_grams & name_grams) / len(query_grams | name_grams)
+
+
+def match_score(query_normalized, query_phonetic, name_normalized, name_phonetic):
+    """
+    Score how well a stored name matches a query, between 0 and 1.
+
+    Trigram similarity rewards spelling closeness; the phonetic part is the
+    share of query words whose phonetic key appears in the name, so a query
+    for one name out of several still ranks well.
+    """
+    query_keys = set(query_phonetic.split())
+    phonetic = len(query_keys & set(name_phonetic.split())) / len(query_keys) if query_keys else 0.0
+    spelling = similarity(trigrams(query_normalized), trigrams(name_normalized))
+    return round(0.6 * spelling + 0.4 * phonetic, 4)
+
+
+def gram_weights(postings):
+    """
+    Return {posting: weight} for the postings worth counting candidates by.
+
+    Each posting is weighted by its inverse document frequency, so a rare
+    trigram or phonetic key picks candidates over one half the names share.
+    Postings held by more than NAME_MATCH_COMMON_GRAM_SHARE of the memorials
+    are dropped altogether, unless the query has nothing rarer.
+    """
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.db.models import Count
+
+    from .models import Memorial, MemorialNameGram
+
+    frequencies = dict(
+        MemorialNameGram.objects.filter(gram__in=postings)
+        .values_list('gram').annotate(count=Count('id')).order_by()
+    )
+    if not frequencies:
+        return {}
+    total = max(cache.get_or_set(NAME_COUNT_CACHE_KEY, Memorial.objects.count, NAME_COUNT_CACHE_TIMEOUT), 1)
+    distinctive = {
+        gram: count for gram, count in frequencies.items()
+        if count <= total * settings.NAME_MATCH_COMMON_GRAM_SHARE
+    }
+    return {
+        gram: math.log(1 + total / count)
+        for gram, count in (distinctive or frequencies).items()
+    }
+
+
+def fuzzy_search(queryset, query, limit=20, min_score=None):
+    """
+    Return [(memorial, score)] for the memorials in queryset best matching query.
+
+    Candidates are the memorials of queryset sharing the most (IDF weighted)
+    postings with the query, counted with an index scan over
+    MemorialNameGram; only those are scored, so the cost follows the number
+    of matching postings rather than the size of the table.
+    """
+    from django.conf import settings
+    from django.db.models import Case, FloatField, Sum, Value, When
+
+    from .models import MemorialNameGram
+
+    normalized = normalize_name(query)
+    phonetic = phonetic_key(normalized)
+    postings = name_postings(normalized, phonetic)
+    if not postings:
+        return []
+    if min_score is None:
+        min_score = settings.NAME_MATCH_MIN_SCORE
+    weights = gram_weights(postings)
+    if not weights:
+        return []
+
+    candidate_ids = list(
+        MemorialNameGram.objects.filter(gram__in=weights, memorial__in=queryset.values('pk'))
+        .values_list('memorial_id', flat=True)
+        .annotate(weight=Sum(Case(
+            *[When(gram=gram, then=Value(weight)) for gram, weight in weights.items()],
+            output_field=FloatField()
+        )))
+        .order_by('-weight')[:settings.NAME_MATCH_CANDIDATES]
+    )
+    scored = [
+        (memorial, match_score(normalized, phonetic, memorial.name_normalized, memorial.name_phonetic))
+        for memorial in queryset.filter(pk__in=candidate_ids)
+    ]
+    scored = [(memorial, score) for memorial, score in scored if score >= min_score]
+    scored.sort(key=lambda item: (-item[1], item[0].name))
+    return scored[:limit]
@@ -0,0 +1,188 @@
+"""
+Anniversary notification fan-out.
+
+A day's run reads that day's anniversaries and their subscribers in bulk,
+records one AnniversaryNotification per recipient with a single conflict-
+ignoring bulk insert, then sends every notification not yet sent. Messages go
+out in batches, each over one open connection of the configured email backend,
+and their delivery state is written back with one bulk update per batch.
+Running the job again for the same day only retries what did not go out.
+
+Only confirmed subscribers are notified: an address entered by anyone but
+staff first gets a signed confirmation link, see send_confirmation().
+"""
+from collections import defaultdict
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core import signing
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import select_template
+from django.utils import timezone
+
+from .anniversaries import upcoming_anniversaries
+from .models import AnniversaryNotification, AnniversarySubscriber, Memorial
+
+TEMPLATE_PATH = 'memorials/email/anniversary_{kind}_{part}{suffix}.txt'
+
+CONFIRMATION_SALT = 'memorials.anniversary-subscriber'
+
+
+class TemplateCache:
+    """Compiled subject/body templates of one run, looked up once per kind and language"""
+
+    def __init__(self):
+        self._templates = {}
+
+    def render(self, kind, part, language, context):
+        key = (kind, part, language)
+        if key not in self._templates:
+            self._templates[key] = select_template([
+                TEMPLATE_PATH.format(kind=kind, part=part, suffix=f'_{language}'),
+                TEMPLATE_PATH.format(kind=kind, part=part, suffix=''),
+            ])
+        return self._templates[key].render(context)
+
+
+def queue_notifications(date):
+    """Record a pending notification for every subscriber of the day's anniversaries"""
+    entries = upcoming_anniversaries(
+        Memorial.objects.filter(is_active=True).only('id', 'name', 'birth_date', 'death_date', 'birth_day', 'death_day'),
+        date, days=1
+    )
+    kinds = defaultdict(set)
+    for entry in entries:
+        kinds[entry['memorial'].id].add(entry['kind'])
+    if not kinds:
+        return 0
+
+    notifications = [
+        AnniversaryNotification(
+            subscriber=subscriber, memorial_id=subscriber.memorial_id, kind=kind, anniversary_date=date
+        )
+        for subscriber in AnniversarySubscriber.objects.filter(
+            memorial_id__in=kinds, is_active=True, confirmed_at__isnull=False
+        )
+        for kind in sorted(kinds[subscriber.memorial_id])
+        if subscriber.wants(kind)
+    ]
+    # Rows recorded by an earlier run for the same day are left untouched
+    AnniversaryNotification.objects.bulk_create(notifications, batch_size=500, ignore_conflicts=True)
+    return len(notifications)
+
+
+def build_message(notification, templates):
+    """Render the email of one notification"""
+    memorial = notification.memorial
+    subscriber = notification.subscriber
+    original = memorial.birth_date if notification.kind == 'birth' else memorial.death_date
+    context = {
+        'recipient_name': subscriber.name,
+        'memorial_name': memorial.name,
+        'dates': memorial.dates,
+        'years': notification.anniversary_date.year - original.year if original else None,
+        'anniversary_date': notification.anniversary_date,
+        'memorial_url': urljoin(settings.QR_CODE_BASE_URL, settings.MEMORIAL_PAGE_URL.format(id=memorial.id)),
+    }
+    subject = templates.render(notification.kind, 'subject', subscriber.language, context)
+    body = templates.render(notification.kind, 'body', subscriber.language, context)
+    return EmailMessage(
+        subject=' '.join(subject.split()),
+        body=body.strip() + '\n',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[subscriber.email]
+    )
+
+
+def _send_batch(batch, templates):
+    """Send one batch over a single connection, recording each notification's outcome on it"""
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        for notification in batch:
+            notification.attempts += 1
+            notification.status = 'failed'
+            notification.error = f"Could not connect: {exc}"
+        return
+
+    try:
+        for notification in batch:
+            notification.attempts += 1
+            try:
+                connection.send_messages([build_message(notification, templates)])
+            except Exception as exc:
+                notification.status = 'failed'
+                notification.error = str(exc)
+            else:
+                notification.status = 'sent'
+                notification.error = ''
+                notification.sent_at = timezone.now()
+    finally:
+        connection.close()
+
+
+def send_pending(date, batch_size=None, max_attempts=None):
+    """Send the day's notifications that have not gone out yet; returns (sent, failed)"""
+    batch_size = batch_size or settings.ANNIVERSARY_EMAIL_BATCH_SIZE
+    max_attempts = max_attempts or settings.ANNIVERSARY_EMAIL_MAX_ATTEMPTS
+    pending = list(
+        AnniversaryNotification.objects.filter(anniversary_date=date, attempts__lt=max_attempts)
+        .exclude(status='sent')
+        .select_related('subscriber', 'memorial')
+        .order_by('id')
+    )
+
+    templates = TemplateCache()
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        _send_batch(batch, templates)
+        AnniversaryNotification.objects.bulk_update(batch, ['status', 'attempts', 'error', 'sent_at'])
+
+    sent = sum(1 for notification in pending if notification.status == 'sent')
+    return sent, len(pending) - sent
+
+
+def confirmation_token(subscriber):
+    """Signed token confirming a subscriber's current address"""
+    return signing.dumps({'id': subscriber.pk, 'email': subscriber.email}, salt=CONFIRMATION_SALT)
+
+
+def confirm_subscriber(token):
+    """Confirm the subscriber a token was issued for; raises signing.BadSignature or DoesNotExist"""
+    data = signing.loads(token, salt=CONFIRMATION_SALT, max_age=settings.ANNIVERSARY_CONFIRMATION_MAX_AGE)
+    # A token issued for an address the subscriber no longer has confirms nothing
+    subscriber = AnniversarySubscriber.objects.select_related('memorial').get(pk=data['id'], email=data['email'])
+    if not subscriber.is_confirmed():
+        subscriber.confirmed_at = timezone.now()
+        subscriber.save(update_fields=['confirmed_at'])
+    return subscriber
+
+
+def send_confirmation(subscriber_id, confirm_url):
+    """Email a subscriber the link confirming their address; confirm_url gets the token appended"""
+    subscriber = AnniversarySubscriber.objects.select_related('memorial').filter(pk=subscriber_id).first()
+    if subscriber is None or subscriber.is_confirmed():
+        return
+    context = {
+        'recipient_name': subscriber.name,
+        'memorial_name': subscriber.memorial.name,
+        'confirm_url': f"{confirm_url}?token={confirmation_token(subscriber)}",
+    }
+    templates = TemplateCache()
+    subject = templates.render('confirm', 'subject', subscriber.language, context)
+    body = templates.render('confirm', 'body', subscriber.language, context)
+    EmailMessage(
+        subject=' '.join(subject.split()),
+        body=body.strip() + '\n',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[subscriber.email]
+    ).send()
+
+
+def send_anniversary_notifications(date=None, batch_size=None):
+    """Queue and send the notifications of a day (today by default); safe to rerun"""
+    date = date or timezone.localdate()
+    queued = queue_notifications(date)
+    sent, failed = send_pending(date, batch_size=batch_size)
+    return {'date': date, 'recipients': queued, 'sent': sent, 'failed': failed}
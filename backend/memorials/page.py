@@ -0,0 +1,105 @@
+"""
+Aggregated memorial page.
+
+Everything the memorial page shows (the memorial, its timeline stories, its
+WakeRoom experiences and its QR data) is assembled in one payload with a
+fixed number of queries. The payload's version is derived from cheap
+aggregates over the memorial and its related rows (including the life phases
+its stories are grouped under), which doubles as the ETag for conditional
+GETs and as the cache key of the assembled payload, so an unchanged page costs
+four small queries and no serialization.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Prefetch, Sum, prefetch_related_objects
+from django.urls import reverse
+
+from timeline.models import LifePhase, TimelineStory
+from timeline.serializers import TimelineStorySerializer
+from wakeroom.models import WakeRoomExperience
+from wakeroom.serializers import WakeRoomExperienceListSerializer
+
+from .qr import QR_FORMATS, QR_SIZES
+from .serializers import MemorialSerializer
+
+# Bump when the payload layout changes so cached pages are not reused
+PAGE_FORMAT_VERSION = 1
+
+PAGE_CACHE_KEY = 'memorials:page:{pk}:{version}'
+
+
+def _relation_state(queryset):
+    """Count, id sum and latest update of a related queryset; changes whenever a row is added, removed or edited"""
+    state = queryset.order_by().aggregate(count=Count('id'), ids=Sum('id'), updated=Max('updated_at'))
+    return f"{state['count']}:{state['ids']}:{state['updated'].isoformat() if state['updated'] else ''}"
+
+
+def page_version(memorial, host):
+    """Return a digest identifying the current contents of a memorial's page"""
+    parts = [
+        str(PAGE_FORMAT_VERSION),
+        host,
+        str(memorial.pk),
+        memorial.updated_at.isoformat(),
+        _relation_state(TimelineStory.objects.filter(memorial=memorial)),
+        # Stories show their phase's name and are ordered by it
+        _relation_state(LifePhase.objects.filter(
+            pk__in=TimelineStory.objects.filter(memorial=memorial).values('life_phase')
+        )),
+        _relation_state(WakeRoomExperience.objects.filter(associated_memorials=memorial)),
+    ]
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+
+
+def qr_payload(memorial, request):
+    """QR code data of a memorial, as served by the qr_code action"""
+    return {
+        'id': memorial.id,
+        'name': memorial.name,
+        'qr_code_data': memorial.qr_code_data,
+        'qr_code_url': request.build_absolute_uri(memorial.get_absolute_url()),
+        'short_code': memorial.short_code,
+        'short_url': request.build_absolute_uri(memorial.get_qr_code_path()),
+        'qr_image_url': request.build_absolute_uri(
+            reverse('memorial-qr-image', kwargs={'pk': memorial.pk})
+        ),
+        'qr_image_formats': list(QR_FORMATS),
+        'qr_image_sizes': list(QR_SIZES)
+    }
+
+
+def build_page(memorial, request):
+    """Assemble the page payload; the stories and experiences take one query each"""
+    prefetch_related_objects(
+        [memorial],
+        Prefetch(
+            'timeline_stories',
+            queryset=TimelineStory.objects.select_related('life_phase').order_by('life_phase__order', 'created_at')
+        ),
+        Prefetch('wakeroom_experiences', queryset=WakeRoomExperience.objects.order_by('-is_featured', 'title')),
+    )
+    context = {'request': request}
+    stories = memorial.timeline_stories.all()
+    experiences = memorial.wakeroom_experiences.all()
+    return {
+        'memorial': MemorialSerializer(memorial, context=context).data,
+        'timeline_stories': TimelineStorySerializer(stories, many=True, context=context).data,
+        'wakeroom_experiences': WakeRoomExperienceListSerializer(experiences, many=True, context=context).data,
+        'qr': qr_payload(memorial, request),
+        'counts': {
+            'timeline_stories': len(stories),
+            'wakeroom_experiences': len(experiences),
+        }
+    }
+
+
+def get_page(memorial, request, version):
+    """Return the page payload of a version, from the cache when it was already assembled"""
+    key = PAGE_CACHE_KEY.format(pk=memorial.pk, version=version)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_page(memorial, request)
+        cache.set(key, payload, settings.MEMORIAL_PAGE_CACHE_TIMEOUT)
+    return payload
@@ -0,0 +1,270 @@
+"""
+Server-side QR code rendering.
+
+Rendered images are cached on disk under QR_CODE_CACHE_DIR, keyed by a hash of
+the encoded content, format and size, so a given image is rendered once and
+can be served with immutable cache headers. Print sheets for bulk export are
+rendered in a process pool; the rendering functions used by the workers only
+depend on their arguments, never on Django state.
+"""
+import hashlib
+import io
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin
+
+import qrcode
+from django.conf import settings
+from PIL import Image, ImageDraw, ImageFont
+
+QR_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+QR_SIZES = {
+    'small': 128,
+    'medium': 256,
+    'large': 512,
+    'print': 1024,
+}
+
+# Bump when the rendering output changes so old cache entries are not reused
+QR_RENDER_VERSION = 1
+
+QR_BORDER = 4
+
+
+def qr_content(path, request=None):
+    """Return the absolute URL encoded into the QR code for a relative path"""
+    base_url = getattr(settings, 'QR_CODE_BASE_URL', '')
+    if base_url:
+        return urljoin(base_url, path)
+    if request is not None:
+        return request.build_absolute_uri(path)
+    return path
+
+
+def qr_digest(content, fmt, size):
+    """Return the cache key of a rendered QR image"""
+    key = f"{QR_RENDER_VERSION}|{fmt}|{size}|{content}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def qr_cache_path(digest, fmt, cache_dir=None):
+    """Return the on-disk location of a cached QR image"""
+    cache_dir = cache_dir or settings.QR_CODE_CACHE_DIR
+    return os.path.join(cache_dir, digest[:2], f"{digest}.{fmt}")
+
+
+def _qr_matrix(content):
+    """Return the module matrix (including the quiet zone) for the content"""
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=QR_BORDER)
+    qr.add_data(content)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def render_qr_png(content, pixels):
+    """Render a QR code as a PIL image no larger than pixels x pixels"""
+    matrix = _qr_matrix(content)
+    modules = len(matrix)
+    box_size = max(1, pixels // modules)
+
+    img = Image.new('1', (modules, modules), 1)
+    img.putdata([0 if cell else 1 for row in matrix for cell in row])
+    # Nearest-neighbour scaling keeps module edges sharp for scanners
+    return img.resize((modules * box_size, modules * box_size), Image.Resampling.NEAREST)
+
+
+def render_qr_svg(content, pixels):
+    """Render a QR code as a single-path SVG document"""
+    matrix = _qr_matrix(content)
+    modules = len(matrix)
+
+    path = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < modules:
+            if row[x]:
+                start = x
+                while x < modules and row[x]:
+                    x += 1
+                path.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+            else:
+                x += 1
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+        f'<rect width="{modules}" height="{modules}" fill="#fff"/>'
+        f'<path d="{"".join(path)}" fill="#000"/></svg>'
+    ).encode('utf-8')
+
+
+def render_qr(content, fmt='png', size='medium'):
+    """Render a QR code and return the encoded image bytes"""
+    if fmt not in QR_FORMATS:
+        raise ValueError(f"Invalid QR format: {fmt}")
+    if size not in QR_SIZES:
+        raise ValueError(f"Invalid QR size: {size}")
+
+    pixels = QR_SIZES[size]
+    if fmt == 'svg':
+        return render_qr_svg(content, pixels)
+
+    buffer = io.BytesIO()
+    render_qr_png(content, pixels).save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def _write_atomic(path, data):
+    """Write bytes to path so readers never observe a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _ensure_cached(content, fmt, size, cache_dir):
+    """Render the QR image into cache_dir if needed and return its digest"""
+    digest = qr_digest(content, fmt, size)
+    path = qr_cache_path(digest, fmt, cache_dir)
+    if not os.path.exists(path):
+        _write_atomic(path, render_qr(content, fmt, size))
+    return digest
+
+
+def ensure_qr_image(content, fmt='png', size='medium'):
+    """Render the QR image into the disk cache if needed and return its digest"""
+    return _ensure_cached(content, fmt, size, settings.QR_CODE_CACHE_DIR)
+
+
+def _warm_qr_image(args):
+    """Process pool entry point for ensure_qr_image"""
+    return _ensure_cached(*args)
+
+
+def warm_qr_cache(contents, formats=None, sizes=None, workers=None):
+    """Pre-render QR images for many contents, returning the number rendered"""
+    formats = formats or list(QR_FORMATS)
+    sizes = sizes or list(QR_SIZES)
+    jobs = [
+        (content, fmt, size, settings.QR_CODE_CACHE_DIR)
+        for content in contents for fmt in formats for size in sizes
+    ]
+    if len(jobs) < 32 or workers == 1:
+        return len([_warm_qr_image(job) for job in jobs])
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return len(list(executor.map(_warm_qr_image, jobs, chunksize=16)))
+
+
+# Print sheets
+
+SHEET_DPI = 300
+SHEET_SIZE = (2480, 3508)  # A4 at 300 DPI
+SHEET_MARGIN = 120
+SHEET_LABEL_HEIGHT = 90
+
+
+def _sheet_font(size):
+    """Return a label font, falling back to the bitmap default"""
+    try:
+        return ImageFont.load_default(size=size)
+    except (TypeError, OSError):
+        return ImageFont.load_default()
+
+
+def render_qr_sheet(entries, path, columns=4, rows=5):
+    """
+    Render one printable sheet of QR codes with their labels to path.
+
+    entries is a list of (content, title, subtitle) tuples; the file format is
+    taken from the path extension (.pdf or .png).
+    """
+    sheet = Image.new('L', SHEET_SIZE, 255)
+    draw = ImageDraw.Draw(sheet)
+    title_font = _sheet_font(36)
+    subtitle_font = _sheet_font(28)
+
+    cell_width = (SHEET_SIZE[0] - 2 * SHEET_MARGIN) // columns
+    cell_height = (SHEET_SIZE[1] - 2 * SHEET_MARGIN) // rows
+    qr_pixels = min(cell_width, cell_height - SHEET_LABEL_HEIGHT) - 20
+
+    for index, (content, title, subtitle) in enumerate(entries[:columns * rows]):
+        column, row = index % columns, index // columns
+        left = SHEET_MARGIN + column * cell_width
+        top = SHEET_MARGIN + row * cell_height
+
+        qr_img = render_qr_png(content, qr_pixels)
+        sheet.paste(qr_img, (left + (cell_width - qr_img.width) // 2, top))
+
+        label_top = top + qr_img.height + 8
+        center = left + cell_width // 2
+        draw.text((center, label_top), title[:40], fill=0, font=title_font, anchor='ma')
+        if subtitle:
+            draw.text((center, label_top + 42), subtitle[:40], fill=64, font=subtitle_font, anchor='ma')
+
+    _, extension = os.path.splitext(path)
+    if extension.lower() == '.pdf':
+        # Bilevel pages are stored losslessly and stay small; JPEG would blur the modules
+        sheet.convert('1', dither=Image.Dither.NONE).save(path, 'PDF', resolution=SHEET_DPI)
+    else:
+        sheet.save(path, 'PNG', optimize=True)
+    return path
+
+
+def _render_qr_sheet(args):
+    """Process pool entry point for render_qr_sheet"""
+    return render_qr_sheet(*args)
+
+
+def export_qr_sheets(entries, output_dir, fmt='pdf', columns=4, rows=5, workers=None):
+    """
+    Render print sheets for an iterable of (content, title, subtitle) entries.
+
+    Sheets are rendered concurrently in a process pool, one file per page, and
+    at most a few pages per worker are queued at a time so memory stays
+    bounded however many entries are exported. Returns the written paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    per_sheet = columns * rows
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+
+    def pages():
+        page = []
+        for entry in entries:
+            page.append(entry)
+            if len(page) == per_sheet:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    paths = []
+    pending = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for number, page in enumerate(pages(), start=1):
+            path = os.path.join(output_dir, f"qr-sheet-{number:04d}.{fmt}")
+            pending.append(executor.submit(_render_qr_sheet, (page, path, columns, rows)))
+            if len(pending) >= max_pending:
+                paths.append(pending.pop(0).result())
+        paths.extend(future.result() for future in pending)
+    return paths
+
+
+def sheet_count(total, columns=4, rows=5):
+    """Return the number of sheets needed for total entries"""
+    return math.ceil(total / (columns * rows))
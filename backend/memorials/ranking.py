@@ -0,0 +1,162 @@
+"""
+Engagement-ranked featured memorials.
+
+Page views and QR scans are counted per memorial and day. The counts are kept
+in memory and added to MemorialEngagement in bulk by the background pool at
+most ENGAGEMENT_FLUSH_INTERVAL seconds after the first of them was recorded,
+however little traffic follows, so recording one costs the request a counter
+increment rather than a database write (a crash loses at most that interval's
+counts).
+
+rank_featured(), run periodically by `manage.py rank_featured_memorials`,
+scores every memorial from its views, scans and WakeRoom sessions, each
+weighted by ENGAGEMENT_WEIGHTS and halved for every ENGAGEMENT_HALF_LIFE_DAYS
+of age, plus the log-scaled number of its timeline stories. The top
+FEATURED_RANKED_COUNT are stored in FeaturedMemorial; the featured endpoint
+only reads that stored list, whatever the number of memorials.
+"""
+import math
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from kardiversebackend.tasks import run_in_background
+from timeline.models import TimelineStory
+from wakeroom.models import WakeRoomSession
+
+from .models import FeaturedMemorial, Memorial, MemorialEngagement
+
+FEATURED_CACHE_KEY = 'memorials:featured:ids'
+
+_pending = Counter()
+_pending_lock = threading.Lock()
+_flush_timer = None
+
+
+def record_engagement(memorial_id, kind):
+    """Count a view or scan of a memorial; buffered counts are flushed in the background"""
+    global _flush_timer
+    with _pending_lock:
+        _pending[(memorial_id, kind, timezone.localdate())] += 1
+        if len(_pending) < settings.ENGAGEMENT_FLUSH_MAX_KEYS:
+            if _flush_timer is None:
+                _flush_timer = threading.Timer(settings.ENGAGEMENT_FLUSH_INTERVAL, flush_pending)
+                _flush_timer.daemon = True
+                _flush_timer.start()
+            return
+    flush_pending()
+
+
+def take_pending():
+    """Return and clear the buffered counts, cancelling the scheduled flush"""
+    global _flush_timer
+    with _pending_lock:
+        counts = dict(_pending)
+        _pending.clear()
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+    return counts
+
+
+def flush_pending():
+    """Hand the buffered counts to the background pool"""
+    counts = take_pending()
+    if counts:
+        run_in_background(flush_engagement, counts)
+
+
+def flush_engagement(counts):
+    """Add {(memorial id, kind, day): count} to the stored daily totals"""
+    # Memorials deleted since their engagement was counted are dropped
+    existing = set(Memorial.objects.filter(
+        pk__in={memorial_id for memorial_id, _, _ in counts}
+    ).values_list('pk', flat=True))
+    counts = {key: count for key, count in counts.items() if key[0] in existing}
+
+    # Keys sharing a kind, day and count are updated by one statement; most counts are small
+    groups = defaultdict(list)
+    for (memorial_id, kind, day), count in counts.items():
+        groups[(kind, day, count)].append(memorial_id)
+    with transaction.atomic():
+        MemorialEngagement.objects.bulk_create([
+            MemorialEngagement(memorial_id=memorial_id, kind=kind, day=day, count=0)
+            for memorial_id, kind, day in counts
+        ], ignore_conflicts=True)
+        for (kind, day, count), memorial_ids in groups.items():
+            MemorialEngagement.objects.filter(memorial_id__in=memorial_ids, kind=kind, day=day).update(
+                count=F('count') + count
+            )
+
+
+def engagement_scores(today=None):
+    """Return {memorial id: score} from decayed views, scans and sessions and from story counts"""
+    today = today or timezone.localdate()
+    since = today - timedelta(days=settings.ENGAGEMENT_WINDOW_DAYS)
+    weights = settings.ENGAGEMENT_WEIGHTS
+
+    def decayed(weight, count, day):
+        return weight * count * 0.5 ** ((today - day).days / settings.ENGAGEMENT_HALF_LIFE_DAYS)
+
+    scores = defaultdict(float)
+    engagement = MemorialEngagement.objects.filter(day__gte=since, day__lte=today).values_list(
+        'memorial_id', 'kind', 'day', 'count'
+    )
+    for memorial_id, kind, day, count in engagement.iterator():
+        scores[memorial_id] += decayed(weights[kind], count, day)
+
+    sessions = WakeRoomSession.objects.filter(
+        memorial__isnull=False, start_time__date__gte=since
+    ).annotate(day=TruncDate('start_time')).values_list('memorial_id', 'day').annotate(count=Count('id')).order_by()
+    for memorial_id, day, count in sessions:
+        scores[memorial_id] += decayed(weights['session'], count, day)
+
+    stories = TimelineStory.objects.values_list('memorial_id').annotate(count=Count('id')).order_by()
+    for memorial_id, count in stories:
+        scores[memorial_id] += weights['story'] * math.log1p(count)
+    return scores
+
+
+def rank_featured(today=None):
+    """Store the highest scoring active memorials as the featured list and prune expired counts"""
+    today = today or timezone.localdate()
+    # Counts buffered by this process are included rather than left for the timer
+    counts = take_pending()
+    if counts:
+        flush_engagement(counts)
+    scores = engagement_scores(today)
+    active = set(Memorial.objects.filter(is_active=True).values_list('pk', flat=True))
+    # Ties go to the newer memorial
+    ranked = sorted(
+        (pk for pk, score in scores.items() if score > 0 and pk in active),
+        key=lambda pk: (-scores[pk], -pk)
+    )[:settings.FEATURED_RANKED_COUNT]
+
+    computed_at = timezone.now()
+    with transaction.atomic():
+        FeaturedMemorial.objects.all().delete()
+        FeaturedMemorial.objects.bulk_create([
+            FeaturedMemorial(memorial_id=pk, rank=rank, score=scores[pk], computed_at=computed_at)
+            for rank, pk in enumerate(ranked, start=1)
+        ])
+        pruned, _ = MemorialEngagement.objects.filter(
+            day__lt=today - timedelta(days=settings.ENGAGEMENT_WINDOW_DAYS)
+        ).delete()
+    cache.delete(FEATURED_CACHE_KEY)
+    return {'scored': len(scores), 'ranked': len(ranked), 'pruned': pruned}
+
+
+def featured_ids():
+    """Ids of the ranked featured list, best first"""
+    ids = cache.get(FEATURED_CACHE_KEY)
+    if ids is None:
+        ids = list(FeaturedMemorial.objects.values_list('memorial_id', flat=True))
+        cache.set(FEATURED_CACHE_KEY, ids, settings.FEATURED_CACHE_TIMEOUT)
+    return ids
@@ -1,23 +1,32 @@
 from rest_framework import serializers
-from .models import Memorial
+from kardiversebackend.fieldsets import SparseFieldsMixin
+from .models import AnniversarySubscriber, FamilyPerson, FamilyRelationship, FamilyTree, Memorial
 
-class MemorialSerializer(serializers.ModelSerializer):
+class MemorialSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Memorial model"""
-    religion_icon = serializers.CharField(read_only=True)
-    religion_color_class = serializers.CharField(read_only=True)
-    categories_display = serializers.CharField(read_only=True)
+    religion_icon = serializers.CharField(source='get_religion_icon', read_only=True)
+    religion_color_class = serializers.CharField(source='get_religion_color_class', read_only=True)
+    categories_display = serializers.CharField(source='get_categories_display', read_only=True)
     image_url = serializers.SerializerMethodField()
     
+    field_dependencies = {
+        'religion_icon': ['religion'],
+        'religion_color_class': ['religion'],
+        'categories_display': ['categories'],
+        'image_url': ['image'],
+        'get_absolute_url': [],
+    }
+    
     class Meta:
         model = Memorial
         fields = [
             'id', 'name', 'dates', 'birth_date', 'death_date', 'image', 'image_url',
             'religion', 'religion_icon', 'religion_color_class', 'categories', 'categories_display',
-            'description', 'qr_code', 'qr_code_data', 'family_members', 'life_story',
+            'description', 'excerpt', 'qr_code', 'qr_code_data', 'short_code', 'family_members', 'life_story',
             'favorite_quotes', 'achievements', 'created_at', 'updated_at', 'is_active',
             'language', 'get_absolute_url'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'religion_icon', 'religion_color_class']
+        read_only_fields = ['id', 'short_code', 'created_at', 'updated_at', 'religion_icon', 'religion_color_class']
     
     def get_image_url(self, obj):
         """Return full URL for image if it exists"""
@@ -27,30 +36,24 @@ class MemorialSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.image.url)
             return obj.image.url
         return None
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        
-        # Add computed fields
-        data['religion_icon'] = instance.get_religion_icon()
-        data['religion_color_class'] = instance.get_religion_color_class()
-        data['categories_display'] = instance.get_categories_display()
-        data['get_absolute_url'] = instance.get_absolute_url()
-        
-        return data
 
-class MemorialListSerializer(serializers.ModelSerializer):
+class MemorialListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Simplified serializer for memorial lists"""
-    religion_icon = serializers.CharField(read_only=True)
-    religion_color_class = serializers.CharField(read_only=True)
+    religion_icon = serializers.CharField(source='get_religion_icon', read_only=True)
+    religion_color_class = serializers.CharField(source='get_religion_color_class', read_only=True)
     image_url = serializers.SerializerMethodField()
     
+    field_dependencies = {
+        'religion_icon': ['religion'],
+        'religion_color_class': ['religion'],
+        'image_url': ['image'],
+    }
+    
     class Meta:
         model = Memorial
         fields = [
             'id', 'name', 'dates', 'image', 'image_url', 'religion', 'religion_icon',
-            'religion_color_class', 'categories', 'description', 'qr_code', 'language'
+            'religion_color_class', 'categories', 'excerpt', 'qr_code', 'language'
         ]
     
     def get_image_url(self, obj):
@@ -61,13 +64,6 @@ class MemorialListSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.image.url)
             return obj.image.url
         return None
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['religion_icon'] = instance.get_religion_icon()
-        data['religion_color_class'] = instance.get_religion_color_class()
-        return data
 
 class MemorialCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new memorials"""
@@ -112,4 +108,98 @@ class MemorialUpdateSerializer(serializers.ModelSerializer):
         for category in value:
             if category not in allowed_categories:
                 raise serializers.ValidationError(f"Invalid category: {category}")
-        return value 
\ No newline at end of file
+        return value
+
+class FamilyTreeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer for FamilyTree model"""
+    memorial_name = serializers.CharField(source='memorial.name', read_only=True)
+    
+    class Meta:
+        model = FamilyTree
+        fields = ['id', 'name', 'memorial', 'memorial_name', 'graph_version', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'graph_version', 'created_at', 'updated_at']
+
+class FamilyPersonSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer for FamilyPerson model"""
+    lifespan = serializers.CharField(source='get_lifespan', read_only=True)
+    
+    field_dependencies = {'lifespan': ['birth_year', 'death_year']}
+    
+    class Meta:
+        model = FamilyPerson
+        fields = [
+            'id', 'tree', 'name', 'memorial', 'birth_year', 'death_year', 'lifespan',
+            'notes', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def validate(self, data):
+        """Validate the birth and death years are in order and the person stays in their tree"""
+        tree = data.get('tree')
+        if self.instance is not None and tree is not None and tree.pk != self.instance.tree_id:
+            raise serializers.ValidationError({'tree': "A person cannot be moved to another family tree"})
+        birth_year = data.get('birth_year', getattr(self.instance, 'birth_year', None))
+        death_year = data.get('death_year', getattr(self.instance, 'death_year', None))
+        if birth_year and death_year and death_year < birth_year:
+            raise serializers.ValidationError("Death year cannot be before birth year")
+        return data
+
+class FamilyRelationshipSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer for FamilyRelationship model"""
+    from_person_name = serializers.CharField(source='from_person.name', read_only=True)
+    to_person_name = serializers.CharField(source='to_person.name', read_only=True)
+    
+    class Meta:
+        model = FamilyRelationship
+        fields = [
+            'id', 'tree', 'from_person', 'from_person_name', 'to_person', 'to_person_name',
+            'relationship_type', 'created_at'
+        ]
+        read_only_fields = ['id', 'tree', 'created_at']
+    
+    def validate(self, data):
+        """Validate the edge connects two people of one tree without creating a cycle"""
+        from .family import ancestors
+        
+        from_person = data.get('from_person', getattr(self.instance, 'from_person', None))
+        to_person = data.get('to_person', getattr(self.instance, 'to_person', None))
+        relationship_type = data.get('relationship_type', getattr(self.instance, 'relationship_type', None))
+        
+        if from_person.pk == to_person.pk:
+            raise serializers.ValidationError("A person cannot be related to themselves")
+        if from_person.tree_id != to_person.tree_id:
+            raise serializers.ValidationError("Both people must belong to the same family tree")
+        
+        if relationship_type in FamilyRelationship.DESCENT_TYPES:
+            if any(person.pk == to_person.pk for person in ancestors(from_person.pk)):
+                raise serializers.ValidationError(
+                    f"{to_person.name} is already an ancestor of {from_person.name}"
+                )
+        else:
+            # Symmetric relationships are stored once, in either direction
+            reverse = FamilyRelationship.objects.filter(
+                from_person=to_person, to_person=from_person, relationship_type=relationship_type
+            )
+            if reverse.exists():
+                raise serializers.ValidationError("This relationship already exists")
+        return data
+
+class AnniversarySubscriberSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer for AnniversarySubscriber model"""
+    memorial_name = serializers.CharField(source='memorial.name', read_only=True)
+    
+    class Meta:
+        model = AnniversarySubscriber
+        fields = [
+            'id', 'memorial', 'memorial_name', 'family_person', 'name', 'email', 'language',
+            'notify_birth', 'notify_death', 'is_active', 'confirmed_at', 'created_at'
+        ]
+        read_only_fields = ['id', 'confirmed_at', 'created_at']
+    
+    def validate(self, data):
+        """Validate a linked family person belongs to one of the memorial's trees"""
+        memorial = data.get('memorial', getattr(self.instance, 'memorial', None))
+        family_person = data.get('family_person', getattr(self.instance, 'family_person', None))
+        if family_person and family_person.tree.memorial_id != memorial.pk:
+            raise serializers.ValidationError("The family person must belong to a tree of this memorial")
+        return data
@@ -0,0 +1,96 @@
+"""
+Compact base62 short codes for memorial QR codes and the in-process caches used
+by the short code resolver.
+"""
+import secrets
+import string
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+BASE62_ALPHABET = string.digits + string.ascii_letters
+
+SHORT_CODE_LENGTH = 7  # 62**7 ~ 3.5e12 codes
+
+
+def base62_encode(number):
+    """Encode a non-negative integer as a base62 string"""
+    if number < 0:
+        raise ValueError("Cannot base62-encode a negative number")
+    if number == 0:
+        return BASE62_ALPHABET[0]
+    digits = []
+    while number:
+        number, remainder = divmod(number, 62)
+        digits.append(BASE62_ALPHABET[remainder])
+    return ''.join(reversed(digits))
+
+
+def generate_short_code(length=SHORT_CODE_LENGTH):
+    """Return a random, non-sequential base62 short code"""
+    return base62_encode(secrets.randbelow(62 ** length)).rjust(length, BASE62_ALPHABET[0])
+
+
+def is_valid_short_code(value):
+    """Check that value could be a short code without touching the database"""
+    return 0 < len(value) <= 16 and all(char in BASE62_ALPHABET for char in value)
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU cache with a time-to-live per entry.
+
+    Entries live in the worker process only, so the TTL bounds how stale a
+    cached value can get when another process changes the underlying row.
+    """
+
+    def __init__(self, maxsize=4096, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at < now:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+short_code_cache = LRUCache(
+    maxsize=settings.SHORT_CODE_CACHE_SIZE,
+    ttl=settings.SHORT_CODE_CACHE_TTL,
+)
+
+# Codes that resolved to nothing, kept apart so scans of unknown codes never evict resolved ones
+missing_short_code_cache = LRUCache(
+    maxsize=settings.SHORT_CODE_MISS_CACHE_SIZE,
+    ttl=settings.SHORT_CODE_MISS_CACHE_TTL,
+)
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .anniversaries import invalidate_digest
+from .models import FamilyPerson, FamilyRelationship, FamilyTree, Memorial
+from .shortcodes import missing_short_code_cache, short_code_cache
+
+
+@receiver(post_save, sender=Memorial)
+@receiver(post_delete, sender=Memorial)
+def invalidate_short_code(sender, instance, **kwargs):
+    """Drop the memorial's resolver entry so scans see the change immediately"""
+    if instance.short_code:
+        short_code_cache.invalidate(instance.short_code)
+        missing_short_code_cache.invalidate(instance.short_code)
+
+
+@receiver(post_save, sender=Memorial)
+@receiver(post_delete, sender=Memorial)
+def invalidate_anniversary_digest(sender, instance, **kwargs):
+    """Rebuild today's digest on next request, as the memorial may have entered or left it"""
+    invalidate_digest()
+
+
+@receiver(pre_save, sender=FamilyPerson)
+@receiver(pre_save, sender=FamilyRelationship)
+def remember_previous_tree(sender, instance, **kwargs):
+    """Note the tree a saved person or relationship was stored in, as the save may move it"""
+    if instance.pk is not None:
+        instance._previous_tree_id = sender.objects.filter(pk=instance.pk).values_list('tree_id', flat=True).first()
+
+
+@receiver(post_save, sender=FamilyPerson)
+@receiver(post_delete, sender=FamilyPerson)
+@receiver(post_save, sender=FamilyRelationship)
+@receiver(post_delete, sender=FamilyRelationship)
+def invalidate_family_graph(sender, instance, **kwargs):
+    """Drop the cached adjacency representation of the tree, and of the tree it was moved out of"""
+    FamilyTree.invalidate_graph(instance.tree_id)
+    previous_tree_id = getattr(instance, '_previous_tree_id', None)
+    if previous_tree_id is not None and previous_tree_id != instance.tree_id:
+        FamilyTree.invalidate_graph(previous_tree_id)
@@ -1,3 +1,100 @@
+import io
+import json
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .importer import import_stream
+from .models import FamilyPerson, FamilyRelationship, FamilyTree, Memorial
+
+
+def memorial_record(name, **fields):
+    return dict({'name': name, 'dates': '1900 - 1980', 'religion': 'Christian', 'description': 'A life.'}, **fields)
+
+
+class ImportTests(TestCase):
+    """Bulk imports report bad rows and keep going"""
+
+    def test_jsonl_image_that_is_not_a_name_is_reported(self):
+        lines = [
+            memorial_record('Ada Example'),
+            memorial_record('Ben Example', image=123),
+            memorial_record('Cleo Example'),
+        ]
+        data = '\n'.join(json.dumps(line) for line in lines).encode('utf-8')
+
+        result = import_stream(io.BytesIO(data), 'jsonl', chunk_size=2)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([error['row'] for error in result.errors], [2])
+        self.assertIn('image', result.errors[0]['errors'])
+        self.assertEqual(
+            sorted(Memorial.objects.values_list('name', flat=True)), ['Ada Example', 'Cleo Example']
+        )
+
+    def test_csv_row_with_invalid_utf8_is_reported(self):
+        data = (
+            b'name,dates,religion,description\n'
+            b'Ada Example,1900 - 1980,Christian,A life.\n'
+            b'Ben \xff Example,1900 - 1980,Christian,A life.\n'
+            b'Cleo Example,1900 - 1980,Christian,"A life,\nwell lived."\n'
+        )
+
+        result = import_stream(io.BytesIO(data), 'csv', chunk_size=2)
+
+        self.assertEqual((result.rows, result.created, result.failed), (3, 2, 1))
+        self.assertEqual(result.errors[0]['row'], 2)
+        self.assertIn('UTF-8', result.errors[0]['errors']['non_field_errors'][0])
+        self.assertEqual(
+            sorted(Memorial.objects.values_list('name', flat=True)), ['Ada Example', 'Cleo Example']
+        )
+
+    def test_jsonl_line_with_invalid_utf8_is_reported(self):
+        data = json.dumps(memorial_record('Ada Example')).encode('utf-8') + b'\n{"name": "B\xc3"}\n'
+
+        result = import_stream(io.BytesIO(data), 'jsonl')
+
+        self.assertEqual((result.created, result.failed), (1, 1))
+        self.assertEqual(result.errors[0]['row'], 2)
+
+
+class FamilyGraphTests(TestCase):
+    """Cached family graphs follow people and relationships between trees"""
+
+    def setUp(self):
+        memorial = Memorial.objects.create(**memorial_record('Ada Example'))
+        self.tree = FamilyTree.objects.create(name='Example family', memorial=memorial)
+        self.other_tree = FamilyTree.objects.create(name='Other family', memorial=memorial)
+        self.parent = FamilyPerson.objects.create(tree=self.tree, name='Parent')
+        self.child = FamilyPerson.objects.create(tree=self.tree, name='Child')
+        FamilyRelationship.objects.create(
+            tree=self.tree, from_person=self.parent, to_person=self.child, relationship_type='parent'
+        )
+
+    def cached_graph(self, tree):
+        return FamilyTree.objects.get(pk=tree.pk).graph
+
+    def test_moving_a_person_drops_the_graph_of_both_trees(self):
+        self.tree.get_graph()
+        self.other_tree.get_graph()
+
+        self.child.tree = self.other_tree
+        self.child.save()
+
+        self.assertIsNone(self.cached_graph(self.tree))
+        self.assertIsNone(self.cached_graph(self.other_tree))
+
+    def test_api_rejects_moving_a_person_to_another_tree(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('keeper'))
+        url = f'/api/v1/family/people/{self.child.pk}/'
+
+        response = client.patch(url, {'tree': self.other_tree.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('tree', response.json())
 
-# Create your tests here.
+        response = client.patch(url, {'tree': self.tree.pk, 'notes': 'Youngest'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.child.refresh_from_db()
+        self.assertEqual((self.child.tree_id, self.child.notes), (self.tree.pk, 'Youngest'))
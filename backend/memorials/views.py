@@ -1,18 +1,143 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from django.shortcuts import get_object_or_404
+import json
+import os
+import re
 
-from .models import Memorial
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q, Count
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotFound, HttpResponseRedirect
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET
+
+from kardiversebackend.exports import StreamingExportMixin
+from kardiversebackend.fieldsets import SparseFieldsViewMixin
+from kardiversebackend.renderers import NativeTypesViewMixin
+from kardiversebackend.includes import Include
+from kardiversebackend.retrieval import BatchRetrieveMixin
+from kardiversebackend.tasks import run_in_background
+from timeline.serializers import TimelineStorySerializer
+from wakeroom.serializers import WakeRoomExperienceListSerializer
+from .anniversaries import ANNIVERSARY_KINDS, daily_digest, upcoming_anniversaries
+from .family import ancestors, descendants, describe_path, relation_path
+from .importer import IMPORT_FORMATS, detect_format, import_stream
+from .models import AnniversarySubscriber, FamilyPerson, FamilyRelationship, FamilyTree, Memorial
+from .names import fuzzy_search, normalize_name, phonetic_key
+from .notifications import confirm_subscriber, send_confirmation
+from .page import get_page, page_version, qr_payload
+from .qr import QR_FORMATS, QR_SIZES, ensure_qr_image, qr_cache_path, qr_content
+from .ranking import featured_ids, record_engagement
+from .shortcodes import is_valid_short_code, missing_short_code_cache, short_code_cache
 from .serializers import (
     MemorialSerializer, MemorialListSerializer, MemorialCreateSerializer,
-    MemorialUpdateSerializer
+    MemorialUpdateSerializer, FamilyTreeSerializer, FamilyPersonSerializer,
+    FamilyRelationshipSerializer, AnniversarySubscriberSerializer
 )
 
-class MemorialViewSet(viewsets.ModelViewSet):
+QR_DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+@require_GET
+def qr_image(request, digest, fmt):
+    """Serve a cached, content-addressed QR image with immutable cache headers"""
+    if fmt not in QR_FORMATS or not QR_DIGEST_RE.match(digest):
+        raise Http404("QR image not found")
+    path = qr_cache_path(digest, fmt)
+    if not os.path.exists(path):
+        raise Http404("QR image not found")
+    
+    response = FileResponse(open(path, 'rb'), content_type=QR_FORMATS[fmt])
+    response['ETag'] = f'"{digest}"'
+    patch_cache_control(response, public=True, immutable=True, max_age=settings.QR_CODE_CACHE_MAX_AGE)
+    return response
+
+
+def qr_image_redirect(request, path):
+    """Render (or reuse) the QR image for a relative path and redirect to it"""
+    fmt = request.query_params.get('fmt', 'png')
+    size = request.query_params.get('size', 'medium')
+    if fmt not in QR_FORMATS or size not in QR_SIZES:
+        return Response(
+            {
+                'error': 'Invalid QR image format or size',
+                'formats': list(QR_FORMATS),
+                'sizes': list(QR_SIZES)
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    digest = ensure_qr_image(qr_content(path, request), fmt, size)
+    response = redirect(reverse('qr-image', kwargs={'digest': digest, 'fmt': fmt}))
+    # The redirect target changes with the content, so the redirect must not be cached for long
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _load_short_code(code):
+    """Return (memorial id, redirect location, encoded JSON summary) for a short code, or None"""
+    memorial = Memorial.objects.filter(short_code=code, is_active=True).values(
+        'id', 'name', 'dates', 'religion', 'excerpt', 'image', 'language'
+    ).first()
+    if memorial is None:
+        return None
+    
+    location = settings.MEMORIAL_PAGE_URL.format(id=memorial['id'])
+    summary = {
+        'id': memorial['id'],
+        'name': memorial['name'],
+        'dates': memorial['dates'],
+        'religion': memorial['religion'],
+        'description': memorial['excerpt'],
+        'image_url': settings.MEDIA_URL + memorial['image'] if memorial['image'] else None,
+        'language': memorial['language'],
+        'url': location
+    }
+    return memorial['id'], location, json.dumps(summary).encode('utf-8')
+
+
+@require_GET
+def resolve_short_code(request, code):
+    """
+    Resolve a QR short code to its memorial.
+    
+    This is the scan hot path, so it deliberately bypasses DRF and never
+    touches the session or user; resolved codes are served from an in-process
+    LRU, and unknown ones from a separate smaller one so they cannot evict
+    resolved codes. Scanners are redirected to the memorial page, while clients asking
+    for JSON (?format=json or Accept: application/json) get a short summary.
+    """
+    entry = short_code_cache.get(code)
+    if entry is None:
+        if not is_valid_short_code(code) or missing_short_code_cache.get(code):
+            return HttpResponseNotFound()
+        entry = _load_short_code(code)
+        if entry is None:
+            missing_short_code_cache.set(code, True)
+            return HttpResponseNotFound()
+        short_code_cache.set(code, entry)
+    
+    memorial_id, location, summary = entry
+    record_engagement(memorial_id, 'scan')
+    if request.GET.get('format') == 'json' or 'application/json' in request.headers.get('Accept', ''):
+        response = HttpResponse(summary, content_type='application/json')
+    else:
+        response = HttpResponseRedirect(location)
+    response['Vary'] = 'Accept'
+    patch_cache_control(response, public=True, max_age=settings.SHORT_CODE_CACHE_TTL)
+    return response
+
+
+class MemorialViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, BatchRetrieveMixin, StreamingExportMixin, viewsets.ModelViewSet):
     """
     ViewSet for Memorial model providing CRUD operations and additional actions.
     
@@ -23,6 +148,7 @@ class MemorialViewSet(viewsets.ModelViewSet):
     partial_update: Partially update an existing memorial
     destroy: Delete a memorial
     """
+    export_name = 'memorials'
     queryset = Memorial.objects.filter(is_active=True)
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -30,6 +156,17 @@ class MemorialViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description', 'life_story', 'family_members']
     ordering_fields = ['name', 'created_at', 'updated_at', 'birth_date', 'death_date']
     ordering = ['-created_at']
+    # Actions rendering memorial cards with MemorialListSerializer
+    list_actions = ('list', 'featured', 'by_religion', 'by_category', 'search')
+    sparse_fields_actions = list_actions + ('retrieve', 'batch')
+    includes = {
+        'timeline_stories': Include(
+            'timeline_stories', TimelineStorySerializer, ordering=['life_phase__order', 'created_at']
+        ),
+        'wakeroom_experiences': Include(
+            'wakeroom_experiences', WakeRoomExperienceListSerializer, ordering=['-is_featured', 'title']
+        ),
+    }
     
     def get_serializer_class(self):
         """Return appropriate serializer class based on action"""
@@ -37,7 +174,7 @@ class MemorialViewSet(viewsets.ModelViewSet):
             return MemorialCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return MemorialUpdateSerializer
-        elif self.action == 'list':
+        elif self.action in self.list_actions:
             return MemorialListSerializer
         return MemorialSerializer
     
@@ -54,7 +191,7 @@ class MemorialViewSet(viewsets.ModelViewSet):
         categories = self.request.query_params.get('categories', None)
         if categories:
             category_list = [cat.strip() for cat in categories.split(',')]
-            queryset = queryset.filter(categories__overlap=category_list)
+            queryset = queryset.with_any_category(category_list)
         
         # Filter by date range if specified
         start_date = self.request.query_params.get('start_date', None)
@@ -69,13 +206,48 @@ class MemorialViewSet(viewsets.ModelViewSet):
         if language:
             queryset = queryset.filter(language=language)
         
+        # Filter by lifespan if specified (?alive_in=1950, ?died_from=2000&died_to=2010)
+        alive_in = self._year_param('alive_in')
+        if alive_in is not None:
+            queryset = queryset.alive_in(alive_in)
+        died_from = self._year_param('died_from')
+        died_to = self._year_param('died_to')
+        if died_from is not None or died_to is not None:
+            queryset = queryset.died_between(died_from, died_to)
+        
         return queryset
     
+    def _year_param(self, name):
+        """Return a year query parameter as an int, rejecting malformed values"""
+        value = self.request.query_params.get(name)
+        if value is None or value == '':
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: 'Must be a year, e.g. 1950'})
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Get a memorial, counting the view towards its featured ranking"""
+        memorial = self.get_object()
+        record_engagement(memorial.pk, 'view')
+        serializer = self.get_serializer(memorial)
+        return Response(serializer.data)
+    
     @action(detail=False, methods=['get'])
     def featured(self, request):
-        """Get featured memorials"""
-        featured_memorials = self.get_queryset().filter(is_active=True)[:6]
-        serializer = MemorialListSerializer(featured_memorials, many=True, context={'request': request})
+        """Get featured memorials, ranked by recent engagement (see memorials/ranking.py)"""
+        queryset = self.get_queryset().filter(is_active=True)
+        # The ranked list is longer than served, so memorials deactivated since the last ranking are skipped
+        ids = featured_ids()
+        ranked = queryset.in_bulk(ids)
+        featured_memorials = [ranked[pk] for pk in ids if pk in ranked][:settings.FEATURED_COUNT]
+        if len(featured_memorials) < settings.FEATURED_COUNT:
+            # Not enough engagement yet: fill up with the newest memorials
+            featured_memorials += queryset.exclude(pk__in=[memorial.pk for memorial in featured_memorials])[
+                :settings.FEATURED_COUNT - len(featured_memorials)
+            ]
+        serializer = self.get_serializer(featured_memorials, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
@@ -85,8 +257,8 @@ class MemorialViewSet(viewsets.ModelViewSet):
         muslim_memorials = self.get_queryset().filter(religion='Muslim', is_active=True)
         
         data = {
-            'christian': MemorialListSerializer(christian_memorials, many=True, context={'request': request}).data,
-            'muslim': MemorialListSerializer(muslim_memorials, many=True, context={'request': request}).data,
+            'christian': self.get_serializer(christian_memorials, many=True).data,
+            'muslim': self.get_serializer(muslim_memorials, many=True).data,
             'total_christian': christian_memorials.count(),
             'total_muslim': muslim_memorials.count()
         }
@@ -99,13 +271,10 @@ class MemorialViewSet(viewsets.ModelViewSet):
         data = {}
         
         for category_code, category_name in categories:
-            memorials = self.get_queryset().filter(
-                categories__contains=[category_code],
-                is_active=True
-            )
+            memorials = self.get_queryset().with_all_categories([category_code]).filter(is_active=True)
             data[category_code] = {
                 'name': category_name,
-                'memorials': MemorialListSerializer(memorials, many=True, context={'request': request}).data,
+                'memorials': self.get_serializer(memorials, many=True).data,
                 'count': memorials.count()
             }
         
@@ -134,30 +303,161 @@ class MemorialViewSet(viewsets.ModelViewSet):
         
         if categories:
             category_list = [cat.strip() for cat in categories.split(',')]
-            queryset = queryset.filter(categories__overlap=category_list)
+            queryset = queryset.with_any_category(category_list)
         
         if language:
             queryset = queryset.filter(language=language)
         
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = MemorialListSerializer(page, many=True, context={'request': request})
+            serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
         
-        serializer = MemorialListSerializer(queryset, many=True, context={'request': request})
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def fuzzy_search(self, request):
+        """Ranked fuzzy and phonetic name search (?q=&limit=), tolerant of typos and transliterations"""
+        query = request.query_params.get('q', '').strip()
+        if len(normalize_name(query)) < 2:
+            return Response(
+                {'error': 'Query must contain at least 2 letters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            limit = 20
+        
+        matches = fuzzy_search(self.get_queryset().filter(is_active=True), query, limit=limit)
+        results = []
+        for memorial, score in matches:
+            data = MemorialListSerializer(memorial, context={'request': request}).data
+            data['score'] = score
+            results.append(data)
+        
+        normalized = normalize_name(query)
+        return Response({
+            'query': query,
+            'normalized': normalized,
+            'phonetic': phonetic_key(normalized),
+            'results': results,
+            'count': len(results)
+        })
+    
+    @action(detail=False, methods=['get'])
+    def upcoming_anniversaries(self, request):
+        """Birth and death anniversaries in the coming days (?days=7&kind=birth|death&start=YYYY-MM-DD)"""
+        try:
+            days = min(max(int(request.query_params.get('days', 7)), 1), 366)
+        except ValueError:
+            days = 7
+        
+        kind = request.query_params.get('kind')
+        if kind and kind not in ANNIVERSARY_KINDS:
+            return Response(
+                {'error': 'Invalid anniversary kind', 'kinds': list(ANNIVERSARY_KINDS)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        start = timezone.localdate()
+        if request.query_params.get('start'):
+            try:
+                start = parse_date(request.query_params['start'])
+            except ValueError:
+                start = None
+            if start is None:
+                return Response(
+                    {'error': 'start must be a date, e.g. 2024-06-01'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        entries = upcoming_anniversaries(
+            self.get_queryset().filter(is_active=True), start, days, [kind] if kind else None
+        )
+        results = []
+        for entry in entries:
+            data = MemorialListSerializer(entry['memorial'], context={'request': request}).data
+            data['anniversary'] = {'kind': entry['kind'], 'date': entry['date'], 'years': entry['years']}
+            results.append(data)
+        return Response({
+            'start': start,
+            'days': days,
+            'results': results,
+            'count': len(results)
+        })
+    
+    @action(detail=False, methods=['get'])
+    def anniversary_digest(self, request):
+        """Today's anniversaries and those of the coming days, built once per day"""
+        return Response(daily_digest())
+    
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser],
+            permission_classes=[IsAdminUser])
+    def bulk_import(self, request):
+        """Import memorials and their timeline stories from an uploaded CSV or JSON lines file"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        fmt = detect_format(upload.name, request.data.get('format'))
+        if fmt is None:
+            return Response(
+                {'error': 'Unknown import format', 'formats': list(IMPORT_FORMATS)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        result = import_stream(upload, fmt)
+        return Response(
+            result.as_dict(),
+            status=status.HTTP_201_CREATED if result.created else status.HTTP_400_BAD_REQUEST
+        )
+    
     @action(detail=True, methods=['get'])
     def qr_code(self, request, pk=None):
         """Get QR code data for a memorial"""
         memorial = self.get_object()
-        data = {
-            'id': memorial.id,
+        return Response(qr_payload(memorial, request))
+    
+    @action(detail=True, methods=['get'])
+    def page(self, request, pk=None):
+        """Everything the memorial page shows in one response: memorial, stories, experiences and QR data"""
+        memorial = self.get_object()
+        version = page_version(memorial, request.get_host())
+        # JSON, MessagePack and CBOR bodies of the same version are different representations
+        etag = f'"{version}-{request.accepted_renderer.format}"'
+        # Compressed responses carry the tag weakened (W/"..."), which still names this version
+        if etag in [tag.strip().removeprefix('W/') for tag in request.headers.get('If-None-Match', '').split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            # Revalidations of a page already shown are not counted as views
+            record_engagement(memorial.pk, 'view')
+            response = Response(get_page(memorial, request, version))
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.MEMORIAL_PAGE_MAX_AGE)
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def qr_image(self, request, pk=None):
+        """Redirect to the rendered QR code image (?fmt=png|svg&size=small|medium|large|print)"""
+        memorial = self.get_object()
+        return qr_image_redirect(request, memorial.get_qr_code_path())
+    
+    @action(detail=True, methods=['get'])
+    def family(self, request, pk=None):
+        """Get the family trees of a memorial with their cached graphs"""
+        memorial = self.get_object()
+        trees = []
+        for tree in memorial.family_trees.all():
+            data = FamilyTreeSerializer(tree, context={'request': request}).data
+            data['graph'] = tree.get_graph()
+            trees.append(data)
+        return Response({
+            'memorial_id': memorial.id,
             'name': memorial.name,
-            'qr_code_data': memorial.qr_code_data,
-            'qr_code_url': request.build_absolute_uri(memorial.get_absolute_url())
-        }
-        return Response(data)
+            'family_trees': trees
+        })
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
@@ -166,16 +466,16 @@ class MemorialViewSet(viewsets.ModelViewSet):
         christian_count = Memorial.objects.filter(religion='Christian', is_active=True).count()
         muslim_count = Memorial.objects.filter(religion='Muslim', is_active=True).count()
         
-        # Category statistics
+        # Category statistics, tallied from one GROUP BY over the category bitmask
+        mask_counts = list(
+            Memorial.objects.filter(is_active=True).values_list('category_mask').annotate(count=Count('id')).order_by()
+        )
         category_stats = {}
         for category_code, category_name in Memorial.CATEGORY_CHOICES:
-            count = Memorial.objects.filter(
-                categories__contains=[category_code],
-                is_active=True
-            ).count()
+            bit = Memorial.CATEGORY_BITS[category_code]
             category_stats[category_code] = {
                 'name': category_name,
-                'count': count
+                'count': sum(count for mask, count in mask_counts if mask & bit)
             }
         
         # Language statistics
@@ -213,3 +513,171 @@ class MemorialViewSet(viewsets.ModelViewSet):
         """Soft delete instead of hard delete"""
         instance.is_active = False
         instance.save()
+
+
+def _depth_param(request):
+    """Return the ?depth= limit of a traversal, or None when absent"""
+    depth = request.query_params.get('depth')
+    if depth is None:
+        return None
+    depth = int(depth)
+    if not 1 <= depth <= settings.FAMILY_GRAPH_MAX_DEPTH:
+        raise ValueError
+    return depth
+
+
+class FamilyTreeViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for FamilyTree model; retrieving a tree returns its whole graph from one row.
+    """
+    queryset = FamilyTree.objects.select_related('memorial')
+    serializer_class = FamilyTreeSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filterset_fields = ['memorial']
+    search_fields = ['name', 'memorial__name']
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Return the tree with its cached adjacency representation"""
+        tree = self.get_object()
+        data = self.get_serializer(tree).data
+        data['graph'] = tree.get_graph()
+        return Response(data)
+
+class FamilyPersonViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for FamilyPerson model with ancestor, descendant and relation path traversal.
+    """
+    queryset = FamilyPerson.objects.all()
+    serializer_class = FamilyPersonSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_fields = ['tree', 'memorial']
+    search_fields = ['name']
+    ordering_fields = ['name', 'birth_year', 'death_year']
+    ordering = ['name']
+    
+    def _lineage_response(self, request, traverse, key):
+        """Serialize the relatives traverse finds from this person, up to ?depth= generations"""
+        person = self.get_object()
+        try:
+            depth = _depth_param(request)
+        except ValueError:
+            return Response(
+                {'error': f'depth must be between 1 and {settings.FAMILY_GRAPH_MAX_DEPTH}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        people = traverse(person.pk, depth)
+        results = []
+        for relative in people:
+            data = FamilyPersonSerializer(relative, context={'request': request}).data
+            data['depth'] = relative.depth
+            results.append(data)
+        return Response({
+            'person_id': person.id,
+            'name': person.name,
+            key: results,
+            'count': len(results),
+            'generations': max((relative.depth for relative in people), default=0)
+        })
+    
+    @action(detail=True, methods=['get'])
+    def ancestors(self, request, pk=None):
+        """Get all ancestors of a person (?depth= limits the generations walked)"""
+        return self._lineage_response(request, ancestors, 'ancestors')
+    
+    @action(detail=True, methods=['get'])
+    def descendants(self, request, pk=None):
+        """Get all descendants of a person (?depth= limits the generations walked)"""
+        return self._lineage_response(request, descendants, 'descendants')
+    
+    @action(detail=True, methods=['get'])
+    def path(self, request, pk=None):
+        """Get the shortest relation path to another person (?to=<person id>)"""
+        person = self.get_object()
+        try:
+            other = FamilyPerson.objects.get(pk=int(request.query_params.get('to', '')))
+        except (ValueError, FamilyPerson.DoesNotExist):
+            return Response(
+                {'error': 'A valid ?to= person id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        path = relation_path(person.tree.get_graph(), person.pk, other.pk) if person.tree_id == other.tree_id else None
+        if path is None:
+            return Response(
+                {'error': 'No relation path found', 'max_depth': settings.FAMILY_PATH_MAX_DEPTH},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        people = FamilyPerson.objects.in_bulk(path)
+        return Response({
+            'from': person.id,
+            'to': other.id,
+            'degree': len(path) - 1,
+            'people': FamilyPersonSerializer(
+                [people[pk] for pk in path], many=True, context={'request': request}
+            ).data,
+            'steps': describe_path(path)
+        })
+
+class FamilyRelationshipViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for FamilyRelationship model providing CRUD operations on family graph edges.
+    """
+    queryset = FamilyRelationship.objects.select_related('from_person', 'to_person')
+    serializer_class = FamilyRelationshipSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['tree', 'relationship_type', 'from_person', 'to_person']
+
+class AnniversarySubscriberViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for AnniversarySubscriber model; subscribers are emailed on a memorial's anniversaries.
+    """
+    queryset = AnniversarySubscriber.objects.select_related('memorial')
+    serializer_class = AnniversarySubscriberSerializer
+    # Subscriber email addresses are never exposed anonymously
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filterset_fields = ['memorial', 'family_person', 'is_active']
+    search_fields = ['name', 'email']
+    
+    def get_queryset(self):
+        """Users only see the subscribers they added; staff see all"""
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+    
+    def perform_create(self, serializer):
+        """Record who added the subscriber; addresses not entered by staff are confirmed by email first"""
+        confirmed_at = timezone.now() if self.request.user.is_staff else None
+        subscriber = serializer.save(created_by=self.request.user, confirmed_at=confirmed_at)
+        if not subscriber.is_confirmed():
+            self.request_confirmation(subscriber)
+    
+    def perform_update(self, serializer):
+        """A changed address has to be confirmed again unless staff changed it"""
+        email = serializer.validated_data.get('email', serializer.instance.email)
+        if email != serializer.instance.email and not self.request.user.is_staff:
+            subscriber = serializer.save(confirmed_at=None)
+            self.request_confirmation(subscriber)
+        else:
+            serializer.save()
+    
+    def request_confirmation(self, subscriber):
+        confirm_url = self.request.build_absolute_uri(reverse('anniversarysubscriber-confirm'))
+        run_in_background(send_confirmation, subscriber.pk, confirm_url)
+    
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def confirm(self, request):
+        """Confirm a subscriber's address from the link emailed to it"""
+        try:
+            subscriber = confirm_subscriber(request.query_params.get('token', ''))
+        except signing.SignatureExpired:
+            return Response({'error': 'This confirmation link has expired'}, status=status.HTTP_400_BAD_REQUEST)
+        except (signing.BadSignature, AnniversarySubscriber.DoesNotExist):
+            return Response({'error': 'Invalid confirmation link'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'confirmed': True, 'memorial_name': subscriber.memorial.name})
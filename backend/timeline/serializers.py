@@ -1,11 +1,17 @@
 from rest_framework import serializers
+from kardiversebackend.fieldsets import SparseFieldsMixin
 from .models import LifePhase, TimelineStory
 
-class LifePhaseSerializer(serializers.ModelSerializer):
+class LifePhaseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for LifePhase model"""
     milestones_display = serializers.CharField(read_only=True)
     color_classes = serializers.SerializerMethodField()
-    icon_component = serializers.CharField(read_only=True)
+    icon_component = serializers.CharField(source='get_icon_component', read_only=True)
+    
+    field_dependencies = {
+        'icon_component': ['icon_name'],
+        'color_classes': ['color_class', 'icon_color_class'],
+    }
     
     class Meta:
         model = LifePhase
@@ -20,18 +26,17 @@ class LifePhaseSerializer(serializers.ModelSerializer):
     def get_color_classes(self, obj):
         """Return color classes object"""
         return obj.get_color_classes()
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['icon_component'] = instance.get_icon_component()
-        return data
 
-class LifePhaseListSerializer(serializers.ModelSerializer):
+class LifePhaseListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Simplified serializer for life phase lists"""
-    icon_component = serializers.CharField(read_only=True)
+    icon_component = serializers.CharField(source='get_icon_component', read_only=True)
     color_classes = serializers.SerializerMethodField()
     
+    field_dependencies = {
+        'icon_component': ['icon_name'],
+        'color_classes': ['color_class', 'icon_color_class'],
+    }
+    
     class Meta:
         model = LifePhase
         fields = [
@@ -43,14 +48,8 @@ class LifePhaseListSerializer(serializers.ModelSerializer):
     def get_color_classes(self, obj):
         """Return color classes object"""
         return obj.get_color_classes()
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['icon_component'] = instance.get_icon_component()
-        return data
 
-class TimelineStorySerializer(serializers.ModelSerializer):
+class TimelineStorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for TimelineStory model"""
     memorial_name = serializers.CharField(source='memorial.name', read_only=True)
     life_phase_name = serializers.CharField(source='life_phase.phase', read_only=True)
@@ -58,6 +57,12 @@ class TimelineStorySerializer(serializers.ModelSerializer):
     audio_url = serializers.SerializerMethodField()
     video_url = serializers.SerializerMethodField()
     
+    field_dependencies = {
+        'image_url': ['image'],
+        'audio_url': ['audio_file'],
+        'video_url': ['video_file'],
+    }
+    
     class Meta:
         model = TimelineStory
         fields = [
@@ -6,6 +6,12 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
 
+from kardiversebackend.exports import StreamingExportMixin
+from kardiversebackend.fieldsets import SparseFieldsViewMixin
+from kardiversebackend.renderers import NativeTypesViewMixin
+from kardiversebackend.includes import Include
+from kardiversebackend.retrieval import BatchRetrieveMixin
+from memorials.serializers import MemorialListSerializer
 from .models import LifePhase, TimelineStory
 from .serializers import (
     LifePhaseSerializer, LifePhaseListSerializer,
@@ -14,7 +20,7 @@ from .serializers import (
 
 # Create your views here.
 
-class LifePhaseViewSet(viewsets.ModelViewSet):
+class LifePhaseViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for LifePhase model providing CRUD operations and additional actions.
     """
@@ -95,11 +101,17 @@ class LifePhaseViewSet(viewsets.ModelViewSet):
             'description': 'Complete spiritual timeline with life phases and stories'
         })
 
-class TimelineStoryViewSet(viewsets.ModelViewSet):
+class TimelineStoryViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, BatchRetrieveMixin, StreamingExportMixin, viewsets.ModelViewSet):
     """
     ViewSet for TimelineStory model providing CRUD operations and additional actions.
     """
+    export_name = 'timeline_stories'
     queryset = TimelineStory.objects.filter(memorial__is_active=True)
+    batch_select_related = ['memorial', 'life_phase']
+    includes = {
+        'memorial_details': Include('memorial', MemorialListSerializer),
+        'life_phase_details': Include('life_phase', LifePhaseListSerializer),
+    }
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['life_phase', 'memorial', 'is_featured']
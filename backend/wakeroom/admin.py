@@ -1,5 +1,10 @@
 from django.contrib import admin
-from .models import WakeRoomExperience, WakeRoomSession, WakeRoomFeature
+from django.template.defaultfilters import filesizeformat
+
+from kardiversebackend.tasks import run_in_background
+from .meshopt import ASSET_FIELDS, optimize_experience_assets
+from .models import WakeRoomExperience, WakeRoomSession, WakeRoomFeature, ChunkedUpload, AssetVariant
+from .uploads import discard
 
 @admin.register(WakeRoomExperience)
 class WakeRoomExperienceAdmin(admin.ModelAdmin):
@@ -22,7 +27,7 @@ class WakeRoomExperienceAdmin(admin.ModelAdmin):
     list_editable = ['status', 'is_featured']
     
     readonly_fields = [
-        'created_at', 'updated_at', 'qr_code_data'
+        'created_at', 'updated_at', 'qr_code_data', 'asset_optimization_errors'
     ]
     
     fieldsets = (
@@ -30,7 +35,7 @@ class WakeRoomExperienceAdmin(admin.ModelAdmin):
             'fields': ('title', 'description', 'experience_type', 'status')
         }),
         ('Media Files', {
-            'fields': ('demo_video', 'thumbnail_image', 'ar_model_file', 'vr_scene_file')
+            'fields': ('demo_video', 'thumbnail_image', 'ar_model_file', 'vr_scene_file', 'asset_optimization_errors')
         }),
         ('Interactive Elements', {
             'fields': ('qr_code_required', 'qr_code_data', 'nfc_enabled', 'nfc_data')
@@ -55,7 +60,10 @@ class WakeRoomExperienceAdmin(admin.ModelAdmin):
     
     list_per_page = 25
     
-    actions = ['activate_experiences', 'deactivate_experiences', 'mark_featured', 'unmark_featured']
+    actions = [
+        'activate_experiences', 'deactivate_experiences', 'mark_featured', 'unmark_featured',
+        'optimize_3d_assets'
+    ]
     
     def activate_experiences(self, request, queryset):
         """Activate selected experiences"""
@@ -93,6 +101,17 @@ class WakeRoomExperienceAdmin(admin.ModelAdmin):
         )
     unmark_featured.short_description = "Unmark selected experiences as featured"
     
+    def optimize_3d_assets(self, request, queryset):
+        """Regenerate optimized AR/VR asset variants in the background"""
+        experience_ids = list(queryset.values_list('id', flat=True))
+        for experience_id in experience_ids:
+            run_in_background(optimize_experience_assets, experience_id, ASSET_FIELDS, force=True)
+        self.message_user(
+            request, 
+            f'3D asset optimization was queued for {len(experience_ids)} experience(s).'
+        )
+    optimize_3d_assets.short_description = "Optimize 3D assets of selected experiences"
+    
     def get_queryset(self, request):
         """Custom queryset with optimized queries"""
         return super().get_queryset(request).select_related('created_by')
@@ -242,3 +261,97 @@ class WakeRoomFeatureAdmin(admin.ModelAdmin):
             f'{updated} feature(s) were successfully deactivated.'
         )
     deactivate_features.short_description = "Deactivate selected features"
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    """Admin configuration for ChunkedUpload model"""
+    
+    list_display = [
+        'filename', 'experience', 'field_name', 'total_size', 'status',
+        'created_by', 'created_at'
+    ]
+    
+    list_filter = [
+        'status', 'field_name', 'created_at'
+    ]
+    
+    search_fields = [
+        'filename', 'experience__title', 'created_by__username'
+    ]
+    
+    readonly_fields = [
+        'upload_id', 'experience', 'field_name', 'filename', 'total_size', 'chunk_size',
+        'checksum', 'status', 'stored_name', 'created_by', 'created_at', 'updated_at',
+        'completed_at'
+    ]
+    
+    ordering = ['-created_at']
+    
+    list_per_page = 25
+    
+    actions = ['abort_uploads']
+    
+    def abort_uploads(self, request, queryset):
+        """Abort selected pending uploads and discard their parts"""
+        pending = list(queryset.filter(status='pending').values_list('upload_id', flat=True))
+        for upload_id in pending:
+            discard(upload_id)
+        updated = queryset.filter(upload_id__in=pending).update(status='aborted')
+        self.message_user(
+            request, 
+            f'{updated} upload(s) were successfully aborted.'
+        )
+    abort_uploads.short_description = "Abort selected uploads"
+    
+    def get_queryset(self, request):
+        """Custom queryset with optimized queries"""
+        return super().get_queryset(request).select_related('experience', 'created_by')
+    
+    def has_add_permission(self, request):
+        """Uploads are created through the API only"""
+        return False
+
+
+@admin.register(AssetVariant)
+class AssetVariantAdmin(admin.ModelAdmin):
+    """Admin configuration for AssetVariant model"""
+    
+    list_display = [
+        'experience', 'source_field', 'variant', 'size_display', 'size_reduction',
+        'triangle_count', 'processing_time', 'created_at'
+    ]
+    
+    list_filter = [
+        'source_field', 'variant', 'created_at'
+    ]
+    
+    search_fields = [
+        'experience__title', 'source_name'
+    ]
+    
+    readonly_fields = [
+        'experience', 'source_field', 'variant', 'file', 'source_name', 'original_size',
+        'size', 'vertex_count', 'triangle_count', 'processing_time', 'created_at'
+    ]
+    
+    ordering = ['experience', 'source_field', 'variant']
+    
+    list_per_page = 25
+    
+    def size_display(self, obj):
+        """Return the human readable variant size"""
+        return filesizeformat(obj.size)
+    size_display.short_description = "Size"
+    
+    def size_reduction(self, obj):
+        """Return the size saved relative to the original upload"""
+        return f"{obj.get_size_reduction()}%"
+    size_reduction.short_description = "Saved"
+    
+    def get_queryset(self, request):
+        """Custom queryset with optimized queries"""
+        return super().get_queryset(request).select_related('experience')
+    
+    def has_add_permission(self, request):
+        """Variants are generated by the optimization pipeline only"""
+        return False
@@ -0,0 +1,45 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from wakeroom.models import ChunkedUpload
+from wakeroom.uploads import discard
+
+# Uploads whose part directory is still in use
+ACTIVE_STATUSES = ['pending', 'assembling']
+
+
+class Command(BaseCommand):
+    help = 'Abort stale chunked uploads and remove orphaned part directories'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=settings.CHUNKED_UPLOAD_EXPIRY_HOURS,
+            help='Abort pending (or interrupted assembling) uploads with no activity for this many hours'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = ChunkedUpload.objects.filter(status__in=ACTIVE_STATUSES, updated_at__lt=cutoff)
+        stale_ids = list(stale.values_list('upload_id', flat=True))
+        for upload_id in stale_ids:
+            discard(upload_id)
+        aborted = ChunkedUpload.objects.filter(upload_id__in=stale_ids).update(status='aborted')
+
+        # Directories left behind by uploads that no longer exist or are finished
+        orphaned = 0
+        if os.path.isdir(settings.CHUNKED_UPLOAD_DIR):
+            active = {str(upload_id) for upload_id in ChunkedUpload.objects.filter(
+                status__in=ACTIVE_STATUSES
+            ).values_list('upload_id', flat=True)}
+            for entry in os.listdir(settings.CHUNKED_UPLOAD_DIR):
+                if entry not in active:
+                    discard(entry)
+                    orphaned += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Aborted {aborted} stale upload(s) and removed {orphaned} orphaned director(ies).'
+        ))
@@ -0,0 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from wakeroom.meshopt import (
+    ASSET_FIELDS, MeshError, is_gltf_name, optimize_asset_file, record_failure, record_variants, stale_asset_fields
+)
+from wakeroom.models import WakeRoomExperience
+
+
+class Command(BaseCommand):
+    help = 'Generate quantized, decimated GLB variants of WakeRoom AR models and VR scenes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', help='Comma-separated experience ids to process')
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that are up to date')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (defaults to CPU count)')
+
+    def handle(self, *args, **options):
+        experiences = WakeRoomExperience.objects.prefetch_related('asset_variants').order_by('id')
+        if options['ids']:
+            experiences = experiences.filter(pk__in=[pk.strip() for pk in options['ids'].split(',')])
+
+        jobs = []
+        for experience in experiences:
+            if options['force']:
+                fields = [name for name in ASSET_FIELDS if is_gltf_name(getattr(experience, name).name)]
+            else:
+                fields = stale_asset_fields(experience)
+            jobs.extend((experience, name, getattr(experience, name).name) for name in fields)
+
+        if not jobs:
+            self.stdout.write('No assets need optimizing.')
+            return
+
+        self.stdout.write(f'Optimizing {len(jobs)} asset(s)...')
+        total_original = total_optimized = 0
+        total_seconds = 0.0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(
+                    optimize_asset_file, getattr(experience, field_name).path,
+                    settings.MESH_LOD_RATIOS, settings.MESH_QUANTIZE
+                ): (experience, field_name, name)
+                for experience, field_name, name in jobs
+            }
+            for future in as_completed(futures):
+                experience, field_name, name = futures[future]
+                try:
+                    original_size, variants = future.result()
+                except (MeshError, OSError) as exc:
+                    record_failure(experience, field_name, name, exc)
+                    self.stderr.write(f'  {experience.pk} {field_name}: skipped ({exc})')
+                    continue
+
+                records = record_variants(experience, field_name, name, original_size, variants)
+                summary = ', '.join(
+                    f'{record.variant} {filesizeformat(record.size)} (-{record.get_size_reduction()}%, '
+                    f'{record.triangle_count} tris)'
+                    for record in records
+                )
+                self.stdout.write(f'  {experience.pk} {field_name}: {filesizeformat(original_size)} -> {summary}')
+
+                smallest = min(records, key=lambda record: record.size)
+                total_original += original_size
+                total_optimized += smallest.size
+                total_seconds += sum(record.processing_time for record in records)
+
+        saved = total_original - total_optimized
+        percent = saved / total_original * 100 if total_original else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Smallest variants save {filesizeformat(saved)} of {filesizeformat(total_original)} '
+            f'({percent:.1f}%); {total_seconds:.1f}s of processing.'
+        ))
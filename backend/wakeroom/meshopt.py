@@ -0,0 +1,686 @@
+"""
+glTF/GLB optimization for AR models and VR scenes.
+
+Uploaded assets are parsed into NumPy arrays, triangle meshes are decimated
+by vertex clustering into lower levels of detail and vertex attributes are
+quantized (KHR_mesh_quantization), producing compact GLB variants that
+mobile devices can download instead of the full-precision original.
+Everything the original references that is not a triangle mesh (textures,
+skins, animations, morph targets) is copied through unchanged.
+
+The mesh functions, optimize_asset_file() included, only depend on their
+arguments, never on Django state, so they can run in a process pool; the
+functions at the end of the module record the variants (or the failure) for a
+WakeRoomExperience.
+"""
+import base64
+import copy
+import json
+import logging
+import os
+import struct
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+GLB_MAGIC = b'glTF'
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+BYTE = 5120
+UNSIGNED_BYTE = 5121
+SHORT = 5122
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+FLOAT = 5126
+
+COMPONENT_DTYPES = {
+    BYTE: np.dtype('<i1'),
+    UNSIGNED_BYTE: np.dtype('<u1'),
+    SHORT: np.dtype('<i2'),
+    UNSIGNED_SHORT: np.dtype('<u2'),
+    UNSIGNED_INT: np.dtype('<u4'),
+    FLOAT: np.dtype('<f4'),
+}
+
+TYPE_COMPONENTS = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT2': 4, 'MAT3': 9, 'MAT4': 16}
+COMPONENT_TYPES = {4: 'VEC4', 3: 'VEC3', 2: 'VEC2', 1: 'SCALAR'}
+
+MODE_TRIANGLES = 4
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+# Vertex attributes the decimator knows how to average; primitives with any
+# other attribute (skin weights, tangents) are copied through unchanged
+SUPPORTED_ATTRIBUTES = ('POSITION', 'NORMAL', 'COLOR_0', 'TEXCOORD_0', 'TEXCOORD_1')
+
+# Assets already compressed with these extensions are left as uploaded
+COMPRESSION_EXTENSIONS = {'KHR_draco_mesh_compression', 'EXT_meshopt_compression', 'KHR_mesh_quantization'}
+
+QUANTIZATION_EXTENSION = 'KHR_mesh_quantization'
+
+# Primitives smaller than this are not worth decimating
+MIN_DECIMATION_TRIANGLES = 64
+
+VARIANT_NAMES = ('full', 'lod1', 'lod2', 'lod3')
+
+
+class MeshError(Exception):
+    """Raised when an asset cannot be parsed or optimized"""
+
+
+# Lookups on a document that does not follow the glTF schema fail with these
+STRUCTURE_ERRORS = (KeyError, IndexError, TypeError, AttributeError, ValueError)
+
+
+@contextmanager
+def _well_formed(part):
+    """Re-raise errors from reading a malformed document as MeshError naming the part"""
+    try:
+        yield
+    except STRUCTURE_ERRORS as exc:
+        raise MeshError(f"{part} is malformed ({type(exc).__name__}: {exc})") from exc
+
+
+def is_gltf_name(name):
+    """Check whether a file name looks like a glTF or GLB asset"""
+    return os.path.splitext(name or '')[1].lower() in ('.glb', '.gltf')
+
+
+# Reading
+
+def load_gltf(data):
+    """Parse GLB or glTF JSON bytes into (document, list of buffer bytes)"""
+    buffers = []
+    if data[:4] == GLB_MAGIC:
+        if len(data) < 12:
+            raise MeshError("Truncated GLB header")
+        _, version, length = struct.unpack_from('<4sII', data, 0)
+        if version != GLB_VERSION:
+            raise MeshError(f"Unsupported GLB version {version}")
+        document = None
+        binary = None
+        offset = 12
+        end = min(length, len(data))
+        while offset + 8 <= end:
+            chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+            chunk = data[offset + 8:offset + 8 + chunk_length]
+            if chunk_type == CHUNK_JSON and document is None:
+                document = _parse_json(chunk)
+            elif chunk_type == CHUNK_BIN and binary is None:
+                binary = bytes(chunk)
+            offset += 8 + chunk_length
+        if document is None:
+            raise MeshError("GLB file has no JSON chunk")
+    else:
+        document = _parse_json(data)
+        binary = None
+
+    with _well_formed("Buffer list"):
+        for index, buffer in enumerate(document.get('buffers', [])):
+            uri = buffer.get('uri')
+            if uri is None and index == 0 and binary is not None:
+                buffers.append(binary)
+            elif uri and uri.startswith('data:'):
+                try:
+                    buffers.append(base64.b64decode(uri.split(',', 1)[1]))
+                except (IndexError, ValueError):
+                    raise MeshError(f"Buffer {index} has an invalid data URI")
+            else:
+                raise MeshError(f"Buffer {index} references an external file; upload the asset as GLB")
+    return document, buffers
+
+
+def _parse_json(data):
+    try:
+        document = json.loads(bytes(data).decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        raise MeshError("Asset is not valid glTF JSON")
+    if not isinstance(document, dict):
+        raise MeshError("glTF JSON must be an object")
+    return document
+
+
+def read_accessor(document, buffers, index):
+    """Return an accessor's elements as a (count, components) float or integer array"""
+    with _well_formed(f"Accessor {index}"):
+        return _read_accessor(document, buffers, index)
+
+
+def _read_accessor(document, buffers, index):
+    accessor = document['accessors'][index]
+    if 'sparse' in accessor:
+        raise MeshError(f"Accessor {index} is sparse")
+    dtype = COMPONENT_DTYPES[accessor['componentType']]
+    components = TYPE_COMPONENTS[accessor['type']]
+    count = accessor['count']
+    if not isinstance(count, int) or count < 0:
+        raise MeshError(f"Accessor {index} has an invalid count")
+    if 'bufferView' not in accessor or count == 0:
+        return np.zeros((count, components), dtype=dtype)
+
+    view = document['bufferViews'][accessor['bufferView']]
+    data = buffers[view['buffer']]
+    start = view.get('byteOffset', 0) + accessor.get('byteOffset', 0)
+    element_size = dtype.itemsize * components
+    stride = view.get('byteStride') or element_size
+    span = stride * (count - 1) + element_size
+    if start < 0 or start + span > len(data):
+        raise MeshError(f"Accessor {index} reads past the end of its buffer")
+
+    raw = np.frombuffer(data, dtype=np.uint8, count=span, offset=start)
+    if stride != element_size:
+        # Interleaved attributes: gather each element's bytes into a packed array
+        raw = np.lib.stride_tricks.as_strided(raw, shape=(count, element_size), strides=(stride, 1))
+        raw = np.ascontiguousarray(raw)
+    values = raw.view(dtype).reshape(count, components)
+
+    if accessor.get('normalized'):
+        info = np.iinfo(dtype)
+        values = np.maximum(values.astype(np.float32) / info.max, -1.0)
+    return values
+
+
+def _is_optimizable(document, primitive):
+    return (
+        primitive.get('mode', MODE_TRIANGLES) == MODE_TRIANGLES
+        and 'POSITION' in primitive.get('attributes', {})
+        and set(primitive['attributes']) <= set(SUPPORTED_ATTRIBUTES)
+        and not primitive.get('targets')
+        and not primitive.get('extensions')
+        and not any('sparse' in document['accessors'][i] for i in primitive['attributes'].values())
+    )
+
+
+def decode_meshes(document, buffers):
+    """Return {(mesh index, primitive index): (attributes, triangles)} for every triangle primitive"""
+    primitives = {}
+    with _well_formed("Mesh list"):
+        meshes = list(enumerate(document.get('meshes', [])))
+    for mesh_index, mesh in meshes:
+        with _well_formed(f"Mesh {mesh_index}"):
+            for primitive_index, primitive in enumerate(mesh.get('primitives', [])):
+                if not _is_optimizable(document, primitive):
+                    continue
+                attributes = {
+                    name: read_accessor(document, buffers, accessor).astype(np.float32)
+                    for name, accessor in primitive['attributes'].items()
+                }
+                vertex_count = len(attributes['POSITION'])
+                if 'indices' in primitive:
+                    indices = read_accessor(document, buffers, primitive['indices']).astype(np.int64).ravel()
+                else:
+                    indices = np.arange(vertex_count, dtype=np.int64)
+                indices = indices[:len(indices) - len(indices) % 3]
+                if len(indices) and indices.max() >= vertex_count:
+                    raise MeshError(f"Mesh {mesh_index} has out of range indices")
+                primitives[(mesh_index, primitive_index)] = (attributes, indices.reshape(-1, 3))
+    return primitives
+
+
+# Decimation
+
+def _normal_buckets(normals):
+    """Classify normals into the six axis directions so hard edges survive clustering"""
+    axis = np.abs(normals).argmax(axis=1)
+    negative = normals[np.arange(len(normals)), axis] < 0
+    return axis * 2 + negative
+
+
+def _cluster(attributes, triangles, origin, cell_size, resolution):
+    """Collapse vertices sharing a grid cell into their average and drop degenerate triangles"""
+    positions = attributes['POSITION']
+    span = resolution + 1
+    cells = np.clip(np.floor((positions - origin) / cell_size).astype(np.int64), 0, resolution)
+    keys = (cells[:, 0] * span + cells[:, 1]) * span + cells[:, 2]
+    if 'NORMAL' in attributes:
+        keys = keys * 6 + _normal_buckets(attributes['NORMAL'])
+
+    _, cluster = np.unique(keys, return_inverse=True)
+    cluster = cluster.ravel()
+    cluster_count = int(cluster.max()) + 1
+    weights = np.bincount(cluster, minlength=cluster_count).astype(np.float64)
+
+    merged = {}
+    for name, values in attributes.items():
+        sums = np.stack([
+            np.bincount(cluster, weights=values[:, column], minlength=cluster_count)
+            for column in range(values.shape[1])
+        ], axis=1)
+        merged[name] = (sums / weights[:, None]).astype(np.float32)
+    if 'NORMAL' in merged:
+        lengths = np.linalg.norm(merged['NORMAL'], axis=1, keepdims=True)
+        merged['NORMAL'] /= np.maximum(lengths, 1e-12)
+
+    faces = cluster[triangles]
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    if len(faces):
+        # Keep the first of any triangles now covering the same three vertices
+        _, first = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+        faces = faces[np.sort(first)]
+
+    used, remapped = np.unique(faces, return_inverse=True)
+    return {name: values[used] for name, values in merged.items()}, remapped.reshape(-1, 3)
+
+
+def decimate(attributes, triangles, ratio):
+    """
+    Simplify a triangle mesh to roughly ratio of its triangles by vertex clustering.
+
+    The grid resolution is binary searched for the cell size whose result is
+    closest to the target triangle count.
+    """
+    target = max(int(len(triangles) * ratio), 1)
+    if len(triangles) < MIN_DECIMATION_TRIANGLES or target >= len(triangles):
+        return attributes, triangles
+
+    positions = attributes['POSITION']
+    origin = positions.min(axis=0)
+    extent = float((positions.max(axis=0) - origin).max()) or 1.0
+
+    best = None
+    low, high = 1, 1024
+    while low <= high:
+        resolution = (low + high) // 2
+        result = _cluster(attributes, triangles, origin, extent / resolution, resolution)
+        count = len(result[1])
+        if best is None or abs(count - target) < abs(len(best[1]) - target):
+            best = result
+        if count > target:
+            high = resolution - 1
+        elif count < target:
+            low = resolution + 1
+        else:
+            break
+    return best
+
+
+# Writing
+
+def _quantize(values, dtype):
+    """Map normalized floats onto the full range of an integer type"""
+    info = np.iinfo(dtype)
+    scaled = np.round(np.clip(values, -1.0 if info.min < 0 else 0.0, 1.0) * info.max)
+    return scaled.astype(dtype)
+
+
+def _pad_rows(values, stride):
+    """Pad each element to stride bytes; vertex attributes must be 4-byte aligned"""
+    element = values.reshape(len(values), -1).view(np.uint8).reshape(len(values), -1)
+    if element.shape[1] == stride:
+        return element.tobytes(), None
+    padded = np.zeros((len(values), stride), dtype=np.uint8)
+    padded[:, :element.shape[1]] = element
+    return padded.tobytes(), stride
+
+
+class _GLBWriter:
+    """Accumulates accessors and buffer views for a rewritten document"""
+
+    def __init__(self, document, buffers):
+        self.source = document
+        self.source_buffers = buffers
+        self.binary = bytearray()
+        self.views = []
+        self.accessors = []
+        self._copied_views = {}
+        self._copied_accessors = {}
+
+    def add_view(self, data, byte_stride=None, target=None):
+        self.binary.extend(b'\0' * (-len(self.binary) % 4))
+        view = {'buffer': 0, 'byteOffset': len(self.binary), 'byteLength': len(data)}
+        if byte_stride:
+            view['byteStride'] = byte_stride
+        if target:
+            view['target'] = target
+        self.binary.extend(data)
+        self.views.append(view)
+        return len(self.views) - 1
+
+    def add_accessor(self, values, component_type, normalized=False, target=ARRAY_BUFFER, bounds=False):
+        values = np.ascontiguousarray(values)
+        if values.ndim == 1:
+            values = values[:, None]
+        components = values.shape[1]
+        if target == ARRAY_BUFFER:
+            element_size = values.dtype.itemsize * components
+            data, stride = _pad_rows(values, element_size + (-element_size % 4))
+        else:
+            data, stride = values.tobytes(), None
+        accessor = {
+            'bufferView': self.add_view(data, stride, target),
+            'componentType': component_type,
+            'count': len(values),
+            'type': COMPONENT_TYPES[components],
+        }
+        if normalized:
+            accessor['normalized'] = True
+        if bounds and len(values):
+            accessor['min'] = values.min(axis=0).tolist()
+            accessor['max'] = values.max(axis=0).tolist()
+        self.accessors.append(accessor)
+        return len(self.accessors) - 1
+
+    def copy_view(self, index):
+        """Copy a buffer view of the source document verbatim"""
+        if index not in self._copied_views:
+            view = self.source['bufferViews'][index]
+            start = view.get('byteOffset', 0)
+            data = self.source_buffers[view['buffer']][start:start + view['byteLength']]
+            self._copied_views[index] = self.add_view(data, view.get('byteStride'), view.get('target'))
+        return self._copied_views[index]
+
+    def copy_accessor(self, index):
+        """Copy an accessor of the source document along with its buffer views"""
+        if index not in self._copied_accessors:
+            accessor = copy.deepcopy(self.source['accessors'][index])
+            if 'bufferView' in accessor:
+                accessor['bufferView'] = self.copy_view(accessor['bufferView'])
+            sparse = accessor.get('sparse')
+            if sparse:
+                sparse['indices']['bufferView'] = self.copy_view(sparse['indices']['bufferView'])
+                sparse['values']['bufferView'] = self.copy_view(sparse['values']['bufferView'])
+            self.accessors.append(accessor)
+            self._copied_accessors[index] = len(self.accessors) - 1
+        return self._copied_accessors[index]
+
+
+def _quantizable_meshes(document, primitives):
+    """Return the meshes whose positions can be quantized into a dequantizing child node"""
+    meshes = set()
+    for mesh_index, mesh in enumerate(document.get('meshes', [])):
+        if all((mesh_index, index) in primitives for index in range(len(mesh.get('primitives', [])))):
+            meshes.add(mesh_index)
+    for node in document.get('nodes', []):
+        if 'mesh' in node and ('skin' in node or node.get('extensions') or node.get('weights')):
+            meshes.discard(node['mesh'])
+    return meshes
+
+
+def _write_primitive(writer, primitive, attributes, triangles, quantize, dequantize):
+    """Write one primitive's arrays as new accessors"""
+    written = {}
+    for name, values in attributes.items():
+        if name == 'POSITION':
+            if dequantize is not None:
+                center, scale = dequantize
+                quantized = _quantize((values - center) / scale, np.int16)
+                written[name] = writer.add_accessor(quantized, SHORT, normalized=True, bounds=True)
+            else:
+                written[name] = writer.add_accessor(values.astype(np.float32), FLOAT, bounds=True)
+        elif name == 'NORMAL' and quantize:
+            written[name] = writer.add_accessor(_quantize(values, np.int8), BYTE, normalized=True)
+        elif name.startswith('TEXCOORD_') and quantize and values.min() >= 0.0 and values.max() <= 1.0:
+            written[name] = writer.add_accessor(_quantize(values, np.uint16), UNSIGNED_SHORT, normalized=True)
+        elif name == 'COLOR_0' and quantize:
+            written[name] = writer.add_accessor(_quantize(values, np.uint8), UNSIGNED_BYTE, normalized=True)
+        else:
+            written[name] = writer.add_accessor(values.astype(np.float32), FLOAT)
+    primitive['attributes'] = written
+
+    vertex_count = len(attributes['POSITION'])
+    if vertex_count <= 0xFFFF:
+        indices, component_type = triangles.astype(np.uint16), UNSIGNED_SHORT
+    else:
+        indices, component_type = triangles.astype(np.uint32), UNSIGNED_INT
+    primitive['indices'] = writer.add_accessor(indices.ravel(), component_type, target=ELEMENT_ARRAY_BUFFER)
+    primitive['mode'] = MODE_TRIANGLES
+
+
+def write_glb(document, buffers, primitives, quantize=True):
+    """
+    Serialize a document as GLB with the given primitives replaced.
+
+    primitives maps (mesh index, primitive index) to (attributes, triangles);
+    all other data is copied from the source buffers.
+    """
+    with _well_formed("glTF document"):
+        return _write_glb(document, buffers, primitives, quantize)
+
+
+def _write_glb(document, buffers, primitives, quantize):
+    document = copy.deepcopy(document)
+    writer = _GLBWriter(document, buffers)
+    quantized_meshes = _quantizable_meshes(document, primitives) if quantize else set()
+    dequantize = {}
+
+    for mesh_index, mesh in enumerate(document.get('meshes', [])):
+        if mesh_index in quantized_meshes:
+            positions = np.concatenate([
+                primitives[(mesh_index, index)][0]['POSITION'] for index in range(len(mesh['primitives']))
+            ])
+            low, high = positions.min(axis=0), positions.max(axis=0)
+            # Uniform scale keeps normals valid under the dequantizing transform
+            dequantize[mesh_index] = ((low + high) / 2, float((high - low).max() / 2) or 1.0)
+
+        for primitive_index, primitive in enumerate(mesh.get('primitives', [])):
+            key = (mesh_index, primitive_index)
+            if key in primitives:
+                attributes, triangles = primitives[key]
+                _write_primitive(writer, primitive, attributes, triangles, quantize, dequantize.get(mesh_index))
+                continue
+            primitive['attributes'] = {
+                name: writer.copy_accessor(index) for name, index in primitive['attributes'].items()
+            }
+            if 'indices' in primitive:
+                primitive['indices'] = writer.copy_accessor(primitive['indices'])
+            for target in primitive.get('targets', []):
+                for name, index in target.items():
+                    target[name] = writer.copy_accessor(index)
+
+    for skin in document.get('skins', []):
+        if 'inverseBindMatrices' in skin:
+            skin['inverseBindMatrices'] = writer.copy_accessor(skin['inverseBindMatrices'])
+    for animation in document.get('animations', []):
+        for sampler in animation.get('samplers', []):
+            sampler['input'] = writer.copy_accessor(sampler['input'])
+            sampler['output'] = writer.copy_accessor(sampler['output'])
+    for image in document.get('images', []):
+        if 'bufferView' in image:
+            image['bufferView'] = writer.copy_view(image['bufferView'])
+
+    # Quantized positions are dequantized by a child node carrying the mesh
+    nodes = document.get('nodes', [])
+    for node in list(nodes):
+        if node.get('mesh') in dequantize:
+            center, scale = dequantize[node['mesh']]
+            nodes.append({'mesh': node.pop('mesh'), 'translation': center.tolist(), 'scale': [scale] * 3})
+            node.setdefault('children', []).append(len(nodes) - 1)
+
+    uses_quantization = any(
+        accessor.get('normalized') and accessor['componentType'] in (BYTE, SHORT)
+        for accessor in writer.accessors
+    )
+    if uses_quantization:
+        for key in ('extensionsUsed', 'extensionsRequired'):
+            extensions = document.setdefault(key, [])
+            if QUANTIZATION_EXTENSION not in extensions:
+                extensions.append(QUANTIZATION_EXTENSION)
+
+    writer.binary.extend(b'\0' * (-len(writer.binary) % 4))
+    document['accessors'] = writer.accessors
+    document['bufferViews'] = writer.views
+    document['buffers'] = [{'byteLength': len(writer.binary)}] if writer.binary else []
+    if not writer.views:
+        document.pop('bufferViews')
+
+    json_chunk = json.dumps(document, separators=(',', ':')).encode('utf-8')
+    json_chunk += b' ' * (-len(json_chunk) % 4)
+    chunks = struct.pack('<II', len(json_chunk), CHUNK_JSON) + json_chunk
+    if writer.binary:
+        chunks += struct.pack('<II', len(writer.binary), CHUNK_BIN) + bytes(writer.binary)
+    return struct.pack('<4sII', GLB_MAGIC, GLB_VERSION, 12 + len(chunks)) + chunks
+
+
+def _mesh_counts(primitives):
+    vertices = sum(len(attributes['POSITION']) for attributes, _ in primitives.values())
+    triangles = sum(len(faces) for _, faces in primitives.values())
+    return vertices, triangles
+
+
+def optimize_gltf(data, lod_ratios=(0.5, 0.25), quantize=True):
+    """
+    Build optimized GLB variants of a glTF/GLB asset.
+
+    Returns a list of dicts (variant, data, vertex_count, triangle_count,
+    seconds): 'full' keeps every triangle, 'lod1'... are decimated to the
+    given fractions of the original triangle count.
+    """
+    if len(lod_ratios) >= len(VARIANT_NAMES):
+        raise MeshError(f"At most {len(VARIANT_NAMES) - 1} levels of detail are supported")
+
+    started = time.perf_counter()
+    document, buffers = load_gltf(data)
+    with _well_formed("Extension list"):
+        compressed = COMPRESSION_EXTENSIONS.intersection(document.get('extensionsUsed', []))
+    if compressed:
+        raise MeshError(f"Asset is already compressed ({', '.join(sorted(compressed))})")
+    primitives = decode_meshes(document, buffers)
+    if not primitives:
+        raise MeshError("Asset has no triangle meshes to optimize")
+    parse_seconds = time.perf_counter() - started
+
+    variants = []
+    for name, ratio in zip(VARIANT_NAMES, (1.0,) + tuple(lod_ratios)):
+        started = time.perf_counter()
+        simplified = primitives if ratio >= 1.0 else {
+            key: decimate(attributes, triangles, ratio)
+            for key, (attributes, triangles) in primitives.items()
+        }
+        output = write_glb(document, buffers, simplified, quantize=quantize)
+        vertex_count, triangle_count = _mesh_counts(simplified)
+        variants.append({
+            'variant': name,
+            'data': output,
+            'vertex_count': vertex_count,
+            'triangle_count': triangle_count,
+            'seconds': parse_seconds + time.perf_counter() - started,
+        })
+    return variants
+
+
+def optimize_asset_file(path, lod_ratios=(0.5, 0.25), quantize=True):
+    """Process pool entry point: return (original size, variants) of the asset at path"""
+    with open(path, 'rb') as asset:
+        data = asset.read()
+    try:
+        return len(data), optimize_gltf(data, lod_ratios, quantize)
+    except MeshError as exc:
+        raise MeshError(f"{os.path.basename(path)}: {exc}") from exc
+
+
+# Recording variants
+
+ASSET_FIELDS = ('ar_model_file', 'vr_scene_file')
+
+
+def stale_asset_fields(experience, fields=ASSET_FIELDS):
+    """Return the glTF asset fields whose variants are missing or out of date"""
+    stale = []
+    for field_name in fields:
+        field_file = getattr(experience, field_name)
+        if not field_file or not is_gltf_name(field_file.name):
+            continue
+        # An upload that failed is only tried again once it is replaced
+        if experience.asset_optimization_errors.get(field_name, {}).get('source_name') == field_file.name:
+            continue
+        if not experience.asset_variants.filter(source_field=field_name, source_name=field_file.name).exists():
+            stale.append(field_name)
+    return stale
+
+
+def record_variants(experience, field_name, source_name, original_size, variants):
+    """Replace an asset's stored variants with freshly generated ones"""
+    from .models import AssetVariant
+
+    base_name = os.path.splitext(os.path.basename(source_name))[0]
+    with transaction.atomic():
+        # Deleting the rows releases their files through the media store
+        experience.asset_variants.filter(source_field=field_name).delete()
+        records = []
+        for variant in variants:
+            record = AssetVariant(
+                experience=experience,
+                source_field=field_name,
+                variant=variant['variant'],
+                source_name=source_name,
+                original_size=original_size,
+                size=len(variant['data']),
+                vertex_count=variant['vertex_count'],
+                triangle_count=variant['triangle_count'],
+                processing_time=variant['seconds'],
+            )
+            record.file.save(f"{base_name}-{variant['variant']}.glb", ContentFile(variant['data']), save=False)
+            record.save()
+            records.append(record)
+        if field_name in experience.asset_optimization_errors:
+            errors = dict(experience.asset_optimization_errors)
+            del errors[field_name]
+            _store_errors(experience, errors)
+    return records
+
+
+def record_failure(experience, field_name, source_name, error):
+    """Remember that an asset could not be optimized, so saves do not retry it until it is replaced"""
+    errors = dict(experience.asset_optimization_errors)
+    errors[field_name] = {'source_name': source_name, 'error': str(error)}
+    _store_errors(experience, errors)
+
+
+def _store_errors(experience, errors):
+    # update() rather than save(): saving would schedule another optimization
+    type(experience).objects.filter(pk=experience.pk).update(asset_optimization_errors=errors)
+    experience.asset_optimization_errors = errors
+
+
+def optimize_experience_assets(experience_id, fields=ASSET_FIELDS, force=False):
+    """Generate and record variants for an experience's glTF assets; returns the new records"""
+    from .models import WakeRoomExperience
+
+    experience = WakeRoomExperience.objects.filter(pk=experience_id).first()
+    if experience is None:
+        return []
+
+    targets = [name for name in fields if getattr(experience, name)] if force else stale_asset_fields(experience, fields)
+    records = []
+    for field_name in targets:
+        field_file = getattr(experience, field_name)
+        if not is_gltf_name(field_file.name):
+            continue
+        try:
+            original_size, variants = optimize_asset_file(
+                field_file.path, settings.MESH_LOD_RATIOS, settings.MESH_QUANTIZE
+            )
+        except (MeshError, OSError) as exc:
+            logger.warning("Could not optimize %s of experience %s: %s", field_name, experience_id, exc)
+            record_failure(experience, field_name, field_file.name, exc)
+            continue
+        records.extend(record_variants(experience, field_name, field_file.name, original_size, variants))
+    return records
+
+
+def select_variant(experience, field_name, variant=None, mobile=False):
+    """Return the best recorded variant for a client, or None to use the original upload"""
+    field_file = getattr(experience, field_name)
+    variants = {
+        record.variant: record
+        for record in experience.asset_variants.all()
+        if record.source_field == field_name and record.source_name == field_file.name
+    }
+    if variant:
+        return variants.get(variant)
+    preferred = settings.MESH_MOBILE_VARIANT if mobile else 'full'
+    if preferred in variants:
+        return variants[preferred]
+    # Fall back to the most detailed variant available
+    for name in VARIANT_NAMES:
+        if name in variants:
+            return variants[name]
+    return None
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wakeroom', '0002_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_field', models.CharField(choices=[('ar_model_file', 'AR Model'), ('vr_scene_file', 'VR Scene')], max_length=30)),
+                ('variant', models.CharField(choices=[('full', 'Full Detail'), ('lod1', 'Level of Detail 1'), ('lod2', 'Level of Detail 2'), ('lod3', 'Level of Detail 3')], max_length=10)),
+                ('file', models.FileField(upload_to='wakeroom/variants/')),
+                ('source_name', models.CharField(max_length=500)),
+                ('original_size', models.PositiveBigIntegerField()),
+                ('size', models.PositiveBigIntegerField()),
+                ('vertex_count', models.PositiveIntegerField()),
+                ('triangle_count', models.PositiveIntegerField()),
+                ('processing_time', models.FloatField(help_text='Seconds spent generating this variant')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('experience', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asset_variants', to='wakeroom.wakeroomexperience')),
+            ],
+            options={
+                'verbose_name': 'Asset Variant',
+                'verbose_name_plural': 'Asset Variants',
+                'ordering': ['experience', 'source_field', 'variant'],
+                'unique_together': {('experience', 'source_field', 'variant')},
+            },
+        ),
+    ]
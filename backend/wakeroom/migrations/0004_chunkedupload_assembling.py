@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wakeroom', '0003_assetvariant'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chunkedupload',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('assembling', 'Assembling'), ('complete', 'Complete'), ('aborted', 'Aborted')], default='pending', max_length=20),
+        ),
+    ]
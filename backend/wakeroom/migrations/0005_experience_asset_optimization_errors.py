@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wakeroom', '0004_chunkedupload_assembling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wakeroomexperience',
+            name='asset_optimization_errors',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
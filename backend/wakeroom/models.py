@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from memorials.models import Memorial
+import math
+import uuid
 
 # Create your models here.
 
@@ -31,6 +33,8 @@ class WakeRoomExperience(models.Model):
     thumbnail_image = models.ImageField(upload_to='wakeroom/thumbnails/', null=True, blank=True)
     ar_model_file = models.FileField(upload_to='wakeroom/ar_models/', null=True, blank=True)  # 3D models
     vr_scene_file = models.FileField(upload_to='wakeroom/vr_scenes/', null=True, blank=True)
+    # Assets that could not be optimized: field name -> {'source_name', 'error'}, retried once replaced
+    asset_optimization_errors = models.JSONField(default=dict, blank=True, editable=False)
     
     # Interactive elements
     qr_code_required = models.BooleanField(default=True)
@@ -68,6 +72,10 @@ class WakeRoomExperience(models.Model):
         
         super().save(*args, **kwargs)
     
+    def get_qr_code_path(self):
+        """Return the path encoded into this experience's QR code"""
+        return f"/wakeroom/experience/{self.id}"
+    
     def get_media_files(self):
         """Return list of available media files"""
         media_files = []
@@ -182,3 +190,103 @@ class WakeRoomFeature(models.Model):
     def get_icon_component(self):
         """Return the icon component name for React"""
         return self.icon_name
+
+class ChunkedUpload(models.Model):
+    """Resumable upload of a large media file for a WakeRoom experience"""
+    TARGET_FIELDS = [
+        ('demo_video', 'Demo Video'),
+        ('thumbnail_image', 'Thumbnail Image'),
+        ('ar_model_file', 'AR Model File'),
+        ('vr_scene_file', 'VR Scene File'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('assembling', 'Assembling'),  # Parts verified, file being assembled and stored
+        ('complete', 'Complete'),
+        ('aborted', 'Aborted'),
+    ]
+    
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    experience = models.ForeignKey(WakeRoomExperience, on_delete=models.CASCADE, related_name='chunked_uploads')
+    field_name = models.CharField(max_length=30, choices=TARGET_FIELDS)
+    filename = models.CharField(max_length=255)
+    
+    # Transfer layout
+    total_size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64, blank=True)  # Optional SHA-256 over the part digests
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    stored_name = models.CharField(max_length=500, blank=True)  # Final storage name once complete
+    
+    # Metadata
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='chunked_uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Chunked Upload'
+        verbose_name_plural = 'Chunked Uploads'
+    
+    def __str__(self):
+        return f"{self.filename} -> {self.experience.title} ({self.status})"
+    
+    def get_part_count(self):
+        """Return the number of parts the file is split into"""
+        return max(1, math.ceil(self.total_size / self.chunk_size))
+    
+    def get_part_size(self, part_number):
+        """Return the expected size of a 1-based part number"""
+        if part_number < self.get_part_count():
+            return self.chunk_size
+        return self.total_size - self.chunk_size * (self.get_part_count() - 1)
+    
+    def is_pending(self):
+        """Check if the upload still accepts parts"""
+        return self.status == 'pending'
+
+
+class AssetVariant(models.Model):
+    """Optimized level-of-detail variant of an experience's AR model or VR scene"""
+    SOURCE_FIELDS = [
+        ('ar_model_file', 'AR Model'),
+        ('vr_scene_file', 'VR Scene'),
+    ]
+    
+    VARIANT_CHOICES = [
+        ('full', 'Full Detail'),
+        ('lod1', 'Level of Detail 1'),
+        ('lod2', 'Level of Detail 2'),
+        ('lod3', 'Level of Detail 3'),
+    ]
+    
+    experience = models.ForeignKey(WakeRoomExperience, on_delete=models.CASCADE, related_name='asset_variants')
+    source_field = models.CharField(max_length=30, choices=SOURCE_FIELDS)
+    variant = models.CharField(max_length=10, choices=VARIANT_CHOICES)
+    file = models.FileField(upload_to='wakeroom/variants/')
+    source_name = models.CharField(max_length=500)  # Storage name of the upload this was generated from
+    
+    # Optimization results
+    original_size = models.PositiveBigIntegerField()
+    size = models.PositiveBigIntegerField()
+    vertex_count = models.PositiveIntegerField()
+    triangle_count = models.PositiveIntegerField()
+    processing_time = models.FloatField(help_text='Seconds spent generating this variant')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['experience', 'source_field', 'variant']
+        unique_together = ['experience', 'source_field', 'variant']
+        verbose_name = 'Asset Variant'
+        verbose_name_plural = 'Asset Variants'
+    
+    def __str__(self):
+        return f"{self.experience.title} - {self.get_source_field_display()} ({self.get_variant_display()})"
+    
+    def get_size_reduction(self):
+        """Return the size saved relative to the original upload, as a percentage"""
+        if not self.original_size:
+            return 0.0
+        return round((1 - self.size / self.original_size) * 100, 1)
@@ -1,9 +1,13 @@
 from rest_framework import serializers
-from .models import WakeRoomExperience, WakeRoomSession, WakeRoomFeature
+from django.conf import settings
+from kardiversebackend.fieldsets import SparseFieldsMixin
+from .models import WakeRoomExperience, WakeRoomSession, WakeRoomFeature, ChunkedUpload, AssetVariant
 
-class WakeRoomFeatureSerializer(serializers.ModelSerializer):
+class WakeRoomFeatureSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for WakeRoomFeature model"""
-    icon_component = serializers.CharField(read_only=True)
+    icon_component = serializers.CharField(source='get_icon_component', read_only=True)
+    
+    field_dependencies = {'icon_component': ['icon_name']}
     
     class Meta:
         model = WakeRoomFeature
@@ -12,14 +16,8 @@ class WakeRoomFeatureSerializer(serializers.ModelSerializer):
             'feature_type', 'technical_requirements'
         ]
         read_only_fields = ['id']
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['icon_component'] = instance.get_icon_component()
-        return data
 
-class WakeRoomExperienceSerializer(serializers.ModelSerializer):
+class WakeRoomExperienceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for WakeRoomExperience model"""
     media_files = serializers.SerializerMethodField()
     experience_duration = serializers.CharField(read_only=True)
@@ -28,6 +26,13 @@ class WakeRoomExperienceSerializer(serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.username', read_only=True)
     associated_memorials_count = serializers.SerializerMethodField()
     
+    field_dependencies = {
+        'media_files': ['demo_video', 'thumbnail_image', 'ar_model_file', 'vr_scene_file'],
+        'technology_requirements': ['requires_headset', 'spatial_audio', 'nfc_enabled', 'qr_code_required'],
+        'is_available': ['status'],
+        'associated_memorials_count': [],
+    }
+    
     class Meta:
         model = WakeRoomExperience
         fields = [
@@ -70,19 +75,18 @@ class WakeRoomExperienceSerializer(serializers.ModelSerializer):
     def get_associated_memorials_count(self, obj):
         """Return count of associated memorials"""
         return obj.associated_memorials.count()
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['is_available'] = instance.is_available()
-        return data
 
-class WakeRoomExperienceListSerializer(serializers.ModelSerializer):
+class WakeRoomExperienceListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Simplified serializer for WakeRoom experience lists"""
     experience_duration = serializers.CharField(read_only=True)
     is_available = serializers.BooleanField(read_only=True)
     thumbnail_url = serializers.SerializerMethodField()
     
+    field_dependencies = {
+        'is_available': ['status'],
+        'thumbnail_url': ['thumbnail_image'],
+    }
+    
     class Meta:
         model = WakeRoomExperience
         fields = [
@@ -100,12 +104,6 @@ class WakeRoomExperienceListSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.thumbnail_image.url)
             return obj.thumbnail_image.url
         return None
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['is_available'] = instance.is_available()
-        return data
 
 class WakeRoomExperienceCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new WakeRoom experiences"""
@@ -131,7 +129,7 @@ class WakeRoomExperienceUpdateSerializer(serializers.ModelSerializer):
             'spatial_audio', 'associated_memorials', 'is_featured'
         ]
 
-class WakeRoomSessionSerializer(serializers.ModelSerializer):
+class WakeRoomSessionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for WakeRoomSession model"""
     experience_title = serializers.CharField(source='experience.title', read_only=True)
     memorial_name = serializers.CharField(source='memorial.name', read_only=True)
@@ -139,6 +137,8 @@ class WakeRoomSessionSerializer(serializers.ModelSerializer):
     duration_display = serializers.CharField(read_only=True)
     is_active = serializers.BooleanField(read_only=True)
     
+    field_dependencies = {'is_active': ['end_time']}
+    
     class Meta:
         model = WakeRoomSession
         fields = [
@@ -151,12 +151,6 @@ class WakeRoomSessionSerializer(serializers.ModelSerializer):
             'id', 'start_time', 'experience_title', 'memorial_name', 'user_name',
             'duration_display', 'is_active'
         ]
-    
-    def to_representation(self, instance):
-        """Custom representation with computed fields"""
-        data = super().to_representation(instance)
-        data['is_active'] = instance.is_active()
-        return data
 
 class WakeRoomSessionCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new WakeRoom sessions"""
@@ -185,4 +179,82 @@ class WakeRoomStatisticsSerializer(serializers.Serializer):
     average_session_duration = serializers.FloatField()
     experiences_by_type = serializers.DictField()
     recent_sessions = serializers.ListField()
-    top_experiences = serializers.ListField() 
\ No newline at end of file
+    top_experiences = serializers.ListField()
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    """Serializer for ChunkedUpload model"""
+    part_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ChunkedUpload
+        fields = [
+            'upload_id', 'experience', 'field_name', 'filename', 'total_size', 'chunk_size',
+            'part_count', 'checksum', 'status', 'stored_name', 'created_by', 'created_at',
+            'updated_at', 'completed_at'
+        ]
+        read_only_fields = [
+            'upload_id', 'status', 'stored_name', 'created_by', 'created_at', 'updated_at',
+            'completed_at', 'part_count'
+        ]
+        extra_kwargs = {
+            'chunk_size': {'required': False}
+        }
+    
+    def get_part_count(self, obj):
+        """Return the number of parts the file is split into"""
+        return obj.get_part_count()
+    
+    def validate_total_size(self, value):
+        """Validate the announced file size"""
+        if value < 1:
+            raise serializers.ValidationError("File must not be empty")
+        if value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"File exceeds the {settings.CHUNKED_UPLOAD_MAX_SIZE} byte limit")
+        return value
+    
+    def validate_chunk_size(self, value):
+        """Validate the requested part size"""
+        if not 1024 * 1024 <= value <= settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+            raise serializers.ValidationError(
+                f"Chunk size must be between 1MB and {settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE} bytes"
+            )
+        return value
+    
+    def validate_checksum(self, value):
+        """Validate the optional manifest checksum is a SHA-256 hex digest"""
+        value = value.lower()
+        if value and (len(value) != 64 or any(char not in '0123456789abcdef' for char in value)):
+            raise serializers.ValidationError("Checksum must be a SHA-256 hex digest")
+        return value
+    
+    def validate_filename(self, value):
+        """Strip any client-side directory components"""
+        value = value.replace('\\', '/').rsplit('/', 1)[-1]
+        if not value or value in ('.', '..'):
+            raise serializers.ValidationError("Invalid filename")
+        return value
+
+
+class AssetVariantSerializer(serializers.ModelSerializer):
+    """Serializer for optimized 3D asset variants"""
+    url = serializers.SerializerMethodField()
+    size_reduction = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = AssetVariant
+        fields = [
+            'source_field', 'variant', 'url', 'size', 'original_size', 'size_reduction',
+            'vertex_count', 'triangle_count', 'processing_time', 'created_at'
+        ]
+        read_only_fields = fields
+    
+    def get_url(self, obj):
+        """Return full URL for the variant file"""
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(obj.file.url)
+        return obj.file.url
+    
+    def get_size_reduction(self, obj):
+        """Return the percentage saved relative to the original upload"""
+        return obj.get_size_reduction()
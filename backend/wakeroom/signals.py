@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from kardiversebackend.tasks import run_in_background
+from .meshopt import optimize_experience_assets, stale_asset_fields
+from .models import WakeRoomExperience
+
+
+@receiver(post_save, sender=WakeRoomExperience)
+def schedule_asset_optimization(sender, instance, raw=False, **kwargs):
+    """Generate lighter variants in the background when a glTF asset is uploaded or replaced"""
+    if raw or not settings.MESH_OPTIMIZE_ON_UPLOAD:
+        return
+    stale = stale_asset_fields(instance)
+    if stale:
+        run_in_background(optimize_experience_assets, instance.pk, stale)
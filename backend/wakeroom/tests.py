@@ -1,3 +1,133 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import struct
+import tempfile
 
-# Create your tests here.
+import numpy as np
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from .meshopt import MeshError, optimize_experience_assets, optimize_gltf
+from .models import WakeRoomExperience
+
+
+def grid_document(size=12, **overrides):
+    """Return (document, binary) of a flat size x size quad grid"""
+    axis = np.arange(size + 1, dtype=np.float32)
+    x, z = np.meshgrid(axis, axis)
+    positions = np.stack([x.ravel(), np.zeros(x.size, np.float32), z.ravel()], axis=1).astype(np.float32)
+    triangles = []
+    for row in range(size):
+        for column in range(size):
+            a = row * (size + 1) + column
+            triangles += [[a, a + size + 1, a + 1], [a + 1, a + size + 1, a + size + 2]]
+    indices = np.array(triangles, dtype=np.uint32)
+
+    binary = positions.tobytes() + indices.tobytes()
+    document = {
+        'asset': {'version': '2.0'},
+        'nodes': [{'mesh': 0}],
+        'meshes': [{'primitives': [{'attributes': {'POSITION': 0}, 'indices': 1}]}],
+        'accessors': [
+            {'bufferView': 0, 'componentType': 5126, 'count': len(positions), 'type': 'VEC3'},
+            {'bufferView': 1, 'componentType': 5125, 'count': indices.size, 'type': 'SCALAR'},
+        ],
+        'bufferViews': [
+            {'buffer': 0, 'byteOffset': 0, 'byteLength': positions.nbytes},
+            {'buffer': 0, 'byteOffset': positions.nbytes, 'byteLength': indices.nbytes},
+        ],
+        'buffers': [{'byteLength': len(binary)}],
+    }
+    document.update(overrides)
+    return document, binary
+
+
+def glb(document, binary):
+    json_chunk = json.dumps(document).encode('utf-8')
+    json_chunk += b' ' * (-len(json_chunk) % 4)
+    body = struct.pack('<II', len(json_chunk), 0x4E4F534A) + json_chunk
+    body += struct.pack('<II', len(binary), 0x004E4942) + binary
+    return struct.pack('<4sII', b'glTF', 2, 12 + len(body)) + body
+
+
+class MeshOptimizationTests(TestCase):
+    """Variant generation and the handling of malformed uploads"""
+
+    def test_valid_asset_produces_every_variant(self):
+        variants = optimize_gltf(glb(*grid_document()), lod_ratios=(0.5, 0.25))
+
+        self.assertEqual([variant['variant'] for variant in variants], ['full', 'lod1', 'lod2'])
+        self.assertEqual(variants[0]['triangle_count'], 288)
+        self.assertLess(variants[2]['triangle_count'], variants[0]['triangle_count'])
+
+    def test_truncated_assets_raise_mesh_error(self):
+        data = glb(*grid_document())
+        for length in (8, 40, len(data) // 2, len(data) - 4):
+            with self.subTest(length=length), self.assertRaises(MeshError):
+                optimize_gltf(data[:length])
+
+    def test_structurally_invalid_assets_raise_mesh_error(self):
+        document, binary = grid_document()
+        invalid = {
+            'json array': b'[]',
+            'missing accessors': glb({key: value for key, value in document.items() if key != 'accessors'}, binary),
+            'unknown component type': glb({**document, 'accessors': [
+                {**document['accessors'][0], 'componentType': 1},
+                document['accessors'][1],
+            ]}, binary),
+            'accessor out of range': glb({**document, 'meshes': [
+                {'primitives': [{'attributes': {'POSITION': 7}, 'indices': 1}]}
+            ]}, binary),
+            'meshes not a list': glb({**document, 'meshes': 3}, binary),
+            'primitive not an object': glb({**document, 'meshes': [{'primitives': ['POSITION']}]}, binary),
+            'buffers not objects': glb({**document, 'buffers': [None]}, binary),
+            'negative count': glb({**document, 'accessors': [
+                {**document['accessors'][0], 'count': -1},
+                document['accessors'][1],
+            ]}, binary),
+        }
+        for label, data in invalid.items():
+            with self.subTest(label), self.assertRaises(MeshError):
+                optimize_gltf(data)
+
+
+@override_settings(MESH_OPTIMIZE_ON_UPLOAD=False)
+class ExperienceAssetTests(TestCase):
+    """Recording variants, and failures, for an experience's uploads"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def experience(self, data):
+        experience = WakeRoomExperience(title='Garden', description='A quiet garden.', experience_type='AR')
+        experience.ar_model_file.save('garden.glb', ContentFile(data), save=False)
+        experience.save()
+        return experience
+
+    def test_malformed_asset_is_recorded_and_not_retried(self):
+        document, binary = grid_document()
+        del document['accessors']
+        experience = self.experience(glb(document, binary))
+
+        self.assertEqual(optimize_experience_assets(experience.pk), [])
+
+        experience.refresh_from_db()
+        failure = experience.asset_optimization_errors['ar_model_file']
+        self.assertEqual(failure['source_name'], experience.ar_model_file.name)
+        self.assertIn(os.path.basename(experience.ar_model_file.name), failure['error'])
+        self.assertEqual(optimize_experience_assets(experience.pk), [])
+        self.assertFalse(experience.asset_variants.exists())
+
+    def test_valid_asset_records_variants(self):
+        experience = self.experience(glb(*grid_document()))
+
+        records = optimize_experience_assets(experience.pk)
+
+        self.assertEqual(len(records), 3)
+        experience.refresh_from_db()
+        self.assertEqual(experience.asset_optimization_errors, {})
@@ -0,0 +1,145 @@
+"""
+Disk operations for chunked, resumable uploads.
+
+Each upload gets a directory under CHUNKED_UPLOAD_DIR holding one file per
+received part. Parts are streamed from the request straight to disk while
+their SHA-256 is computed, so neither a part nor the assembled file is ever
+held in memory. The digest of each part is kept in a sidecar file so the
+manifest checksum (SHA-256 over the concatenated part digests) can be checked
+at completion without re-reading the data.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+
+READ_BLOCK_SIZE = 256 * 1024
+
+
+class ChunkError(Exception):
+    """Raised when a part or an assembled upload fails validation"""
+
+
+class AssembledFile(File):
+    """
+    A fully assembled upload on local disk.
+
+    Exposing temporary_file_path() lets FileSystemStorage move the file into
+    place instead of copying it through Python, and content_sha256 spares
+    content-addressed storage from hashing it again.
+    """
+
+    def __init__(self, path, name, sha256):
+        super().__init__(open(path, 'rb'), name=name)
+        self.path = path
+        self.content_sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def upload_dir(upload_id):
+    """Return the working directory of an upload"""
+    return os.path.join(settings.CHUNKED_UPLOAD_DIR, str(upload_id))
+
+
+def part_path(upload_id, part_number):
+    """Return the on-disk location of a received part"""
+    return os.path.join(upload_dir(upload_id), f"part-{part_number:06d}")
+
+
+def received_parts(upload_id):
+    """Return {part_number: sha256 hex digest} for every part on disk"""
+    directory = upload_dir(upload_id)
+    if not os.path.isdir(directory):
+        return {}
+
+    parts = {}
+    for entry in os.listdir(directory):
+        if entry.startswith('part-') and entry.endswith('.sha256'):
+            part_number = int(entry[len('part-'):-len('.sha256')])
+            with open(os.path.join(directory, entry)) as digest_file:
+                parts[part_number] = digest_file.read().strip()
+    return parts
+
+
+def write_part(upload_id, part_number, stream, expected_size, expected_sha256=None):
+    """
+    Stream one part from a file-like object to disk and return its digest.
+
+    The part is written to a temporary file and only renamed into place once
+    its size (and SHA-256, when the client sent one) has been verified, so an
+    interrupted or corrupt transfer never leaves a bad part behind and the
+    client can simply resend it.
+    """
+    directory = upload_dir(upload_id)
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    received = 0
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as part_file:
+            while True:
+                block = stream.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                received += len(block)
+                if received > expected_size:
+                    raise ChunkError(f"Part {part_number} is larger than {expected_size} bytes")
+                digest.update(block)
+                part_file.write(block)
+
+        if received != expected_size:
+            raise ChunkError(f"Part {part_number} should be {expected_size} bytes, received {received}")
+        hex_digest = digest.hexdigest()
+        if expected_sha256 and expected_sha256.lower() != hex_digest:
+            raise ChunkError(f"Part {part_number} checksum mismatch")
+
+        final_path = part_path(upload_id, part_number)
+        os.replace(tmp_path, final_path)
+        # A part only counts as received once its sidecar is complete
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as digest_file:
+            digest_file.write(hex_digest)
+        os.replace(tmp_path, final_path + '.sha256')
+        return hex_digest
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def manifest_checksum(part_digests):
+    """Return the SHA-256 of the concatenated part digests, in part order"""
+    manifest = hashlib.sha256()
+    for part_number in sorted(part_digests):
+        manifest.update(bytes.fromhex(part_digests[part_number]))
+    return manifest.hexdigest()
+
+
+def assemble(upload_id, part_count, filename):
+    """
+    Concatenate all parts into a single file and return it as an AssembledFile.
+
+    The file's SHA-256 is computed while the parts are copied, so storage
+    does not read the assembled file a second time to hash it.
+    """
+    directory = upload_dir(upload_id)
+    assembled_path = os.path.join(directory, 'assembled')
+    digest = hashlib.sha256()
+    with open(assembled_path, 'wb') as destination:
+        for part_number in range(1, part_count + 1):
+            with open(part_path(upload_id, part_number), 'rb') as source:
+                for block in iter(lambda: source.read(READ_BLOCK_SIZE), b''):
+                    digest.update(block)
+                    destination.write(block)
+    return AssembledFile(assembled_path, filename, digest.hexdigest())
+
+
+def discard(upload_id):
+    """Remove an upload's working directory and everything in it"""
+    shutil.rmtree(upload_dir(upload_id), ignore_errors=True)
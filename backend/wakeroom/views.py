@@ -1,27 +1,53 @@
+import io
+
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import render
-from rest_framework import viewsets, status, filters
+from django.utils import timezone
+from rest_framework import mixins, viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Count, Avg
 from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
 
-from .models import WakeRoomExperience, WakeRoomSession, WakeRoomFeature
+from kardiversebackend.exports import StreamingExportMixin
+from kardiversebackend.fieldsets import SparseFieldsViewMixin
+from kardiversebackend.renderers import NativeTypesViewMixin
+from kardiversebackend.includes import Include
+from kardiversebackend.retrieval import BatchRetrieveMixin
+from memorials.qr import QR_FORMATS, QR_SIZES
+from memorials.serializers import MemorialListSerializer
+from memorials.views import qr_image_redirect
+from .meshopt import ASSET_FIELDS, VARIANT_NAMES, select_variant
+from .models import WakeRoomExperience, WakeRoomSession, WakeRoomFeature, ChunkedUpload
 from .serializers import (
     WakeRoomExperienceSerializer, WakeRoomExperienceListSerializer,
     WakeRoomExperienceCreateSerializer, WakeRoomExperienceUpdateSerializer,
     WakeRoomSessionSerializer, WakeRoomSessionCreateSerializer, WakeRoomSessionUpdateSerializer,
-    WakeRoomFeatureSerializer, WakeRoomStatisticsSerializer
+    WakeRoomFeatureSerializer, WakeRoomStatisticsSerializer, ChunkedUploadSerializer,
+    AssetVariantSerializer
 )
+from .uploads import ChunkError, assemble, discard, manifest_checksum, received_parts, write_part
+
+MOBILE_USER_AGENT_MARKERS = ('Mobi', 'Android', 'iPhone', 'iPad')
 
 # Create your views here.
 
-class WakeRoomExperienceViewSet(viewsets.ModelViewSet):
+class WakeRoomExperienceViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, BatchRetrieveMixin, viewsets.ModelViewSet):
     """
     ViewSet for WakeRoomExperience model providing CRUD operations and additional actions.
     """
     queryset = WakeRoomExperience.objects.all()
+    batch_select_related = ['created_by']
+    batch_prefetch_related = ['associated_memorials']
+    includes = {
+        'memorials': Include('associated_memorials', MemorialListSerializer, ordering=['name']),
+    }
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['experience_type', 'status', 'is_immersive', 'requires_headset', 'spatial_audio']
@@ -129,6 +155,29 @@ class WakeRoomExperienceViewSet(viewsets.ModelViewSet):
             'duration': experience.get_experience_duration()
         })
     
+    @action(detail=True, methods=['get'])
+    def qr_code(self, request, pk=None):
+        """Get QR code data for an experience"""
+        experience = self.get_object()
+        return Response({
+            'id': experience.id,
+            'title': experience.title,
+            'qr_code_required': experience.qr_code_required,
+            'qr_code_data': experience.qr_code_data,
+            'qr_code_url': request.build_absolute_uri(experience.get_qr_code_path()),
+            'qr_image_url': request.build_absolute_uri(
+                reverse('wakeroomexperience-qr-image', kwargs={'pk': experience.pk})
+            ),
+            'qr_image_formats': list(QR_FORMATS),
+            'qr_image_sizes': list(QR_SIZES)
+        })
+    
+    @action(detail=True, methods=['get'])
+    def qr_image(self, request, pk=None):
+        """Redirect to the rendered QR code image (?fmt=png|svg&size=small|medium|large|print)"""
+        experience = self.get_object()
+        return qr_image_redirect(request, experience.get_qr_code_path())
+    
     @action(detail=True, methods=['get'])
     def media_files(self, request, pk=None):
         """Get media files for an experience"""
@@ -152,6 +201,62 @@ class WakeRoomExperienceViewSet(viewsets.ModelViewSet):
             'media_files': formatted_files
         })
     
+    @action(detail=True, methods=['get'])
+    def asset(self, request, pk=None):
+        """
+        Get the AR model or VR scene best suited to the client
+        (?field=ar_model_file|vr_scene_file&variant=full|lod1|lod2|original).
+        """
+        experience = self.get_object()
+        field_name = request.query_params.get('field', 'ar_model_file')
+        if field_name not in ASSET_FIELDS:
+            return Response(
+                {'error': f'Invalid field. Must be one of: {", ".join(ASSET_FIELDS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        field_file = getattr(experience, field_name)
+        if not field_file:
+            return Response(
+                {'error': 'Experience has no such asset'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        requested = request.query_params.get('variant')
+        if requested and requested != 'original' and requested not in VARIANT_NAMES:
+            return Response(
+                {'error': f'Invalid variant. Must be one of: original, {", ".join(VARIANT_NAMES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        user_agent = request.headers.get('User-Agent', '')
+        mobile = any(marker in user_agent for marker in MOBILE_USER_AGENT_MARKERS)
+        selected = None
+        if requested != 'original':
+            selected = select_variant(experience, field_name, requested, mobile=mobile)
+            if requested and selected is None:
+                return Response(
+                    {'error': 'Variant has not been generated'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        
+        variants = [
+            variant for variant in experience.asset_variants.all()
+            if variant.source_field == field_name and variant.source_name == field_file.name
+        ]
+        response = Response({
+            'experience_id': experience.id,
+            'field': field_name,
+            'variant': selected.variant if selected else 'original',
+            'url': request.build_absolute_uri(selected.file.url if selected else field_file.url),
+            'size': selected.size if selected else field_file.size,
+            'original_url': request.build_absolute_uri(field_file.url),
+            'variants': AssetVariantSerializer(variants, many=True, context={'request': request}).data
+        })
+        if not requested:
+            patch_vary_headers(response, ['User-Agent'])
+        return response
+    
     @action(detail=False, methods=['get'])
     def search(self, request):
         """Search experiences by content and type"""
@@ -227,10 +332,11 @@ class WakeRoomExperienceViewSet(viewsets.ModelViewSet):
         serializer = WakeRoomStatisticsSerializer(data)
         return Response(serializer.data)
 
-class WakeRoomSessionViewSet(viewsets.ModelViewSet):
+class WakeRoomSessionViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, StreamingExportMixin, viewsets.ModelViewSet):
     """
     ViewSet for WakeRoomSession model.
     """
+    export_name = 'wakeroom_sessions'
     queryset = WakeRoomSession.objects.all()
     serializer_class = WakeRoomSessionSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -312,7 +418,7 @@ class WakeRoomSessionViewSet(viewsets.ModelViewSet):
             'session': serializer.data
         })
 
-class WakeRoomFeatureViewSet(viewsets.ModelViewSet):
+class WakeRoomFeatureViewSet(NativeTypesViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for WakeRoomFeature model.
     """
@@ -336,3 +442,168 @@ class WakeRoomFeatureViewSet(viewsets.ModelViewSet):
             data[category] = WakeRoomFeatureSerializer(features, many=True, context={'request': request}).data
         
         return Response(data)
+
+class ChunkedUploadViewSet(NativeTypesViewMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.ListModelMixin, mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads for large experience media (AR models, VR scenes, videos).
+    
+    create: Start an upload (experience, field_name, filename, total_size, optional chunk_size/checksum)
+    retrieve: Upload status including received and missing parts, used to resume
+    upload_part: PUT the raw bytes of a 1-based part, optionally with an X-Chunk-SHA256 header
+    complete: Assemble the parts and attach the file to the experience
+    destroy: Abort the upload and discard received parts
+    """
+    queryset = ChunkedUpload.objects.select_related('experience')
+    serializer_class = ChunkedUploadSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'upload_id'
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['experience', 'field_name', 'status']
+    ordering = ['-created_at']
+    
+    def get_queryset(self):
+        """Users only see their own uploads; staff see all"""
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+    
+    def perform_create(self, serializer):
+        """Record the uploader and apply the default chunk size"""
+        serializer.save(
+            created_by=self.request.user,
+            chunk_size=serializer.validated_data.get('chunk_size', settings.CHUNKED_UPLOAD_CHUNK_SIZE)
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Get upload status with the parts still to send"""
+        upload = self.get_object()
+        data = self.get_serializer(upload).data
+        parts = received_parts(upload.upload_id) if upload.is_pending() else {}
+        data['received_parts'] = sorted(parts)
+        data['missing_parts'] = [
+            part_number for part_number in range(1, upload.get_part_count() + 1)
+            if part_number not in parts
+        ] if upload.is_pending() else []
+        return Response(data)
+    
+    @action(detail=True, methods=['put'], url_path=r'parts/(?P<part_number>[0-9]+)')
+    def upload_part(self, request, upload_id=None, part_number=None):
+        """Stream one part of the file straight to disk"""
+        upload = self.get_object()
+        part_number = int(part_number)
+        
+        if not upload.is_pending():
+            return Response(
+                {'error': f'Upload is {upload.status}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        if not 1 <= part_number <= upload.get_part_count():
+            return Response(
+                {'error': f'Part number must be between 1 and {upload.get_part_count()}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        expected_size = upload.get_part_size(part_number)
+        content_length = request.META.get('CONTENT_LENGTH')
+        if content_length and int(content_length) != expected_size:
+            return Response(
+                {'error': f'Part {part_number} must be exactly {expected_size} bytes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            # request.stream reads the raw body without parsing or buffering it
+            digest = write_part(
+                upload.upload_id, part_number, request.stream or io.BytesIO(),
+                expected_size, request.headers.get('X-Chunk-SHA256')
+            )
+        except ChunkError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        ChunkedUpload.objects.filter(pk=upload.pk).update(updated_at=timezone.now())
+        return Response({
+            'upload_id': upload.upload_id,
+            'part_number': part_number,
+            'size': expected_size,
+            'sha256': digest
+        })
+    
+    @action(detail=True, methods=['post'])
+    def complete(self, request, upload_id=None):
+        """Verify all parts, assemble the file and attach it to the experience"""
+        upload = self.get_object()
+        
+        # Claim the upload in a short transaction; assembling gigabytes must not hold the row lock
+        with transaction.atomic():
+            upload = ChunkedUpload.objects.select_for_update().select_related('experience').get(pk=upload.pk)
+            if not upload.is_pending():
+                return Response(
+                    {'error': f'Upload is {upload.status}'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            
+            part_count = upload.get_part_count()
+            parts = received_parts(upload.upload_id)
+            missing_parts = [n for n in range(1, part_count + 1) if n not in parts]
+            if missing_parts:
+                return Response(
+                    {'error': 'Upload is missing parts', 'missing_parts': missing_parts},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            parts = {n: parts[n] for n in range(1, part_count + 1)}
+            checksum = manifest_checksum(parts)
+            if upload.checksum and upload.checksum != checksum:
+                return Response(
+                    {'error': 'Upload checksum mismatch', 'checksum': checksum},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            upload.status = 'assembling'
+            upload.save(update_fields=['status', 'updated_at'])
+        
+        try:
+            assembled = assemble(upload.upload_id, part_count, upload.filename)
+            experience = upload.experience
+            field_file = getattr(experience, upload.field_name)
+            previous_name = field_file.name
+            try:
+                # FileSystemStorage moves the assembled file into place rather than copying it
+                field_file.save(upload.filename, assembled, save=False)
+            finally:
+                assembled.close()
+            if field_file.name == previous_name:
+                # Identical content: the field keeps the one reference it already held
+                field_file.storage.delete(previous_name)
+        except BaseException:
+            # The parts are still there, so the client can complete again
+            ChunkedUpload.objects.filter(pk=upload.pk).update(status='pending', updated_at=timezone.now())
+            raise
+        
+        with transaction.atomic():
+            experience.save(update_fields=[upload.field_name, 'updated_at'])
+            upload.status = 'complete'
+            upload.stored_name = field_file.name
+            upload.checksum = checksum
+            upload.completed_at = timezone.now()
+            upload.save()
+        
+        discard(upload.upload_id)
+        return Response({
+            'message': 'Upload completed successfully',
+            'upload': ChunkedUploadSerializer(upload, context={'request': request}).data,
+            'url': request.build_absolute_uri(field_file.url)
+        })
+    
+    def perform_destroy(self, instance):
+        """Abort the upload instead of deleting its record"""
+        if instance.status == 'assembling':
+            raise ValidationError({'error': 'Upload is being assembled'})
+        if instance.is_pending():
+            instance.status = 'aborted'
+            instance.save()
+        discard(instance.upload_id)
+
@@ -2,10 +2,10 @@ import { QrCode, Heart, Music, Users, TreePine, Cross, Moon, Camera, BookOpen }
 import { Card } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
-import { type Memorial } from "@/lib/api";
+import { type MemorialListItem } from "@/lib/api";
 
 interface MemoryCardProps {
-  memorial: Memorial;
+  memorial: MemorialListItem;
 }
 
 const MemoryCard = ({ memorial }: MemoryCardProps) => {
@@ -15,7 +15,7 @@ const MemoryCard = ({ memorial }: MemoryCardProps) => {
     image_url,
     religion,
     categories,
-    description,
+    excerpt,
     qr_code,
     religion_icon,
     religion_color_class
@@ -103,7 +103,7 @@ const MemoryCard = ({ memorial }: MemoryCardProps) => {
         </div>
 
         <p className="text-sm text-muted-foreground leading-relaxed mb-6 line-clamp-3">
-          {description}
+          {excerpt}
         </p>
 
         {/* Enhanced Categories - Grid layout like in mockups */}
@@ -52,6 +52,25 @@ export const useMemorial = (id: number) => {
   });
 };
 
+export const useMemorialsByIds = (ids: number[]) => {
+  return useQuery({
+    queryKey: ['memorials', 'batch', ids],
+    queryFn: async () => {
+      try {
+        const response = await apiClient.getMemorialsByIds(ids);
+        return response.results;
+      } catch (error) {
+        // Fallback to sample data, keeping the requested order
+        return ids
+          .map(id => sampleMemorials.find(m => m.id === id))
+          .filter((memorial): memorial is Memorial => !!memorial);
+      }
+    },
+    enabled: ids.length > 0,
+    staleTime: 10 * 60 * 1000, // 10 minutes
+  });
+};
+
 export const useFeaturedMemorials = () => {
   return useQuery({
     queryKey: ['memorials', 'featured'],
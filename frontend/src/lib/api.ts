@@ -13,19 +13,57 @@ export interface PaginatedResponse<T> {
   results: T[];
 }
 
+export interface MemorialPage {
+  memorial: Memorial;
+  timeline_stories: TimelineStory[];
+  wakeroom_experiences: WakeRoomExperience[];
+  qr: Record<string, any>;
+  counts: {
+    timeline_stories: number;
+    wakeroom_experiences: number;
+  };
+}
+
+export interface BatchResponse<T> {
+  count: number;
+  results: T[];
+  missing: number[];
+}
+
+export interface BatchedResponse<T = any> {
+  id: string;
+  path: string;
+  status: number;
+  headers: Record<string, string>;
+  body: T;
+}
+
+export interface MultiplexedResponse {
+  count: number;
+  responses: BatchedResponse[];
+}
+
 // Memorial Types
-export interface Memorial {
+// Memorial card returned by list, search, featured, by_religion and by_category: no description, only its excerpt
+export interface MemorialListItem {
   id: number;
   name: string;
   dates: string;
-  birth_date: string | null;
-  death_date: string | null;
   image: string | null;
   image_url: string | null;
   religion: 'Christian' | 'Muslim';
   categories: string[];
-  description: string;
+  excerpt: string;
   qr_code: boolean;
+  language: string;
+  religion_icon: string;
+  religion_color_class: string;
+}
+
+export interface Memorial extends MemorialListItem {
+  birth_date: string | null;
+  death_date: string | null;
+  description: string;
   qr_code_data: string;
   family_members: string[];
   life_story: string;
@@ -34,9 +72,6 @@ export interface Memorial {
   created_at: string;
   updated_at: string;
   is_active: boolean;
-  language: string;
-  religion_icon: string;
-  religion_color_class: string;
   categories_display: string;
 }
 
@@ -179,30 +214,50 @@ class ApiClient {
     }
   }
 
+  // Several GET endpoints in one round trip, keyed like the endpoints passed in
+  async batch(endpoints: Record<string, string>): Promise<Record<string, BatchedResponse>> {
+    const prefix = new URL(this.baseUrl).pathname;
+    const response = await this.request<MultiplexedResponse>('/batch/', {
+      method: 'POST',
+      body: JSON.stringify({
+        requests: Object.entries(endpoints).map(([id, endpoint]) => ({ id, path: `${prefix}${endpoint}` })),
+      }),
+    });
+    return Object.fromEntries(response.responses.map((item) => [item.id, item]));
+  }
+
   // Memorials API
-  async getMemorials(params?: Record<string, any>): Promise<PaginatedResponse<Memorial>> {
+  async getMemorials(params?: Record<string, any>): Promise<PaginatedResponse<MemorialListItem>> {
     const queryString = params ? `?${new URLSearchParams(params).toString()}` : '';
-    return this.request<PaginatedResponse<Memorial>>(`/memorials/${queryString}`);
+    return this.request<PaginatedResponse<MemorialListItem>>(`/memorials/${queryString}`);
   }
 
   async getMemorial(id: number): Promise<Memorial> {
     return this.request<Memorial>(`/memorials/${id}/`);
   }
 
-  async getFeaturedMemorials(): Promise<Memorial[]> {
-    return this.request<Memorial[]>('/memorials/featured/');
+  async getMemorialPage(id: number): Promise<MemorialPage> {
+    return this.request<MemorialPage>(`/memorials/${id}/page/`);
+  }
+
+  async getMemorialsByIds(ids: number[]): Promise<BatchResponse<Memorial>> {
+    return this.request<BatchResponse<Memorial>>(`/memorials/batch/?ids=${ids.join(',')}`);
+  }
+
+  async getFeaturedMemorials(): Promise<MemorialListItem[]> {
+    return this.request<MemorialListItem[]>('/memorials/featured/');
   }
 
-  async getMemorialsByReligion(religion: string): Promise<Memorial[]> {
-    return this.request<Memorial[]>(`/memorials/by_religion/?religion=${religion}`);
+  async getMemorialsByReligion(religion: string): Promise<MemorialListItem[]> {
+    return this.request<MemorialListItem[]>(`/memorials/by_religion/?religion=${religion}`);
   }
 
-  async getMemorialsByCategory(category: string): Promise<Memorial[]> {
-    return this.request<Memorial[]>(`/memorials/by_category/?category=${category}`);
+  async getMemorialsByCategory(category: string): Promise<MemorialListItem[]> {
+    return this.request<MemorialListItem[]>(`/memorials/by_category/?category=${category}`);
   }
 
-  async searchMemorials(query: string): Promise<PaginatedResponse<Memorial>> {
-    return this.request<PaginatedResponse<Memorial>>(`/memorials/search/?search=${query}`);
+  async searchMemorials(query: string): Promise<PaginatedResponse<MemorialListItem>> {
+    return this.request<PaginatedResponse<MemorialListItem>>(`/memorials/search/?search=${query}`);
   }
 
   // Timeline API
@@ -215,6 +270,10 @@ class ApiClient {
     return this.request<PaginatedResponse<TimelineStory>>(`/timeline/stories/${queryString}`);
   }
 
+  async getTimelineStoriesByIds(ids: number[]): Promise<BatchResponse<TimelineStory>> {
+    return this.request<BatchResponse<TimelineStory>>(`/timeline/stories/batch/?ids=${ids.join(',')}`);
+  }
+
   async getStoriesByPhase(phaseId: number): Promise<TimelineStory[]> {
     return this.request<TimelineStory[]>(`/timeline/stories/by_phase/?phase_id=${phaseId}`);
   }
@@ -247,6 +306,10 @@ class ApiClient {
     return this.request<PaginatedResponse<WakeRoomExperience>>(`/wakeroom/experiences/${queryString}`);
   }
 
+  async getWakeRoomExperiencesByIds(ids: number[]): Promise<BatchResponse<WakeRoomExperience>> {
+    return this.request<BatchResponse<WakeRoomExperience>>(`/wakeroom/experiences/batch/?ids=${ids.join(',')}`);
+  }
+
   async getFeaturedExperiences(): Promise<WakeRoomExperience[]> {
     return this.request<WakeRoomExperience[]>('/wakeroom/experiences/featured/');
   }
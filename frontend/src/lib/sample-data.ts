@@ -27,6 +27,7 @@ export const sampleMemorials: Memorial[] = [
     religion: "Muslim",
     categories: ["Life Moments", "Voice & Stories", "Family Tree"],
     description: "Beloved father and community leader who dedicated his life to serving others through his work as a teacher and mosque volunteer.",
+    excerpt: "Beloved father and community leader who dedicated his life to serving others through his work as a teacher and mosque volunteer.",
     qr_code: true,
     qr_code_data: "memorial_001_ahmad",
     family_members: ["Fatima Al-Rashid", "Omar Hassan", "Aisha Hassan"],
@@ -52,6 +53,7 @@ export const sampleMemorials: Memorial[] = [
     religion: "Christian",
     categories: ["Life Moments", "Spiritual Room", "Voice & Stories"],
     description: "Devoted Christian woman who touched countless lives through her ministry work and gentle spirit.",
+    excerpt: "Devoted Christian woman who touched countless lives through her ministry work and gentle spirit.",
     qr_code: true,
     qr_code_data: "memorial_002_margaret",
     family_members: ["Robert Thompson", "Sarah Johnson", "Michael Thompson"],
@@ -77,6 +79,7 @@ export const sampleMemorials: Memorial[] = [
     religion: "Muslim",
     categories: ["Family Tree", "Voice & Stories", "Spiritual Room"],
     description: "Loving mother and grandmother who preserved family traditions and Islamic values for future generations.",
+    excerpt: "Loving mother and grandmother who preserved family traditions and Islamic values for future generations.",
     qr_code: true,
     qr_code_data: "memorial_003_fatima",
     family_members: ["Ali Khan", "Zara Khan", "Hassan Khan"],
@@ -102,6 +105,7 @@ export const sampleMemorials: Memorial[] = [
     religion: "Christian",
     categories: ["Spiritual Room", "Life Moments", "Voice & Stories"],
     description: "Beloved pastor who served his congregation for over 40 years with wisdom, compassion, and unwavering faith.",
+    excerpt: "Beloved pastor who served his congregation for over 40 years with wisdom, compassion, and unwavering faith.",
     qr_code: true,
     qr_code_data: "memorial_004_james",
     family_members: ["Mary O'Connor", "Patrick O'Connor", "Elizabeth O'Connor"],
@@ -127,6 +131,7 @@ export const sampleMemorials: Memorial[] = [
     religion: "Muslim",
     categories: ["Life Moments", "Family Tree", "Voice & Stories"],
     description: "Dedicated father and successful businessman who balanced career success with family values and Islamic principles.",
+    excerpt: "Dedicated father and successful businessman who balanced career success with family values and Islamic principles.",
     qr_code: true,
     qr_code_data: "memorial_005_yusuf",
     family_members: ["Amina Rahman", "Khalid Rahman", "Noor Rahman"],
@@ -152,6 +157,7 @@ export const sampleMemorials: Memorial[] = [
     religion: "Christian",
     categories: ["Voice & Stories", "Life Moments", "Family Tree"],
     description: "Cherished grandmother who shared her faith through storytelling and family traditions.",
+    excerpt: "Cherished grandmother who shared her faith through storytelling and family traditions.",
     qr_code: true,
     qr_code_data: "memorial_006_grace",
     family_members: ["William Williams", "Jennifer Smith", "David Williams"],
@@ -7,7 +7,7 @@ import { Button } from "@/components/ui/button";
 import Navigation from "@/components/Navigation";
 import MemoryCard from "@/components/MemoryCard";
 import { useMemorials, useMemorialsByReligion, useMemorialsByCategory, useSearchMemorials } from "@/hooks/use-api";
-import { type Memorial } from "@/lib/api";
+import { type MemorialListItem } from "@/lib/api";
 import { sampleMemorials } from "@/lib/sample-data";
 
 const Gallery = () => {
@@ -51,7 +51,7 @@ const Gallery = () => {
   ];
 
   // Determine which data to display
-  const getDisplayData = (): { data: Memorial[] | undefined; isLoading: boolean; error: any } => {
+  const getDisplayData = (): { data: MemorialListItem[] | undefined; isLoading: boolean; error: any } => {
     if (searchQuery && searchQuery.length > 2) {
       return { data: searchResults?.results, isLoading: isLoadingSearch, error: null };
     }